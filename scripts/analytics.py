@@ -0,0 +1,184 @@
+# Required Libraries
+import os
+import numpy as np
+import pandas as pd
+from performance_cube import ClassSchema, PerformanceCube
+
+# Columns of the raw marks table, one row per student and question
+MARK_COLUMNS = ("STUDENT", "EXAM", "QUESTION", "MARKS")
+# Columns of the question map, one row per question of an exam paper
+QUESTION_COLUMNS = ("EXAM", "QUESTION", "SUBJECT", "UNIT", "TOPIC", "MAX MARKS")
+
+def _require_columns(df, columns, name):
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"The {name} table is missing the column(s): {', '.join(missing)}")
+
+def _percent(obtained, max_marks):
+    """obtained / max_marks * 100, NaN where nothing could be scored."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(max_marks > 0, obtained * 100 / max_marks, np.nan)
+
+def compute_performance(marks, questions, exams=None, details=None):
+    """
+    Compute the topic, unit and subject marks of a whole class from raw question marks.
+
+    Every question mark is added to its (student, exam, topic) cell in one
+    vectorized pass (np.bincount); units and subjects are rolled up from the
+    topics with a matrix product. Blank marks count as 0, like the sums of
+    the workbook formulas.
+
+    Parameters:
+    - marks: DataFrame with the MARK_COLUMNS (STUDENT, EXAM, QUESTION, MARKS).
+    - questions: DataFrame with the QUESTION_COLUMNS mapping each question of
+      an exam to its SUBJECT, UNIT, TOPIC and MAX MARKS.
+    - exams: Optional exam order (defaults to the order of the question map).
+    - details: Optional dictionary mapping student ID to its details (NAME, STANDARD, ...).
+
+    Returns:
+    - PerformanceCube of the class. Units and topics without questions in an
+      exam have no marks (NaN), like the "0/0" rows of a student sheet.
+
+    Raises:
+    - ValueError: If a column is missing, a question is mapped twice or not
+      at all, or a mark is negative or above the question's MAX MARKS.
+    """
+    _require_columns(marks, MARK_COLUMNS, "marks")
+    _require_columns(questions, QUESTION_COLUMNS, "question")
+    if questions.duplicated(["EXAM", "QUESTION"]).any():
+        raise ValueError("The question map lists the same exam question more than once.")
+
+    exams = pd.Index(pd.unique(questions["EXAM"]) if exams is None else list(exams))
+    questions = questions[questions["EXAM"].isin(exams)]
+    marks = marks[marks["EXAM"].isin(exams)]
+
+    # Intern the labels: topic -> unit -> subject, in order of first appearance
+    topic_codes, topics = pd.MultiIndex.from_frame(questions[["SUBJECT", "UNIT", "TOPIC"]]).factorize()
+    topics = topics.to_frame(index=False, name=["SUBJECT", "UNIT", "TOPIC"])
+    unit_of_topic, units = pd.MultiIndex.from_frame(topics[["SUBJECT", "UNIT"]]).factorize()
+    units = units.to_frame(index=False, name=["SUBJECT", "UNIT"])
+    subject_of_unit, subjects = pd.factorize(units["SUBJECT"])
+    subjects = pd.Index(subjects)
+
+    # Maximum marks of every exam and topic
+    num_exams, num_topics = len(exams), len(topics)
+    question_exam = exams.get_indexer(questions["EXAM"])
+    question_max = pd.to_numeric(questions["MAX MARKS"]).to_numpy(dtype=float)
+    topic_max = np.bincount(question_exam * num_topics + topic_codes, weights=question_max, minlength=num_exams * num_topics)
+    topic_max = topic_max.reshape(num_exams, num_topics)
+
+    # Look up the question of every mark
+    question_index = pd.MultiIndex.from_frame(questions[["EXAM", "QUESTION"]])
+    position = question_index.get_indexer(pd.MultiIndex.from_frame(marks[["EXAM", "QUESTION"]]))
+    if (position == -1).any():
+        unknown = marks.loc[position == -1, ["EXAM", "QUESTION"]].drop_duplicates().head(5)
+        raise ValueError(f"Marks for questions missing from the question map: {list(unknown.itertuples(index=False, name=None))}")
+    values = pd.to_numeric(marks["MARKS"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    if ((values < 0) | (values > question_max[position])).any():
+        raise ValueError(f"{int(((values < 0) | (values > question_max[position])).sum())} mark(s) are negative or above the question's MAX MARKS.")
+
+    # Obtained marks of every student, exam and topic in one pass
+    student_codes, students = pd.factorize(marks["STUDENT"])
+    num_students = len(students)
+    cell = (student_codes * num_exams + question_exam[position]) * num_topics + topic_codes[position]
+    topic_obtained = np.bincount(cell, weights=values, minlength=num_students * num_exams * num_topics)
+    topic_obtained = topic_obtained.reshape(num_students, num_exams, num_topics)
+
+    # Roll the topics up into units and the units into subjects
+    topic_to_unit = np.zeros((num_topics, len(units)))
+    topic_to_unit[np.arange(num_topics), unit_of_topic] = 1
+    unit_to_subject = np.zeros((len(units), len(subjects)))
+    unit_to_subject[np.arange(len(units)), subject_of_unit] = 1
+    unit_obtained = topic_obtained @ topic_to_unit
+    unit_max = topic_max @ topic_to_unit
+    obtained = {"subject": unit_obtained @ unit_to_subject, "unit": unit_obtained, "topic": topic_obtained}
+    max_marks = {"subject": unit_max @ unit_to_subject, "unit": unit_max, "topic": topic_max}
+
+    # PERFORMANCE % of each exam and OVERALL % of all exams up to and including it
+    performance = {}
+    overall = {}
+    for level in obtained:
+        performance[level] = _percent(obtained[level], max_marks[level][np.newaxis]).astype(np.float32)
+        cumulative_max = np.cumsum(max_marks[level], axis=0)[np.newaxis]
+        overall[level] = _percent(np.cumsum(obtained[level], axis=1), cumulative_max).astype(np.float32)
+        if level != "subject":
+            obtained[level][:, max_marks[level] == 0] = np.nan
+        obtained[level] = obtained[level].astype(np.float32)
+        max_marks[level] = max_marks[level].astype(np.float32)
+
+    schema = ClassSchema(exams, subjects, units, topics, max_marks)
+    return PerformanceCube(schema, pd.Index(students), obtained, performance, overall, details or {})
+
+def read_table(path):
+    """Read a .csv or Excel table with upper-case column names."""
+    df = pd.read_csv(path) if os.path.splitext(path)[1].lower() == ".csv" else pd.read_excel(path)
+    df.columns = [str(column).strip().upper() for column in df.columns]
+    return df
+
+def read_details(path):
+    """Read a student details table (a STUDENT or ID column plus NAME, ...) into a dictionary per student."""
+    df = read_table(path)
+    key = "STUDENT" if "STUDENT" in df.columns else "ID"
+    df = df.astype(object).where(df.notna(), None)
+    return {row.pop(key): {k: v for k, v in row.items() if v is not None} for row in df.to_dict("records")}
+
+def synthetic_marks(num_students=1000, exams=("Quarterly", "Half_yearly"), subjects=5, units=6, topics=4, questions=2, seed=0):
+    """
+    Random marks and question map of a class, for benchmarking compute_performance.
+
+    Every topic has `questions` questions of 5 marks in each exam.
+    """
+    rng = np.random.default_rng(seed)
+    question_map = pd.DataFrame(
+        [
+            (exam, f"Q{q + 1}", f"Subject {s + 1}", f"Unit {u + 1}", f"Topic {t + 1}", 5)
+            for exam in exams
+            for q, (s, u, t) in enumerate(
+                (s, u, t) for s in range(subjects) for u in range(units) for t in range(topics) for _ in range(questions)
+            )
+        ],
+        columns=list(QUESTION_COLUMNS),
+    )
+    students = np.arange(1001, 1001 + num_students)
+    marks = pd.DataFrame({
+        "STUDENT": np.repeat(students, len(question_map)),
+        "EXAM": np.tile(question_map["EXAM"].to_numpy(), num_students),
+        "QUESTION": np.tile(question_map["QUESTION"].to_numpy(), num_students),
+        "MARKS": rng.integers(0, 6, num_students * len(question_map)),
+    })
+    return marks, question_map
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compute the class performance from raw question marks and render the reports.")
+    parser.add_argument("--marks", help="Raw marks table (.csv or Excel) with STUDENT, EXAM, QUESTION, MARKS columns.")
+    parser.add_argument("--questions", help="Question map (.csv or Excel) with EXAM, QUESTION, SUBJECT, UNIT, TOPIC, MAX MARKS columns.")
+    parser.add_argument("--details", default=None, help="Optional student details table (.csv or Excel) keyed by STUDENT or ID.")
+    parser.add_argument("--output-dir", default="reports", help="Directory the reports are written to.")
+    parser.add_argument("--format", choices=("docx", "pdf"), default="docx", help="Output format of the reports.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--force", action="store_true", help="Rebuild every report, even unchanged ones.")
+    parser.add_argument("--benchmark", type=int, metavar="STUDENTS", default=None, help="Time the computation on a synthetic class of this size instead.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        marks, questions = synthetic_marks(args.benchmark)
+        start = time.perf_counter()
+        cube = compute_performance(marks, questions)
+        elapsed = time.perf_counter() - start
+        print(f"Computed {len(marks)} marks of {len(cube.students)} students in {elapsed * 1000:.1f} ms.")
+    elif not (args.marks and args.questions):
+        parser.error("--marks and --questions are required (or use --benchmark).")
+    else:
+        from generate_reports import render_reports
+
+        details = read_details(args.details) if args.details else {}
+        cube = compute_performance(read_table(args.marks), read_table(args.questions), details=details)
+        reports = ((key, (report, f"{key[0]}_")) for key, report in cube.reports())
+        results, errors = render_reports(reports, args.output_dir, args.workers, args.force, args.format)
+        print(f"Generated {len(results)} report(s), {len(errors)} failed.")
+        for key, error in errors.items():
+            print(f"  {key}: {error}")
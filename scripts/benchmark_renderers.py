@@ -0,0 +1,85 @@
+# Required Libraries
+import contextlib
+import io
+import os
+import tempfile
+import time
+import pandas as pd
+from convert_to_pdf import LibreOfficeWorker, find_soffice
+from generate_reports import render_report
+from logo_cache import LogoResolver
+from pdf_renderer import render_pdf
+from report_parser import parse_report
+
+def _best_time(function, repeats):
+    """Best wall time in seconds of calling function(run_index)."""
+    best = float("inf")
+    for run_index in range(repeats):
+        start = time.perf_counter()
+        function(run_index)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(file_path, sheet_name, column_start, column_end, repeats=5):
+    """
+    Time one report end to end through the DOCX and the direct PDF backends.
+
+    The DOCX path renders and saves the .docx, then converts it with headless
+    LibreOffice when it is installed (otherwise only the DOCX stage is timed).
+    The PDF path renders the .pdf directly.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - sheet_name: Name of the sheet corresponding to the student ID.
+    - column_start: Starting column (e.g., 'A').
+    - column_end: Ending column (e.g., 'H').
+    - repeats: Number of runs; the best time of each path is kept.
+
+    Returns:
+    - Dictionary of best times in seconds (docx_s, convert_s, pdf_s) and the speedup.
+    """
+    df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=f"{column_start}:{column_end}", header=None)
+    report = parse_report(df)
+    # The logo is resolved once up front so both paths measure rendering only
+    resolver = LogoResolver(cache_dir=None)
+    if report.details.get("LOGO"):
+        resolver.prefetch([report.details["LOGO"]])
+
+    with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+        docx_s = _best_time(lambda i: render_report(report, output_dir, f"docx{i}_", logo_resolver=resolver), repeats)
+        pdf_s = _best_time(lambda i: render_pdf(report, output_dir, f"pdf{i}_", logo_resolver=resolver), repeats)
+
+        convert_s = None
+        soffice = find_soffice()
+        if soffice:
+            worker = LibreOfficeWorker(soffice)
+            try:
+                source = os.path.join(output_dir, f"docx0_{report.exam_type}_Report.docx")
+                worker.convert(source, os.path.join(output_dir, "warmup.pdf"), timeout=120)
+                convert_s = _best_time(lambda i: worker.convert(source, os.path.join(output_dir, f"converted{i}.pdf"), timeout=120), repeats)
+            finally:
+                worker.close()
+
+    docx_total = docx_s + (convert_s or 0.0)
+    return {"docx_s": docx_s, "convert_s": convert_s, "pdf_s": pdf_s, "speedup": docx_total / pdf_s}
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the DOCX+conversion path against direct PDF rendering.")
+    parser.add_argument("file", help="Path to the Excel workbook.")
+    parser.add_argument("--student", default="1001", help="Student ID (sheet name).")
+    parser.add_argument("--column-start", default="AC", help="First column of the exam block.")
+    parser.add_argument("--column-end", default="AJ", help="Last column of the exam block.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of runs per path.")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.file, args.student, args.column_start, args.column_end, args.repeats)
+    print(f"DOCX render + save:   {result['docx_s'] * 1000:.1f} ms")
+    if result["convert_s"] is None:
+        print("LibreOffice conversion: skipped (soffice not found)")
+    else:
+        print(f"LibreOffice convert:  {result['convert_s'] * 1000:.1f} ms")
+    print(f"Direct PDF render:    {result['pdf_s'] * 1000:.1f} ms")
+    print(f"End-to-end speedup:   {result['speedup']:.1f}x")
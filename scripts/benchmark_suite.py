@@ -0,0 +1,232 @@
+# Required Libraries
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import pandas as pd
+from convert_to_pdf import LibreOfficeWorker, find_soffice
+from generate_reports import build_document
+from logo_cache import LogoResolver
+from report_parser import parse_report, report_file_name
+from synthetic_workbook import EXTRA_COLUMNS, generate_workbook
+from workbook_reader import NON_STUDENT_SHEETS, split_exam_blocks
+
+# Bump when the stages or the synthetic workbooks change, so older results are not compared
+BENCHMARK_VERSION = 1
+DEFAULT_SIZES = (10, 100, 1000)
+STAGES = ("parse", "render", "save", "convert")
+BASELINE_NAME = "baseline.json"
+HISTORY_NAME = "history.jsonl"
+
+def fixture_workbook(num_students, cache_dir, seed=0, extra_columns=(), reorder_columns=False):
+    """
+    Path of the synthetic workbook of a class size, generated on first use.
+
+    The workbooks are kept in cache_dir so every run measures the same data.
+    extra_columns and reorder_columns select the table layout (see
+    synthetic_workbook.write_workbook) and are part of the file name.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    layout = "".join(f"_{column.lower()}" for column in extra_columns) + ("_reordered" if reorder_columns else "")
+    file_path = os.path.join(cache_dir, f"synthetic_v{BENCHMARK_VERSION}_{num_students}_seed{seed}{layout}.xlsx")
+    if not os.path.exists(file_path):
+        generate_workbook(f"{file_path}.tmp.xlsx", num_students, seed=seed, extra_columns=extra_columns, reorder_columns=reorder_columns)
+        os.replace(f"{file_path}.tmp.xlsx", file_path)
+    return file_path
+
+def _stage(count, seconds, **fields):
+    return {"count": count, "seconds": seconds, "per_item_ms": seconds * 1000 / count if count else None, **fields}
+
+def _parse_workbook(file_path):
+    """Read every student sheet once and parse each of its exam blocks (the --all --all-exams path)."""
+    reports = []
+    with pd.ExcelFile(file_path) as xls:
+        for sheet_name in xls.sheet_names:
+            if sheet_name.strip().upper() in NON_STUDENT_SHEETS:
+                continue
+            df = xls.parse(sheet_name, header=None)
+            reports.extend((sheet_name, parse_report(block)) for _, block in split_exam_blocks(df))
+    return reports
+
+def benchmark_workbook(file_path, render_limit=100, convert_limit=5, repeats=1, soffice=None):
+    """
+    Time the parse, render, save and convert stages on one workbook, in this process.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - render_limit: Number of reports rendered and saved (None for all of them).
+    - convert_limit: Number of saved reports converted with LibreOffice.
+    - repeats: Number of parse runs; the best one is kept.
+    - soffice: LibreOffice executable; the convert stage is skipped without it.
+
+    Returns:
+    - Dictionary mapping each stage to its item count, total seconds and
+      milliseconds per item (None for a skipped stage).
+    """
+    results = {}
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        reports = _parse_workbook(file_path)
+        best = min(best, time.perf_counter() - start)
+    results["parse"] = _stage(len(reports), best, sheets=len({sheet_name for sheet_name, _ in reports}))
+
+    sample = reports if render_limit is None else reports[:render_limit]
+    resolver = LogoResolver(cache_dir=None)
+    with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+        # Render the documents in memory, then save them
+        start = time.perf_counter()
+        documents = [(build_document(report, logo_resolver=resolver), f"{sheet_name}_", report) for sheet_name, report in sample]
+        results["render"] = _stage(len(documents), time.perf_counter() - start)
+
+        paths = []
+        start = time.perf_counter()
+        for doc, file_prefix, report in documents:
+            path = os.path.join(output_dir, report_file_name(report, file_prefix))
+            doc.save(path)
+            paths.append(path)
+        results["save"] = _stage(len(paths), time.perf_counter() - start, bytes=sum(os.path.getsize(path) for path in paths))
+        del documents
+
+        results["convert"] = None
+        if soffice and paths and convert_limit:
+            worker = LibreOfficeWorker(soffice)
+            try:
+                worker.convert(paths[0], os.path.join(output_dir, "warmup.pdf"), timeout=120)
+                converted = paths[:convert_limit]
+                start = time.perf_counter()
+                for path in converted:
+                    worker.convert(path, f"{os.path.splitext(path)[0]}.pdf", timeout=120)
+                results["convert"] = _stage(len(converted), time.perf_counter() - start)
+            finally:
+                worker.close()
+    return results
+
+def run_suite(sizes=DEFAULT_SIZES, cache_dir="benchmarks/workbooks", render_limit=100, convert_limit=5, repeats=1, seed=0,
+              extra_columns=(), reorder_columns=False):
+    """
+    Run the benchmark on synthetic workbooks of each class size.
+
+    Parameters:
+    - sizes: Numbers of students.
+    - cache_dir: Directory the synthetic workbooks are kept in.
+    - render_limit: Number of reports rendered and saved per size (None for all).
+    - convert_limit: Number of reports converted with LibreOffice per size.
+    - repeats: Number of parse runs per size; the best one is kept.
+    - seed: Random seed of the synthetic workbooks.
+    - extra_columns, reorder_columns: Table layout of the synthetic workbooks (see fixture_workbook).
+
+    Returns:
+    - Dictionary with the run's environment and, under "sizes", the stage
+      results of each class size (see benchmark_workbook).
+    """
+    soffice = find_soffice()
+    results = {
+        "version": BENCHMARK_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "soffice": soffice,
+        "settings": {
+            "render_limit": render_limit, "convert_limit": convert_limit, "repeats": repeats, "seed": seed,
+            "extra_columns": list(extra_columns), "reorder_columns": reorder_columns,
+        },
+        "sizes": {},
+    }
+    for num_students in sizes:
+        file_path = fixture_workbook(num_students, cache_dir, seed, extra_columns, reorder_columns)
+        results["sizes"][str(num_students)] = benchmark_workbook(file_path, render_limit, convert_limit, repeats, soffice)
+    return results
+
+def results_table(results):
+    """DataFrame with one row per class size and stage of a run."""
+    rows = [
+        {"STUDENTS": int(size), "STAGE": stage, "COUNT": values["count"], "TOTAL S": values["seconds"], "MS PER ITEM": values["per_item_ms"]}
+        for size, stages in results["sizes"].items() for stage, values in stages.items() if values
+    ]
+    return pd.DataFrame(rows, columns=["STUDENTS", "STAGE", "COUNT", "TOTAL S", "MS PER ITEM"])
+
+def compare_results(results, baseline, tolerance=0.25):
+    """
+    Compare the per-item times of a run against a baseline run.
+
+    Parameters:
+    - results: Results of the current run (see run_suite).
+    - baseline: Results of the baseline run.
+    - tolerance: Allowed slowdown as a fraction (0.25 allows 25% slower).
+
+    Returns:
+    - DataFrame with the baseline and current milliseconds per item, the
+      change and a REGRESSION flag for every stage measured in both runs.
+    """
+    current = results_table(results).set_index(["STUDENTS", "STAGE"])["MS PER ITEM"]
+    previous = results_table(baseline).set_index(["STUDENTS", "STAGE"])["MS PER ITEM"]
+    table = pd.concat({"BASELINE MS": previous, "CURRENT MS": current}, axis=1, join="inner")
+    table["CHANGE %"] = (table["CURRENT MS"] / table["BASELINE MS"] - 1) * 100
+    table["REGRESSION"] = table["CURRENT MS"] > table["BASELINE MS"] * (1 + tolerance)
+    return table.reset_index()
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+def save_results(results, results_dir, baseline=False):
+    """
+    Append a run to the history of results_dir, and make it the baseline if requested.
+
+    Returns:
+    - Path of the history file.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    history_path = os.path.join(results_dir, HISTORY_NAME)
+    with open(history_path, "a", encoding="utf-8") as history_file:
+        history_file.write(json.dumps(results) + "\n")
+    if baseline:
+        with open(os.path.join(results_dir, BASELINE_NAME), "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+    return history_path
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark parse, render, save and convert on synthetic workbooks and catch regressions against a baseline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Class sizes (numbers of students) to benchmark.")
+    parser.add_argument("--results-dir", default="benchmarks", help="Directory of the result history, the baseline and the synthetic workbooks.")
+    parser.add_argument("--render-limit", type=int, default=100, help="Reports rendered and saved per size (0 for all of them).")
+    parser.add_argument("--convert-limit", type=int, default=5, help="Reports converted with LibreOffice per size (skipped without soffice).")
+    parser.add_argument("--repeats", type=int, default=1, help="Parse runs per size; the best one is kept.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic workbooks.")
+    parser.add_argument("--extra-columns", nargs="+", choices=sorted(EXTRA_COLUMNS), default=[], help="Columns appended to the unit-wise and topic-wise tables of the synthetic workbooks.")
+    parser.add_argument("--reorder-columns", action="store_true", help="Write the score columns of the synthetic workbooks in reverse order.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per item against the baseline (0.25 = 25%%).")
+    parser.add_argument("--save-baseline", action="store_true", help="Make this run the baseline later runs are compared against.")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, os.path.join(args.results_dir, "workbooks"), args.render_limit or None, args.convert_limit, args.repeats, args.seed,
+                        args.extra_columns, args.reorder_columns)
+    print(results_table(results).to_string(index=False, float_format="%.2f"))
+    if results["soffice"] is None:
+        print("LibreOffice not found; the convert stage was skipped.")
+
+    baseline_path = os.path.join(args.results_dir, BASELINE_NAME)
+    regressions = 0
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        baseline = load_results(baseline_path)
+        if baseline.get("version") != BENCHMARK_VERSION or baseline.get("settings") != results["settings"]:
+            print(f"The baseline in {baseline_path} was recorded with other settings; not comparing.")
+        else:
+            comparison = compare_results(results, baseline, args.tolerance)
+            print(f"\nAgainst the baseline of {baseline['timestamp']}:")
+            print(comparison.to_string(index=False, float_format="%.2f"))
+            regressions = int(comparison["REGRESSION"].sum())
+    history_path = save_results(results, args.results_dir, baseline=args.save_baseline)
+    print(f"Results appended to {history_path}{' and saved as the baseline' if args.save_baseline else ''}.")
+    if regressions:
+        print(f"{regressions} stage(s) regressed by more than {args.tolerance:.0%}.")
+        sys.exit(1)
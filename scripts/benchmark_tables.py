@@ -0,0 +1,126 @@
+# Required Libraries
+import time
+import pandas as pd
+from docx import Document
+from docx.shared import Pt
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.shared import OxmlElement, qn
+from table_builder import build_table
+
+TOPIC_HEADERS = ["UNIT", "TOPIC", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"]
+
+def make_topic_rows(num_rows):
+    """Synthetic topic-wise rows with every third OVERALL % below 50."""
+    rows = []
+    for i in range(num_rows):
+        obtained = i % 6
+        rows.append([f"Unit {i // 10 + 1}", f"Topic {i + 1}", f"{obtained}/5", obtained * 20, 30 if i % 3 == 0 else 75.5])
+    return rows
+
+def set_column_widths(table, column_indices, width_in_inches):
+    """
+    Set custom widths for specified columns in a table.
+
+    Verbatim copy of the helper the report renderer used before
+    table_builder.build_table (it appends a new tcW element to every cell),
+    kept here so the per-cell baseline measures the original code.
+
+    Parameters:
+    - table: The table object from python-docx.
+    - column_indices: List of column indices to adjust.
+    - width_in_inches: The desired width in inches for the specified columns.
+    """
+    for row in table.rows:
+        for col_idx in column_indices:
+            if col_idx < len(row.cells):
+                cell = row.cells[col_idx]
+                cell_width = cell._element
+                tc_width = cell_width.get_or_add_tcPr()
+                tcW = OxmlElement('w:tcW')
+                tcW.set(qn('w:w'), str(int(width_in_inches * 1440)))  # Inches to twips
+                tcW.set(qn('w:type'), 'dxa')
+                tc_width.append(tcW)
+
+def per_cell_table(doc, headers, rows):
+    """
+    Topic-wise table built cell by cell through python-docx, copied from the
+    report renderer before table_builder.build_table.
+    """
+    topic_table = doc.add_table(rows=1, cols=len(headers))
+    topic_table.style = 'Medium Shading 1 Accent 4'
+    hdr_cells = topic_table.rows[0].cells
+    for i, header in enumerate(headers):
+        hdr_cells[i].text = str(header).strip()
+        hdr_cells[i].paragraphs[0].runs[0].font.bold = True
+        hdr_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    topic_table.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+    for row in topic_table.rows:
+        for cell in row.cells:
+            for paragraph in cell.paragraphs:
+                for run in paragraph.runs:
+                    run.font.size = Pt(9)
+
+    overall_idx = headers.index("OVERALL %")
+    for topic_row in rows:
+        row_cells = topic_table.add_row().cells
+        for i, cell_value in enumerate(topic_row):
+            row_cells[i].text = str(cell_value).strip() if pd.notna(cell_value) else ""
+            row_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+            if i == overall_idx and isinstance(cell_value, (int, float)) and cell_value < 50:
+                cell_properties = row_cells[i]._element.get_or_add_tcPr()
+                cell_shading = OxmlElement('w:shd')
+                cell_shading.set(qn('w:fill'), '#FF8585')
+                cell_properties.append(cell_shading)
+
+    set_column_widths(topic_table, [headers.index("OBTAINED MARKS")], 1.0)
+    return topic_table
+
+def batch_table(doc, headers, rows):
+    """Topic-wise table built with table_builder.build_table."""
+    overall_idx = headers.index("OVERALL %")
+    shaded_cells = [(i, overall_idx) for i, row in enumerate(rows) if row[overall_idx] < 50]
+    texts = [[str(value).strip() for value in row] for row in rows]
+    return build_table(doc, headers, texts, 'Medium Shading 1 Accent 4', header_font_size=9,
+                       shaded_cells=shaded_cells, column_widths={headers.index("OBTAINED MARKS"): 1.0})
+
+def time_builder(builder, rows, repeats):
+    """Best wall time in seconds of building the table on a fresh document."""
+    best = float("inf")
+    for _ in range(repeats):
+        doc = Document()
+        start = time.perf_counter()
+        builder(doc, TOPIC_HEADERS, rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(num_rows=200, repeats=5):
+    """
+    Compare the per-cell and batch table builders on one topic-wise table.
+
+    Parameters:
+    - num_rows: Number of data rows in the table.
+    - repeats: Number of runs; the best time of each builder is kept.
+
+    Returns:
+    - Dictionary with the best time of each builder and the speedup.
+    """
+    rows = make_topic_rows(num_rows)
+    per_cell = time_builder(per_cell_table, rows, repeats)
+    batch = time_builder(batch_table, rows, repeats)
+    return {"rows": num_rows, "per_cell_s": per_cell, "batch_s": batch, "speedup": per_cell / batch}
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark topic-wise table construction.")
+    parser.add_argument("--rows", type=int, default=200, help="Number of rows in the topic table.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of runs per builder.")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.rows, args.repeats)
+    print(f"Topic table with {result['rows']} rows")
+    print(f"  per-cell python-docx: {result['per_cell_s'] * 1000:.1f} ms")
+    print(f"  batch XML builder:    {result['batch_s'] * 1000:.1f} ms")
+    print(f"  speedup:              {result['speedup']:.1f}x")
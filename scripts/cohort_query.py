@@ -0,0 +1,291 @@
+# Required Libraries
+import os
+import numpy as np
+import pandas as pd
+from performance_cube import LEVELS, PerformanceCube, cube_from_workbook
+from summary_export import RECORDS_NAME, read_records
+
+# Score arrays a query can rank on
+METRICS = {"performance": "PERFORMANCE %", "overall": "OVERALL %"}
+
+class CohortIndex:
+    """
+    Query index over the performance cube of a class.
+
+    Labels are looked up through dictionaries keyed by subject, (subject,
+    unit) and (subject, unit, topic), and for every exam and label the
+    students are presorted by score, so threshold and top-k queries are a
+    binary search and a slice instead of a scan of every report.
+    """
+
+    def __init__(self, cube):
+        """
+        Parameters:
+        - cube: PerformanceCube of the class (see performance_cube).
+        """
+        self.cube = cube
+        schema = cube.schema
+        self._positions = {}
+        for level in LEVELS:
+            for position, key in enumerate(schema.labels(level).itertuples(index=False, name=None)):
+                self._positions[key] = (level, position)
+
+        # Students of every (level, exam, label) sorted by score; NaN scores sort last
+        self._order = {}
+        self._sorted = {}
+        for metric in METRICS:
+            scores = getattr(cube, metric)
+            for level in LEVELS:
+                by_label = np.moveaxis(scores[level], 0, -1)  # exams × labels × students
+                order = np.argsort(by_label, axis=-1, kind="stable").astype(np.int32)
+                self._order[metric, level] = order
+                self._sorted[metric, level] = np.take_along_axis(by_label, order, axis=-1)
+
+    def _locate(self, subject, unit=None, topic=None):
+        key = tuple(label for label in (subject, unit, topic) if label is not None)
+        if key not in self._positions:
+            raise KeyError(f"No {'/'.join(map(str, key))} in the class data.")
+        return self._positions[key]
+
+    def _exam(self, exam):
+        try:
+            return self.cube.exams.get_loc(exam)
+        except KeyError:
+            raise KeyError(f"No exam '{exam}' in the class data (exams: {', '.join(map(str, self.cube.exams))}).") from None
+
+    def _frame(self, students, columns):
+        return pd.DataFrame({"STUDENT": self.cube.students[students], **columns})
+
+    def below(self, threshold, subject, unit=None, topic=None, exams=None, metric="performance", match="all"):
+        """
+        Students scoring below a threshold on a subject, unit or topic.
+
+        Parameters:
+        - threshold: Score (in %) students must be below.
+        - subject, unit, topic: Label to query; give the unit and topic to narrow it.
+        - exams: Exam types to check (defaults to every exam).
+        - metric: 'performance' (PERFORMANCE %) or 'overall' (OVERALL %).
+        - match: 'all' keeps students below the threshold in every exam, 'any' in at least one.
+
+        Returns:
+        - DataFrame of STUDENT and one score column per exam, lowest first.
+        """
+        level, position = self._locate(subject, unit, topic)
+        exams = list(self.cube.exams if exams is None else exams)
+        matched = None
+        for exam in exams:
+            e = self._exam(exam)
+            count = np.searchsorted(self._sorted[metric, level][e, position], threshold, side="left")
+            students = self._order[metric, level][e, position, :count]
+            if matched is None:
+                matched = students
+            elif match == "all":
+                matched = np.intersect1d(matched, students)
+            else:
+                matched = np.union1d(matched, students)
+
+        scores = getattr(self.cube, metric)[level]
+        matched = np.sort(matched if matched is not None else np.array([], dtype=np.int32))
+        columns = {exam: scores[matched, self._exam(exam), position] for exam in exams}
+        return self._frame(matched, columns).sort_values(exams, kind="stable", ignore_index=True)
+
+    def top(self, k, exam, subject, unit=None, topic=None, metric="performance", lowest=False):
+        """
+        The k best (or worst) students of an exam on a subject, unit or topic.
+
+        Returns:
+        - DataFrame of STUDENT and SCORE, best first (worst first with lowest).
+        """
+        level, position = self._locate(subject, unit, topic)
+        e = self._exam(exam)
+        values = self._sorted[metric, level][e, position]
+        order = self._order[metric, level][e, position]
+        scored = len(values) - int(np.isnan(values).sum())
+        students = order[:min(k, scored)] if lowest else order[max(scored - k, 0):scored][::-1]
+        return self._frame(students, {"SCORE": getattr(self.cube, metric)[level][students, e, position]})
+
+    def _total(self, exam):
+        """Percentage of every student over all subjects of an exam."""
+        e = self._exam(exam)
+        obtained = np.nansum(self.cube.obtained["subject"][:, e], axis=1)
+        max_marks = np.nansum(np.where(np.isnan(self.cube.obtained["subject"][:, e]), 0, self.cube.schema.max_marks["subject"][e]), axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(max_marks > 0, obtained * 100 / max_marks, np.nan)
+
+    def improvement(self, from_exam, to_exam, subject=None, unit=None, topic=None, k=10, metric="performance", declined=False):
+        """
+        The k students whose score rose (or fell) the most between two exams.
+
+        Without a subject, the score is the percentage over all subjects.
+
+        Returns:
+        - DataFrame of STUDENT, the two exam scores and CHANGE, largest change first.
+        """
+        if subject is None:
+            before, after = self._total(from_exam), self._total(to_exam)
+        else:
+            level, position = self._locate(subject, unit, topic)
+            scores = getattr(self.cube, metric)[level]
+            before = scores[:, self._exam(from_exam), position]
+            after = scores[:, self._exam(to_exam), position]
+        change = (before - after) if declined else (after - before)
+
+        # Partial sort of the k largest changes, students without both scores last
+        change = np.where(np.isnan(change), -np.inf, change)
+        k = min(k, int(np.isfinite(change).sum()))
+        if k == 0:
+            students = np.array([], dtype=np.int64)
+        else:
+            students = np.argpartition(-change, k - 1)[:k]
+            students = students[np.argsort(-change[students], kind="stable")]
+        return self._frame(students, {
+            from_exam: before[students],
+            to_exam: after[students],
+            "CHANGE": after[students] - before[students],
+        })
+
+    def weakest(self, exam, k=10, level="topic", student=None, metric="performance"):
+        """
+        The k labels of a level with the lowest class mean (or one student's score) in an exam.
+
+        Returns:
+        - DataFrame of the label columns, SCORE and, for the class, STUDENTS (number scored).
+        """
+        e = self._exam(exam)
+        scores = getattr(self.cube, metric)[level][:, e]
+        labels = self.cube.schema.labels(level)
+        if student is not None:
+            values = scores[self.cube.students.get_loc(student)]
+            result = labels.assign(SCORE=values)
+        else:
+            with np.errstate(invalid="ignore"):
+                counts = (~np.isnan(scores)).sum(axis=0)
+                values = np.nansum(scores, axis=0) / np.where(counts > 0, counts, np.nan)
+            result = labels.assign(SCORE=values, STUDENTS=counts)
+        return result.dropna(subset=["SCORE"]).nsmallest(k, "SCORE").reset_index(drop=True)
+
+def load_cube(source):
+    """
+    Load the class data of a query source.
+
+    Parameters:
+    - source: Student workbook (.xlsx), or the records.csv / records Parquet
+      dataset written by summary_export.py.
+
+    Returns:
+    - PerformanceCube of the class.
+    """
+    if os.path.isdir(source) and os.path.exists(os.path.join(source, f"{RECORDS_NAME}.csv")):
+        source = os.path.join(source, f"{RECORDS_NAME}.csv")
+    if source.lower().endswith(".csv"):
+        return PerformanceCube.from_records(read_records(source))
+    if os.path.isdir(source):
+        records = pd.read_parquet(source)
+        records["EXAM"] = records["EXAM"].astype(str)
+        return PerformanceCube.from_records(records)
+    return cube_from_workbook(source, on_error=lambda sheet_name, e: print(f"Skipping sheet {sheet_name}: {e}"))
+
+def run_benchmark(num_students=10000, repeats=20):
+    """
+    Time the index build and every query type on a synthetic class.
+
+    Returns:
+    - Dictionary mapping each step to its best time in milliseconds.
+    """
+    import time
+    from analytics import compute_performance, synthetic_marks
+
+    exams = ("Quarterly", "Half_yearly", "Revision_1", "Revision_2")
+    cube = compute_performance(*synthetic_marks(num_students, exams=exams))
+
+    def best(function, runs):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    timings = {"build index": best(lambda: CohortIndex(cube), 1)}
+    index = CohortIndex(cube)
+    queries = {
+        "below 50% in a unit across two exams": lambda: index.below(50, "Subject 1", "Unit 3", exams=["Revision_1", "Revision_2"]),
+        "top 10 in a topic": lambda: index.top(10, "Quarterly", "Subject 2", "Unit 1", "Topic 2"),
+        "10 most improved overall": lambda: index.improvement("Quarterly", "Half_yearly", k=10),
+        "10 most improved in a subject": lambda: index.improvement("Quarterly", "Half_yearly", "Subject 3", k=10),
+        "10 weakest topics of the class": lambda: index.weakest("Revision_2", k=10),
+    }
+    for name, query in queries.items():
+        timings[name] = best(query, repeats)
+    return timings
+
+def display_frame(result):
+    """Copy of a query result for printing: the float32 scores as float64 rounded to 2 decimals."""
+    scores = result.select_dtypes("floating").columns
+    return result.astype({column: "float64" for column in scores}).round({column: 2 for column in scores})
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Answer cohort questions (at-risk students, top-k, improvement, weakest topics) over the class data.")
+    parser.add_argument("--source", help="Student workbook (.xlsx), or the records.csv / directory written by summary_export.py.")
+    parser.add_argument("--metric", choices=sorted(METRICS), default="performance", help="Score to query (PERFORMANCE %% or OVERALL %%).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_label(command):
+        command.add_argument("--subject", required=True, help="Subject name.")
+        command.add_argument("--unit", default=None, help="Unit name within the subject.")
+        command.add_argument("--topic", default=None, help="Topic name within the unit.")
+
+    below = commands.add_parser("below", help="Students below a threshold, e.g. below 50%% in Unit 3 of Physics in both revisions.")
+    add_label(below)
+    below.add_argument("--threshold", type=float, default=50, help="Score threshold in %%.")
+    below.add_argument("--exam", action="append", default=None, help="Exam to check (repeatable, defaults to all).")
+    below.add_argument("--any", action="store_true", help="Below the threshold in any of the exams instead of all of them.")
+
+    top = commands.add_parser("top", help="The k best (or worst) students of an exam.")
+    add_label(top)
+    top.add_argument("--exam", required=True, help="Exam type.")
+    top.add_argument("-k", type=int, default=10, help="Number of students.")
+    top.add_argument("--lowest", action="store_true", help="Return the k lowest scores instead.")
+
+    improved = commands.add_parser("improved", help="The k most improved (or declined) students between two exams.")
+    improved.add_argument("--from", dest="from_exam", required=True, help="Earlier exam type.")
+    improved.add_argument("--to", dest="to_exam", required=True, help="Later exam type.")
+    improved.add_argument("--subject", default=None, help="Subject name (defaults to all subjects).")
+    improved.add_argument("--unit", default=None, help="Unit name within the subject.")
+    improved.add_argument("--topic", default=None, help="Topic name within the unit.")
+    improved.add_argument("-k", type=int, default=10, help="Number of students.")
+    improved.add_argument("--declined", action="store_true", help="Rank the largest drops instead.")
+
+    weakest = commands.add_parser("weakest", help="The k weakest topics (or units, subjects) of the class or of one student.")
+    weakest.add_argument("--exam", required=True, help="Exam type.")
+    weakest.add_argument("--level", choices=LEVELS, default="topic", help="Level to rank.")
+    weakest.add_argument("--student", default=None, help="Student ID (defaults to the class mean).")
+    weakest.add_argument("-k", type=int, default=10, help="Number of labels.")
+
+    benchmark = commands.add_parser("benchmark", help="Time the queries on a synthetic class.")
+    benchmark.add_argument("--students", type=int, default=10000, help="Number of synthetic students.")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        for name, milliseconds in run_benchmark(args.students).items():
+            print(f"{name:<40} {milliseconds:8.2f} ms")
+    elif not args.source or not os.path.exists(args.source):
+        print("The specified source does not exist. Please check and try again.")
+    else:
+        index = CohortIndex(load_cube(args.source))
+        try:
+            if args.command == "below":
+                result = index.below(args.threshold, args.subject, args.unit, args.topic, args.exam, args.metric, "any" if args.any else "all")
+            elif args.command == "top":
+                result = index.top(args.k, args.exam, args.subject, args.unit, args.topic, args.metric, args.lowest)
+            elif args.command == "improved":
+                result = index.improvement(args.from_exam, args.to_exam, args.subject, args.unit, args.topic, args.k, args.metric, args.declined)
+            else:
+                result = index.weakest(args.exam, args.k, args.level, args.student, args.metric)
+        except KeyError as e:
+            print(e.args[0])
+        else:
+            print(display_frame(result).to_string(index=False) if len(result) else "No matching students.")
@@ -1,7 +1,321 @@
-from docx2pdf import convert
+# Required Libraries
+from dataclasses import dataclass
+import glob
+import os
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
 
-# Convert a single file
-convert(r'C:\Users\Sanjay\Quarterly Report.docx', r'C:\Users\Sanjay\Quarterly_Report.pdf')
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:  # Optional: without the UNO bridge each file runs its own soffice
+    uno = None
 
+# Export filter used for Writer documents
+PDF_FILTER = "writer_pdf_Export"
 
+@dataclass
+class ConversionResult:
+    """
+    Outcome of converting one document.
 
+    - source: Path of the .docx file.
+    - output: Path of the .pdf file (None if the conversion failed).
+    - attempts: Number of attempts made.
+    - seconds: Wall time spent on the file, including retries.
+    - error: Last error message (None on success).
+    """
+    source: str
+    output: str = None
+    attempts: int = 0
+    seconds: float = 0.0
+    error: str = None
+
+def find_soffice():
+    """Path of the LibreOffice executable, or None if it is not installed."""
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _property(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+def _kill_process_group(process):
+    """
+    Kill a LibreOffice process started in its own session, with the children it forked.
+
+    Killing only the soffice wrapper leaves soffice.bin running with the
+    profile locked, and every later conversion on that profile fails.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+class LibreOfficeWorker:
+    """
+    One long-lived headless LibreOffice instance with its own user profile.
+
+    With the UNO bridge (the `uno` module shipped with LibreOffice) the
+    instance is started once and every document is converted through it.
+    Without it, each conversion runs `soffice --convert-to` on the worker's
+    profile, which is already initialized after the first file.
+    """
+
+    def __init__(self, soffice, startup_timeout=60):
+        """
+        Parameters:
+        - soffice: Path of the LibreOffice executable.
+        - startup_timeout: Seconds to wait for the instance to accept connections.
+        """
+        self.soffice = soffice
+        self.startup_timeout = startup_timeout
+        self.profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        self.process = None
+        self.desktop = None
+
+    @property
+    def profile_url(self):
+        return "file://" + self.profile_dir.replace(os.sep, "/")
+
+    def start(self):
+        """Start the instance and connect to it (no-op without the UNO bridge)."""
+        if uno is None or self.process is not None:
+            return
+        port = _free_port()
+        self.process = subprocess.Popen(
+            [
+                self.soffice, "--headless", "--invisible", "--nologo", "--norestore",
+                "--nodefault", "--nolockcheck", f"-env:UserInstallation={self.profile_url}",
+                f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local_context)
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("LibreOffice did not start")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    def stop(self):
+        """Shut the instance down, killing it if it does not exit."""
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _kill_process_group(self.process)
+            self.process = None
+
+    def close(self):
+        """Stop the instance and delete its profile."""
+        self.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def convert(self, source, output, timeout):
+        """
+        Convert one document to PDF.
+
+        Parameters:
+        - source: Path of the .docx file.
+        - output: Path of the .pdf file to write.
+        - timeout: Seconds after which the conversion is abandoned and the instance restarted.
+        """
+        if uno is None:
+            self._convert_cli(source, output, timeout)
+            return
+
+        self.start()
+        outcome = {}
+
+        def run():
+            try:
+                document = self.desktop.loadComponentFromURL(
+                    uno.systemPathToFileUrl(os.path.abspath(source)), "_blank", 0, (_property("Hidden", True),)
+                )
+                try:
+                    document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(output)), (_property("FilterName", PDF_FILTER),))
+                finally:
+                    document.close(True)
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            # The instance is stuck on this file; kill it so the next job gets a fresh one
+            _kill_process_group(self.process)
+            self.desktop = None
+            self.stop()
+            raise TimeoutError(f"Conversion timed out after {timeout} s")
+        if "error" in outcome:
+            self.stop()
+            raise RuntimeError(str(outcome["error"]))
+
+    def _convert_cli(self, source, output, timeout):
+        out_dir = tempfile.mkdtemp(prefix="lo_out_")
+        try:
+            process = subprocess.Popen(
+                [
+                    self.soffice, "--headless", "--nologo", "--norestore", "--nolockcheck",
+                    f"-env:UserInstallation={self.profile_url}",
+                    "--convert-to", "pdf", "--outdir", out_dir, os.path.abspath(source),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+            try:
+                _, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                # soffice forks soffice.bin, which would keep the profile locked
+                _kill_process_group(process)
+                raise
+            if process.returncode:
+                raise subprocess.CalledProcessError(process.returncode, process.args, stderr=stderr)
+            produced = os.path.join(out_dir, os.path.splitext(os.path.basename(source))[0] + ".pdf")
+            if not os.path.exists(produced):
+                raise RuntimeError("LibreOffice did not produce a PDF")
+            shutil.move(produced, output)
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"Conversion timed out after {timeout} s")
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+def collect_documents(inputs):
+    """
+    Expand directories into the .docx files they contain.
+
+    Parameters:
+    - inputs: A path or a list of paths to .docx files or directories.
+
+    Returns:
+    - Sorted list of .docx paths.
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    documents = []
+    for path in inputs:
+        if os.path.isdir(path):
+            documents.extend(glob.glob(os.path.join(path, "*.docx")))
+        else:
+            documents.append(os.fspath(path))
+    return sorted(documents)
+
+def convert_batch(inputs, output_dir=None, workers=2, timeout=120, retries=1, soffice=None):
+    """
+    Convert many .docx reports to PDF on a pool of long-lived LibreOffice workers.
+
+    Parameters:
+    - inputs: A directory, a .docx path, or a list of either.
+    - output_dir: Directory of the PDFs (defaults to next to each .docx file).
+    - workers: Number of LibreOffice instances running in parallel.
+    - timeout: Seconds allowed for one conversion attempt.
+    - retries: Extra attempts for a file that failed or timed out.
+    - soffice: Path of the LibreOffice executable (found on PATH by default).
+
+    Returns:
+    - List of ConversionResult, in input order.
+    """
+    soffice = soffice or find_soffice()
+    if soffice is None:
+        raise RuntimeError("LibreOffice (soffice) was not found on PATH.")
+
+    documents = collect_documents(inputs)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    results = [ConversionResult(source) for source in documents]
+    jobs = queue.Queue()
+    for result in results:
+        jobs.put(result)
+
+    def work():
+        worker = LibreOfficeWorker(soffice)
+        try:
+            while True:
+                try:
+                    result = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                directory = output_dir or os.path.dirname(os.path.abspath(result.source))
+                output = os.path.join(directory, os.path.splitext(os.path.basename(result.source))[0] + ".pdf")
+                start = time.perf_counter()
+                while result.attempts <= retries:
+                    result.attempts += 1
+                    try:
+                        worker.convert(result.source, output, timeout)
+                        result.output = output
+                        result.error = None
+                        break
+                    except Exception as e:
+                        result.error = str(e)
+                result.seconds = time.perf_counter() - start
+        finally:
+            worker.close()
+
+    threads = [threading.Thread(target=work) for _ in range(max(1, min(workers, len(documents))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert generated .docx reports to PDF with headless LibreOffice.")
+    parser.add_argument("inputs", nargs="+", help=".docx files or directories containing them.")
+    parser.add_argument("--output-dir", default=None, help="Directory of the PDFs (defaults to next to each .docx).")
+    parser.add_argument("--workers", type=int, default=2, help="Number of LibreOffice workers.")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per conversion attempt.")
+    parser.add_argument("--retries", type=int, default=1, help="Extra attempts for a failed file.")
+    args = parser.parse_args()
+
+    if find_soffice() is None:
+        print("LibreOffice (soffice) was not found on PATH. Please install it and try again.")
+    else:
+        start = time.perf_counter()
+        results = convert_batch(args.inputs, args.output_dir, args.workers, args.timeout, args.retries)
+        elapsed = time.perf_counter() - start
+
+        for result in results:
+            if result.output:
+                print(f"Converted {result.source} -> {result.output} ({result.seconds:.2f} s, {result.attempts} attempt(s))")
+            else:
+                print(f"Failed {result.source} after {result.attempts} attempt(s): {result.error}")
+        converted = sum(1 for result in results if result.output)
+        print(f"Converted {converted} of {len(results)} file(s) in {elapsed:.2f} s with {args.workers} worker(s).")
@@ -1,82 +1,37 @@
 # Required Libraries
 import pandas as pd
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.shared import RGBColor
+from docx.shared import Inches
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml.shared import OxmlElement, qn
 from io import BytesIO
-import requests
-
-def add_page_borders(section,check):
-    borders = OxmlElement('w:borders')
-    if check == True:
-        # Define border properties
-        for border_type in ['top', 'left', 'bottom', 'right']:
-            border = OxmlElement(f'w:{border_type}')
-            border.set(qn('w:val'), 'single')  # Set border style
-            border.set(qn('w:sz'), '8')  # Border size (in half-points)
-            border.set(qn('w:space'), '0')  # Space around the border
-            borders.append(border)
-        section.top_margin = Pt(60)
-        section.bottom_margin = Pt(60)
-        section.left_margin = Pt(60)
-        section.right_margin = Pt(60)
-        section._sectPr.append(borders)
-    else:
-        for border_type in ['top', 'left', 'bottom', 'right']:
-            border = OxmlElement(f'w:{border_type}')
-            border.set(qn('w:val'), 'single')  # Set border style
-            border.set(qn('w:sz'), '10')  # Border size (in half-points)
-            border.set(qn('w:space'), '10')  # Space around the border
-            borders.append(border)
-        section.top_margin = Pt(20)
-        section.bottom_margin = Pt(20)
-        section.left_margin = Pt(20)
-        section.right_margin = Pt(20)
-        section._sectPr.append(borders)
-
-
-    # Add the borders to the section's properties
-
-
-def set_vertical_alignment(cell, alignment):
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import os
+import instrumentation
+from logo_cache import default_resolver
+from pdf_renderer import render_pdf, render_pdf_bytes
+from performance_cube import cube_from_workbook
+from report_manifest import ReportManifest, report_fingerprint
+from report_parser import parse_report, report_file_name, report_size
+from table_builder import build_table
+from validate_workbook import NO_EXAM_BLOCK_ERROR, layout_error, validate_block
+from workbook_cache import WorkbookCache
+from workbook_reader import NON_STUDENT_SHEETS, iter_student_sheets, split_exam_blocks
+from report_template import DETAILS_PARAGRAPH_INDEX, HEADING_STYLE, SUBHEADING_STYLE, default_template
+
+# Bump whenever a change to the renderer or template changes the documents,
+# so incremental runs rebuild every report
+RENDER_VERSION = 2
+
+def render_fingerprint(report, logo_resolver=None):
     """
-    Set the vertical alignment for a table cell.
+    Fingerprint of a report with its resolved logo and RENDER_VERSION (see report_fingerprint).
 
     Parameters:
-    - cell: The cell object from python-docx.
-    - alignment: The desired alignment ('top', 'center', 'bottom').
+    - report: StudentReport produced by report_parser.parse_report.
+    - logo_resolver: LogoResolver used to load the logo (defaults to the one shared by this process).
     """
-    # Get the cell's properties
-    cell_properties = cell._element.get_or_add_tcPr()
-
-    # Create a new vertical alignment element
-    v_align = OxmlElement('w:vAlign')
-    v_align.set(qn('w:val'), alignment)
-
-    # Append the vertical alignment to the cell properties
-    cell_properties.append(v_align)
-
-def set_column_widths(table, column_indices, width_in_inches):
-    """
-    Set custom widths for specified columns in a table.
-
-    Parameters:
-    - table: The table object from python-docx.
-    - column_indices: List of column indices to adjust.
-    - width_in_inches: The desired width in inches for the specified columns.
-    """
-    for row in table.rows:
-        for col_idx in column_indices:
-            if col_idx < len(row.cells):
-                cell = row.cells[col_idx]
-                cell_width = cell._element
-                tc_width = cell_width.get_or_add_tcPr()
-                tcW = OxmlElement('w:tcW')
-                tcW.set(qn('w:w'), str(int(width_in_inches * 1440)))  # Inches to twips
-                tcW.set(qn('w:type'), 'dxa')
-                tc_width.append(tcW)
+    logo_url = report.details.get("LOGO")
+    logo = (logo_resolver or default_resolver()).resolve(logo_url) if logo_url else None
+    return report_fingerprint(report, logo, RENDER_VERSION)
 
 def generate_report(file_path, sheet_name, column_start, column_end):
     """
@@ -93,441 +48,580 @@ def generate_report(file_path, sheet_name, column_start, column_end):
     """
     # Load Excel file
     try:
-        xls = pd.ExcelFile(file_path)
+        with instrumentation.phase("load", path=file_path):
+            xls = pd.ExcelFile(file_path)
     except Exception as e:
         print(f"Error loading Excel file: {e}")
+        instrumentation.error("Error loading Excel file", e, path=file_path)
         return None
 
     # Validate sheet name
     if sheet_name not in xls.sheet_names or sheet_name.upper() == "RESOURCE":
         print("Invalid Sheet Name or it's a RESOURCE sheet.")
+        instrumentation.error("Invalid Sheet Name or it's a RESOURCE sheet.", sheet=sheet_name)
         return None
 
     # Load the specified sheet without headers
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=f"{column_start}:{column_end}", header=None)
+        with instrumentation.phase("read", sheet=sheet_name) as read_metrics:
+            df = xls.parse(sheet_name, usecols=f"{column_start}:{column_end}", header=None)
+            read_metrics["rows"] = len(df)
     except Exception as e:
         print(f"Error reading the sheet: {e}")
+        instrumentation.error("Error reading the sheet", e, sheet=sheet_name)
         return None
 
-    # Initialize Document
-    doc = Document()
+    with instrumentation.report_context(sheet=sheet_name):
+        return build_report(df)
 
-    # Variables to track the current position
-    row_idx = 0
-    num_rows = df.shape[0]
+def generate_exam_reports(file_path, sheet_name, output_dir="/"):
+    """
+    Generate the reports of every exam of one student from a single sheet read.
 
-    # FRONT PAGE: Student Details
-    student_details = {}
-    if row_idx + 1 < num_rows:
-        headers = df.iloc[row_idx].tolist()
-        values = df.iloc[row_idx + 1].tolist()
+    Parameters:
+    - file_path: Path to the Excel file.
+    - sheet_name: Name of the sheet corresponding to the student ID.
+    - output_dir: Directory the .docx reports are written to.
 
-        for header, value in zip(headers, values):
-            if header == "EXAM TYPE":
-                fileName = value
-            if pd.notna(header) and pd.notna(value):
-                student_details[header.strip().upper()] = value
-        row_idx += 3  # Move past headers and values
+    Returns:
+    - Dictionary mapping exam type to the generated report path (None if it failed).
+    """
+    # Load Excel file
+    try:
+        with instrumentation.phase("load", path=file_path):
+            xls = pd.ExcelFile(file_path)
+    except Exception as e:
+        print(f"Error loading Excel file: {e}")
+        instrumentation.error("Error loading Excel file", e, path=file_path)
+        return {}
 
+    # Validate sheet name
+    if sheet_name not in xls.sheet_names or sheet_name.strip().upper() in NON_STUDENT_SHEETS:
+        print("Invalid Sheet Name or it's a RESOURCE sheet.")
+        instrumentation.error("Invalid Sheet Name or it's a RESOURCE sheet.", sheet=sheet_name)
+        return {}
 
-    for _ in range(5):  # Adjust the number of paragraphs as needed
-        doc.add_paragraph()  # Add empty paragraph
+    # Load the whole sheet once and slice the exam blocks in memory
+    try:
+        with instrumentation.phase("read", sheet=sheet_name) as read_metrics:
+            df = xls.parse(sheet_name, header=None)
+            read_metrics["rows"] = len(df)
+    except Exception as e:
+        print(f"Error reading the sheet: {e}")
+        instrumentation.error("Error reading the sheet", e, sheet=sheet_name)
+        return {}
+
+    os.makedirs(output_dir, exist_ok=True)
+    report_paths = {}
+    for exam_type, block in split_exam_blocks(df):
+        with instrumentation.report_context(sheet=sheet_name, exam=exam_type):
+            report_paths[exam_type] = build_report(block, output_dir)
+    return report_paths
 
-    # Add Front Page Title
-    title = doc.add_paragraph()
-    run = title.add_run("STUDENT ANALYSIS REPORT")
-    run.font.size = Pt(24)
-    run.bold = True
-    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+def build_report(df, output_dir="/", file_prefix=""):
+    """
+    Build and save a student analysis report from an already loaded sheet.
+
+    Parameters:
+    - df: DataFrame holding the exam column window of one student sheet (no headers).
+    - output_dir: Directory the .docx report is written to.
+    - file_prefix: Text prepended to the report file name (e.g., the student ID).
+
+    Returns:
+    - Path to the generated .docx report, or None if it could not be saved.
+    """
+    return render_report(timed_parse(df), output_dir, file_prefix)
+
+def timed_parse(df):
+    """parse_report inside a 'parse' instrumentation phase recording the sheet rows and report tables."""
+    with instrumentation.phase("parse", rows=len(df)) as parse_metrics:
+        report = parse_report(df)
+        parse_metrics["tables"] = report_size(report)["tables"]
+    return report
+
+def _cell_text(value):
+    """Text shown in a table cell for a raw sheet value."""
+    return str(value).strip() if value is not None else ""
+
+def _add_marks_table(doc, table_data, style):
+    """
+    Add a unit-wise or topic-wise table to the document.
+
+    Parameters:
+    - doc: The Document object from python-docx.
+    - table_data: ReportTable with the headers and rows of the table.
+    - style: Table style name.
+    """
+    # Change background color for "OVERALL %" column if below 50
+    overall_idx = table_data.overall_idx
+    shaded_cells = []
+    if overall_idx != -1:
+        for row_idx, table_row in enumerate(table_data.rows):
+            cell_value = table_row[overall_idx]
+            if isinstance(cell_value, (int, float)) and cell_value < 50:
+                shaded_cells.append((row_idx, overall_idx))
+
+    # Adjust column widths for specific columns
+    column_widths = {}
+    if table_data.obtained_idx != -1:
+        column_widths[table_data.obtained_idx] = 1.0  # Adjust "OBTAINED MARKS"
+
+    rows = [[_cell_text(cell_value) for cell_value in table_row] for table_row in table_data.rows]
+    return build_table(doc, table_data.headers, rows, style, header_font_size=9,
+                       shaded_cells=shaded_cells, column_widths=column_widths)
+
+def build_document(report, template=None, logo_resolver=None):
+    """
+    Build the .docx document of a parsed student report in memory.
+
+    Parameters:
+    - report: StudentReport produced by report_parser.parse_report.
+    - template: ReportTemplate to clone (defaults to the one shared by this process).
+    - logo_resolver: LogoResolver used to load the logo (defaults to the one shared by this process).
+
+    Returns:
+    - python-docx Document, or None if the report has no EXAM TYPE.
+    """
+    if report.exam_type is None:
+        print("Missing EXAM TYPE in the student details.")
+        instrumentation.error("Missing EXAM TYPE in the student details.", student=report.details.get("ID"))
+        return None
+    student_details = report.details
+
+    # Initialize Document from the prebuilt skeleton
+    doc = (template or default_template()).new_document()
+    details_paragraph = doc.paragraphs[DETAILS_PARAGRAPH_INDEX]
 
     # Insert Logo if available
     logo_url = student_details.get("LOGO")
     if logo_url:
-        try:
-            # Modify the URL to access the raw image content if it's a Google Drive link
-            if "drive.google.com" in logo_url:
-                file_id = logo_url.split('/d/')[1].split('/')[0]
-                logo_url = f"https://drive.google.com/uc?id={file_id}"
-
-            response = requests.get(logo_url)
-            if response.status_code == 200:
-                image = BytesIO(response.content)
-                doc.add_picture(image, width=Inches(2))
-                last_paragraph = doc.paragraphs[-1]
-                last_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        except Exception as e:
-            print("Error loading logo:", e)
-
-    # Add Student Details
-    details_paragraph = doc.add_paragraph()
-    details_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    details_run = details_paragraph.add_run()
-
-    student_info_keys = ["ID", "NAME", "STANDARD", "SECTION", "EXAM TYPE", "SCHOOL NAME"]
-    details_text = ""
-    for key in student_info_keys:
-        value = student_details.get(key.upper(), "N/A")
-        details_text += f"{key}: {value}\n"
-
-    details_run.text = details_text.strip()
-    details_run.font.size = Pt(14)
-    details_run.font.bold = False
-
-    # Add some spacing
-    doc.add_paragraph().add_run("\n")
-
-    # SECOND PAGE: Overall Summary Table
-    # Add page break
-    doc.add_page_break()
-
-    for _ in range(6):  # Adjust the number of paragraphs as needed
-        doc.add_paragraph()  # Add empty paragraph
-
-
-    # Overall Summary Heading
-    overall_heading = doc.add_heading("OVERALL PERFORMANCE SUMMARY", level=1)
-    run = overall_heading.runs[0]
-    run.font.color.rgb = RGBColor(31, 73, 125)  # Set the color (e.g., blue)
-    run.font.name = 'Calibri'  # Set font style (e.g., Arial)
-    run.font.size = Pt(18)  # Set font size
-    run.font.bold = True  # Set bold if desired
-
-    # Ensure font style is applied correctly
-    overall_heading.style.font.name = 'Calibri'
-    overall_heading.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-    # Read Overall Summary Table Headers
-    if row_idx < num_rows:
-        overall_headers = df.iloc[row_idx].dropna().tolist()
-        row_idx += 1
-    else:
-        overall_headers = []
-
-    for _ in range(2):  # Adjust the number of paragraphs as needed
-        doc.add_paragraph()  # Add empty paragraph
-
-    # Create Overall Summary Table
-    if overall_headers:
-        overall_table = doc.add_table(rows=1, cols=len(overall_headers))
-        overall_table.style = 'Colorful List Accent 2'
-
-        overall_table.autofit = False
-
-        # Set the width of the table (in inches)
-        table_width = Inches(6)  # Adjust as needed
-        overall_table.width = table_width
-
-        # Set widths for each column (adjust as needed)
-        for column in overall_table.columns:
-            column.width = Inches(2)
-
-        hdr_cells = overall_table.rows[0].cells
-        for i, header in enumerate(overall_headers):
-            hdr_cells[i].text = str(header).strip()
-            hdr_cells[i].paragraphs[0].runs[0].font.bold = True
-            hdr_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            #tttt
-        overall_table.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-        for row in overall_table.rows:
-            for cell in row.cells:
-                set_vertical_alignment(cell, 'center')#added
-                # Clear existing paragraphs and create a new one if necessary
-                if not cell.paragraphs:
-                    cell.add_paragraph("")  # Ensure there's at least one paragraph
-
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.size = Pt(14)
-
-                    # Optionally, if you want to set the font size for text added later
-                    # This ensures that any new text added to the paragraph will also have the font size
-                    if paragraph.text:  # Only apply if there's text
-                        run = paragraph.add_run()  # Add a new run if needed
-                        run.font.size = Pt(14)
-
-
-        # Fill Overall Summary Table with Data
-        while row_idx < num_rows and not df.iloc[row_idx].isna().all():
-            row = df.iloc[row_idx].tolist()
-            # Ensure the row has the same number of columns as headers
-            if len(row) < len(overall_headers):
-                row += [""] * (len(overall_headers) - len(row))
-            row = row[:len(overall_headers)]
-            # Add row to table
-            row_cells = overall_table.add_row().cells
-
-            for i, cell_value in enumerate(row):
-                row_cells[i].text = str(cell_value).strip() if pd.notna(cell_value) else ""
-                # Align numeric columns to center or right if needed
-
-                row_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                set_vertical_alignment(row_cells[i], 'center') #added
-                for paragraph in row_cells[i].paragraphs:
-                    for run in paragraph.runs:
-                        run.font.size = Pt(14)
-            row_idx += 1
-
-    # Skip any empty rows
-    while row_idx < num_rows and df.iloc[row_idx].isna().all():
-        row_idx += 1
-
-    # SUBJECT PAGES: Unit-wise and Topic-wise tables
-    while row_idx < num_rows:
-        current_row = df.iloc[row_idx].tolist()
-
-        # Check if the row indicates a new subject
-        if pd.notna(current_row[0]) and str(current_row[0]).strip() == "Subject":
-            # Get Subject Name
-            subject_name = current_row[1] if len(current_row) > 1 and pd.notna(current_row[1]) else "Unknown Subject"
-
+        with instrumentation.phase("logo") as logo_metrics:
+            content = (logo_resolver or default_resolver()).resolve(logo_url)
+            logo_metrics["bytes"] = len(content) if content else 0
+        if content:
+            try:
+                logo_paragraph = details_paragraph.insert_paragraph_before()
+                logo_paragraph.add_run().add_picture(BytesIO(content), width=Inches(2))
+                logo_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+            except Exception as e:
+                print("Error loading logo:", e)
+                instrumentation.error("Error loading logo", e, url=logo_url)
+
+    # Lay out the details and the tables
+    with instrumentation.phase("tables", **report_size(report)):
+        # Add Student Details
+        student_info_keys = ["ID", "NAME", "STANDARD", "SECTION", "EXAM TYPE", "SCHOOL NAME"]
+        details_text = ""
+        for key in student_info_keys:
+            value = student_details.get(key.upper(), "N/A")
+            details_text += f"{key}: {value}\n"
+
+        details_paragraph.runs[0].text = details_text.strip()
+
+        # Create Overall Summary Table
+        overall_headers = report.overall.headers if report.overall is not None else ()
+        if overall_headers:
+            rows = [[_cell_text(cell_value) for cell_value in row] for row in report.overall.rows]
+            # Set widths for each column (adjust as needed)
+            overall_table = build_table(doc, overall_headers, rows, 'Colorful List Accent 2',
+                                        header_font_size=14, font_size=14,
+                                        vertical_alignment='center', grid_width=2)
+            overall_table.autofit = False
+
+        # SUBJECT PAGES: Unit-wise and Topic-wise tables
+        for subject in report.subjects:
             # Add page break for each subject
             doc.add_page_break()
 
-            for _ in range(0):  # Adjust the number of paragraphs as needed
-                doc.add_paragraph()  # Add empty paragraph
-
             # Subject Heading
-            subject_heading = doc.add_heading(f"{subject_name}", level=1)
-            run = subject_heading.runs[0]
-            run.font.color.rgb = RGBColor(31, 73, 125)  # Set the color (e.g., blue)
-            run.font.name = 'Calibri'  # Set font style (e.g., Arial)
-            run.font.size = Pt(18)  # Set font size
-            run.font.bold = True  # Set bold if desired
+            doc.add_paragraph(f"{subject.name}", style=HEADING_STYLE)
 
-            # Ensure font style is applied correctly
-            subject_heading.style.font.name = 'Calibri'
-            subject_heading.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+            for _ in range(1):  # Adjust the number of paragraphs as needed
+                doc.add_paragraph()  # Add empty paragraph
 
+            # UNIT-WISE REPORT
+            if subject.units is None:
+                continue
+            last_paragraph = doc.add_paragraph("UNIT-WISE ANALYSIS", style=SUBHEADING_STYLE)
+            if subject.units.headers:
+                _add_marks_table(doc, subject.units, 'Medium Shading 1 Accent 3')
+
+            # TOPIC-WISE REPORT
+            if subject.topics is None:
+                continue
+            # Check if the Topic-wise section starts at the end of the page
+            if last_paragraph.text.strip() == "":
+                doc.add_page_break()  # Add a page break if the last paragraph is not empty
             for _ in range(1):  # Adjust the number of paragraphs as needed
                 doc.add_paragraph()  # Add empty paragraph
+            doc.add_paragraph("TOPIC-WISE ANALYSIS", style=SUBHEADING_STYLE)
+            if subject.topics.headers:
+                _add_marks_table(doc, subject.topics, 'Medium Shading 1 Accent 4')
 
-            row_idx += 1  # Move to Unit-wise Report heading
-            # UNIT-WISE REPORT light
-            if row_idx < num_rows:
-                # Add Unit-wise Heading
-                unit_heading = doc.add_heading("UNIT-WISE ANALYSIS", level=2)
-                run = unit_heading.runs[0]
-                run.font.color.rgb = RGBColor(31, 73, 125)  # Set the color (e.g., blue)
-                run.font.name = 'Calibri'  # Set font style (e.g., Arial)
-                run.font.size = Pt(14)  # Set font size
-                run.font.bold = True  # Set bold if desired
-
-                # Ensure font style is applied correctly
-                unit_heading.style.font.name = 'Calibri'
-                unit_heading.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                for _ in range(0):  # Adjust the number of paragraphs as needed
-                    doc.add_paragraph()  # Add empty paragraph
-
-                # Read Unit-wise Table Headers
-                unit_headers = df.iloc[row_idx].dropna().tolist()
-                row_idx += 1
-
-                if unit_headers:
-                    unit_table = doc.add_table(rows=1, cols=len(unit_headers))
-                    unit_table.style = 'Medium Shading 1 Accent 3'
-                    hdr_cells = unit_table.rows[0].cells
-                    for i, header in enumerate(unit_headers):
-                        hdr_cells[i].text = str(header).strip()
-                        hdr_cells[i].paragraphs[0].runs[0].font.bold = True
-                        hdr_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                    #ttt
-                    unit_table.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                    # Reduce font size for table content
-                    for row in unit_table.rows:
-                        for cell in row.cells:
-                            for paragraph in cell.paragraphs:
-                                for run in paragraph.runs:
-                                    run.font.size = Pt(9)
-
-                    # Identify the index of "OBTAINED MARKS" and "PERFORMANCE %" columns
-                    try:
-                        obtained_marks_idx = unit_headers.index("OBTAINED MARKS")
-                        performance_idx = unit_headers.index("PERFORMANCE %")
-                        overall_idx = unit_headers.index("OVERALL %")
-                    except ValueError:
-                        obtained_marks_idx = -1  # Column not found
-                        performance_idx = -1  # Column not found
-                        overall_idx = -1
-
-                    # Fill Unit-wise Table with Data
-                    while row_idx < num_rows and not df.iloc[row_idx].isna().all():
-                        unit_row = df.iloc[row_idx].tolist()
-                        if len(unit_row) < len(unit_headers):
-                            unit_row += [""] * (len(unit_headers) - len(unit_row))
-                        unit_row = unit_row[:len(unit_headers)]
-
-                        # Check "OBTAINED MARKS" value
-                        if obtained_marks_idx != -1:
-                            obtained_marks = str(unit_row[obtained_marks_idx]).strip()
-                            if obtained_marks == "0/0":
-                                row_idx += 1
-                                continue  # Skip this row
-
-
-                        # Add row to table
-                        row_cells = unit_table.add_row().cells
-                        for i, cell_value in enumerate(unit_row):
-                            row_cells[i].text = str(cell_value).strip() if pd.notna(cell_value) else ""
-                            # Align numeric columns to center or right if needed
-                            row_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                            # Change background color for "PERFORMANCE %" column if below 50
-                            if overall_idx != -1 and i == overall_idx:
-                                if isinstance(cell_value, (int, float)) and cell_value < 50:
-                                    cell = row_cells[i]._element
-                                    cell_properties = cell.get_or_add_tcPr()
-                                    cell_shading = OxmlElement('w:shd')
-                                    cell_shading.set(qn('w:fill'), '#FF8585')  # Red color
-                                    cell_properties.append(cell_shading)
-
-                        row_idx += 1
-
-                    # Adjust column widths for specific columns
-                    if obtained_marks_idx != -1:
-                        set_column_widths(unit_table, [obtained_marks_idx], 1.0)  # Adjust "OBTAINED MARKS"
-
-                # Skip the single empty row between Unit-wise and Topic-wise tables
-                while row_idx < num_rows and df.iloc[row_idx].isna().all():
-                    row_idx += 1
-
-                # TOPIC-WISE REPORT
-                if row_idx < num_rows:
-                    # Check if the Topic-wise section starts at the end of the page
-                    if len(doc.paragraphs) > 0 and doc.paragraphs[-1].text.strip() == "":
-                        doc.add_page_break()  # Add a page break if the last paragraph is not empty\
-                    for _ in range(1):  # Adjust the number of paragraphs as needed
-                        doc.add_paragraph()  # Add empty paragraph
-                    # Add Topic-wise Heading
-                    topic_heading = doc.add_heading("TOPIC-WISE ANALYSIS", level=2)
-                    run = topic_heading.runs[0]
-                    run.font.color.rgb = RGBColor(31, 73, 125)  # Set the color (e.g., blue)
-                    run.font.name = 'Calibri'  # Set font style (e.g., Arial)
-                    run.font.size = Pt(14)  # Set font size
-                    run.font.bold = True  # Set bold if desired
-
-                    # Ensure font style is applied correctly
-                    topic_heading.style.font.name = 'Calibri'
-                    topic_heading.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                    for _ in range(0):  # Adjust the number of paragraphs as needed
-                        doc.add_paragraph()  # Add empty paragraph
-
-                    # Read Topic-wise Table Headers
-                    topic_headers = df.iloc[row_idx].dropna().tolist()
-                    row_idx += 1
-
-                    if topic_headers:
-                        topic_table = doc.add_table(rows=1, cols=len(topic_headers))
-                        topic_table.style = 'Medium Shading 1 Accent 4'
-                        hdr_cells = topic_table.rows[0].cells
-                        for i, header in enumerate(topic_headers):
-                            hdr_cells[i].text = str(header).strip()
-                            hdr_cells[i].paragraphs[0].runs[0].font.bold = True
-                            hdr_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                        #ttt
-                        topic_table.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                        # Reduce font size for table content
-                        for row in topic_table.rows:
-                            for cell in row.cells:
-                                for paragraph in cell.paragraphs:
-                                    for run in paragraph.runs:
-                                        run.font.size = Pt(9)
-
-                        # Identify the index of "OBTAINED MARKS" and "PERFORMANCE %" columns
-                        try:
-                            obtained_marks_idx_topic = topic_headers.index("OBTAINED MARKS")
-                            performance_idx_topic = topic_headers.index("PERFORMANCE %")
-                            overall_idx_topic = topic_headers.index("OVERALL %")
-                        except ValueError:
-                            obtained_marks_idx_topic = -1  # Column not found
-                            performance_idx_topic = -1  # Column not found
-                            overall_idx_topic = -1
-
-
-                        # Fill Topic-wise Table with Data
-                        while row_idx < num_rows and not df.iloc[row_idx].isna().all():
-                            topic_row = df.iloc[row_idx].tolist()
-                            if len(topic_row) < len(topic_headers):
-                                topic_row += [""] * (len(topic_headers) - len(topic_row))
-                            topic_row = topic_row[:len(topic_headers)]
-
-                            # Check "OBTAINED MARKS" value
-                            if obtained_marks_idx_topic != -1:
-                                obtained_marks_topic = str(topic_row[obtained_marks_idx_topic]).strip()
-                                if obtained_marks_topic == "0/0":
-                                    row_idx += 1
-                                    continue  # Skip this row
-
-                            # Add row to table
-                            row_cells = topic_table.add_row().cells
-                            for i, cell_value in enumerate(topic_row):
-                                row_cells[i].text = str(cell_value).strip() if pd.notna(cell_value) else ""
-                                row_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-                                # Change background color for "PERFORMANCE %" column if below 50
-                                if overall_idx_topic != -1 and i == overall_idx_topic:
-                                    if isinstance(cell_value, (int, float)) and cell_value < 50:
-                                        cell = row_cells[i]._element
-                                        cell_properties = cell.get_or_add_tcPr()
-                                        cell_shading = OxmlElement('w:shd')
-                                        cell_shading.set(qn('w:fill'), '#FF8585')  # Red color
-                                        cell_properties.append(cell_shading)
-
-                            row_idx += 1
-
-                        # Adjust column widths for specific columns
-                        if obtained_marks_idx_topic != -1:
-                            set_column_widths(topic_table, [obtained_marks_idx_topic], 1.0)  # Adjust "OBTAINED MARKS"
-
-        elif pd.notna(current_row[0]) and str(current_row[0]).strip().upper() == "END":
-            # Terminate processing if "END" is found
-            break
-        else:
-            # Move to next row if current row doesn't indicate a subject
-            row_idx += 1
+    return doc
+
+def render_report(report, output_dir="/", file_prefix="", template=None, logo_resolver=None):
+    """
+    Render a parsed student report to a .docx file.
+
+    Parameters:
+    - report: StudentReport produced by report_parser.parse_report.
+    - output_dir: Directory the .docx report is written to.
+    - file_prefix: Text prepended to the report file name (e.g., the student ID).
+    - template: ReportTemplate to clone (defaults to the one shared by this process).
+    - logo_resolver: LogoResolver used to load the logo (defaults to the one shared by this process).
+
+    Returns:
+    - Path to the generated .docx report, or None if it could not be saved.
+    """
+    doc = build_document(report, template, logo_resolver)
+    if doc is None:
+        return None
 
-        # Skip any remaining empty rows before the next subject
-        while row_idx < num_rows and df.iloc[row_idx].isna().all():
-            row_idx += 1
-    add_page_borders(doc.sections[-1], False)
     # Save Document
-    output_path = f"/{fileName}_Report.docx"
+    output_path = os.path.join(output_dir, report_file_name(report, file_prefix))
     try:
-        doc.save(output_path)
+        with instrumentation.phase("save", path=output_path) as save_metrics:
+            doc.save(output_path)
+            save_metrics["bytes"] = os.path.getsize(output_path)
         print(f"Report successfully generated: {output_path}")
         return output_path
     except Exception as e:
         print(f"Error saving the document: {e}")
+        instrumentation.error("Error saving the document", e, path=output_path)
         return None
 
-# Execution Block
-if __name__ == "__main__":
-    import os
-    # Prompt user for the file path
-    file_path = r"C:\Users\Sanjay\student_data.xlsx"  # Use raw string (r"") for Windows paths
+def render_report_bytes(report, template=None, logo_resolver=None):
+    """Render a parsed student report to the bytes of a .docx file (None if it has no EXAM TYPE)."""
+    doc = build_document(report, template, logo_resolver)
+    if doc is None:
+        return None
+    buffer = BytesIO()
+    with instrumentation.phase("save") as save_metrics:
+        doc.save(buffer)
+        save_metrics["bytes"] = buffer.tell()
+    return buffer.getvalue()
+
+# Report renderers by output format: callable(report, output_dir, file_prefix)
+# returning the written path (or None), and the file extension it writes
+RENDERERS = {
+    "docx": (render_report, ".docx"),
+    "pdf": (render_pdf, ".pdf"),
+}
+
+# In-memory renderers by output format: callable(report) returning the file's bytes (or None)
+BYTE_RENDERERS = {
+    "docx": render_report_bytes,
+    "pdf": render_pdf_bytes,
+}
+
+def _iter_sheet_frames(xls, column_window, on_error):
+    """Yield (sheet name, DataFrame) for every student sheet of an open workbook."""
+    column_start, column_end = column_window
+    usecols = f"{column_start}:{column_end}" if column_start else None
+    for sheet_name in xls.sheet_names:
+        if sheet_name.strip().upper() in NON_STUDENT_SHEETS:
+            continue
+        try:
+            with instrumentation.phase("read", sheet=sheet_name) as read_metrics:
+                df = xls.parse(sheet_name, usecols=usecols, header=None)
+                read_metrics["rows"] = len(df)
+        except Exception as e:
+            on_error(sheet_name, e)
+            continue
+        yield sheet_name, df
+
+def _render_keyed(renderer, key, report, output_dir, file_prefix):
+    """Run a renderer with the key of the report attached to its instrumentation events."""
+    sheet, exam = key if isinstance(key, tuple) else (key, report.exam_type)
+    with instrumentation.report_context(sheet=sheet, exam=exam):
+        return renderer(report, output_dir, file_prefix)
+
+def render_reports(reports, output_dir, max_workers=None, force=False, output_format="docx", max_in_flight=None):
+    """
+    Render parsed reports in parallel on a process pool.
+
+    Reports whose input is unchanged since the last run (see ReportManifest)
+    are not rendered again.
+
+    Parameters:
+    - reports: Dictionary mapping a key to a (StudentReport, file_prefix)
+      pair, or an iterable of (key, (StudentReport, file_prefix)) items. An
+      iterable is consumed lazily, so the next reports are parsed while the
+      pool renders the previous ones.
+    - output_dir: Directory the reports are written to.
+    - max_workers: Number of worker processes (defaults to the CPU count);
+      0 renders the reports one after the other in this process (for
+      profiling).
+    - force: Rebuild every report, even those the output directory's
+      manifest records as up to date.
+    - output_format: Key of RENDERERS selecting the output ('docx' or 'pdf').
+    - max_in_flight: Maximum number of reports submitted to the pool and not
+      yet collected (defaults to four per worker); bounds the parsed reports
+      held in memory.
 
-    if not os.path.exists(file_path):
-        print("The specified file path does not exist. Please check and try again.")
+    Returns:
+    - Tuple (results, errors): results maps each key to its report path,
+      errors maps each key to the reason its report was not generated.
+    """
+    results = {}
+    errors = {}
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    renderer, extension = RENDERERS[output_format]
+    manifest = ReportManifest(output_dir, RENDER_VERSION)
+    resolver = default_resolver()
+    items = reports.items() if isinstance(reports, dict) else reports
+    in_progress = {}  # key -> (file name, fingerprint) of the reports being rendered
+    skipped = 0
+
+    def pending():
+        # Skip the reports whose sheet data, logo and renderer are unchanged
+        nonlocal skipped
+        for key, (report, file_prefix) in items:
+            file_name = report_file_name(report, file_prefix, extension)
+            # Resolving the logo here also downloads each distinct logo once, so the workers find it in the disk cache
+            fingerprint = render_fingerprint(report, resolver)
+            report_path = manifest.is_current(file_name, fingerprint) if not force else None
+            if report_path:
+                results[key] = report_path
+                skipped += 1
+                continue
+            in_progress[key] = (file_name, fingerprint)
+            yield key, report, file_prefix
+
+    def collect(key, result):
+        file_name, fingerprint = in_progress.pop(key)
+        try:
+            report_path = result()
+        except Exception as e:
+            errors[key] = f"Error generating the report: {e}"
+            instrumentation.error("Error generating the report", e, key=key)
+            return
+        if report_path:
+            results[key] = report_path
+            manifest.record(file_name, fingerprint, report_path)
+        else:
+            errors[key] = "Error saving the document."
+
+    if max_workers == 0:
+        # Render in this process, so profilers see the rendering
+        for key, report, file_prefix in pending():
+            collect(key, lambda: _render_keyed(renderer, key, report, output_dir, file_prefix))
     else:
-        # Prompt user for the Student ID (which corresponds to the sheet name)
-        student_id = "1001"  # Replace with user input or predefined value
+        # Render the documents in parallel, with at most max_in_flight reports queued
+        max_in_flight = max_in_flight or 4 * (max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+            for key, report, file_prefix in pending():
+                in_flight[executor.submit(_render_keyed, renderer, key, report, output_dir, file_prefix)] = key
+                while len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(in_flight.pop(future), future.result)
+            for future in list(in_flight):
+                collect(in_flight.pop(future), future.result)
+
+    if skipped:
+        print(f"Skipping {skipped} unchanged report(s).")
+    manifest.save()
+    return results, errors
+
+def generate_all_reports(file_path, column_start, column_end, output_dir, max_workers=None, all_exams=False, use_cache=False, force=False, streaming=False, output_format="docx", use_cube=False, validate=True):
+    """
+    Generate the reports of every student in the workbook.
 
-        # Define the column range (e.g., A-H). Adjust as needed for different exams.
-        column_start = "AC"
-        column_end = "AJ"
+    The workbook is opened once and each student sheet is parsed once; the
+    parsed reports are then rendered in parallel on a process pool. Reports
+    whose input is unchanged since the last run (see ReportManifest) are
+    not rendered again. The layout of every exam block is checked before it
+    is parsed (see validate_workbook); blocks with layout errors are
+    reported in errors instead of being rendered.
 
-        # Generate the report
-        report_path = generate_report(file_path, sheet_name=student_id, column_start=column_start, column_end=column_end)
+    Parameters:
+    - file_path: Path to the Excel file.
+    - column_start: Starting column (e.g., 'A').
+    - column_end: Ending column (e.g., 'H').
+    - output_dir: Directory the reports are written to.
+    - max_workers: Number of worker processes (defaults to the CPU count;
+      0 renders in this process).
+    - all_exams: Ignore the column range and generate the report of every
+      exam block found in each sheet (see split_exam_blocks).
+    - use_cache: Read the sheets through the columnar WorkbookCache instead
+      of parsing the workbook on every run.
+    - force: Rebuild every report, even those the output directory's
+      manifest records as up to date.
+    - streaming: Stream the sheets one at a time through openpyxl's
+      read-only mode (see workbook_reader) and hand each parsed report to
+      the pool right away, with a bounded number in flight, to keep memory
+      flat on very large workbooks; takes precedence over use_cache.
+    - output_format: Key of RENDERERS selecting the output ('docx' or 'pdf').
+    - use_cube: Hold the parsed class in one PerformanceCube (see
+      performance_cube) instead of a report per sheet, and slice each
+      report out of it; the sheets are streamed.
+    - validate: Check the layout of every exam block first.
 
-        # If report is generated successfully, inform the user
-        if report_path and os.path.exists(report_path):
-            print(f"Report generated successfully. You can find it here: {report_path}")
+    Returns:
+    - Tuple (results, errors): results maps sheet name to report path,
+      errors maps sheet name to the reason its report was not generated.
+      With all_exams the keys are (sheet name, exam type) pairs.
+    """
+    results = {}
+    errors = {}
+
+    def record_error(sheet_name, e):
+        errors[sheet_name] = f"Error reading the sheet: {e}"
+        instrumentation.error("Error reading the sheet", e, sheet=sheet_name)
+
+    layout_issues = []
+
+    def valid_layout(key, block):
+        # Keep blocks with layout errors out of rendering, and count their warnings
+        if not validate:
+            return True
+        with instrumentation.phase("validate", rows=len(block)):
+            issues = validate_block(block)
+        layout_issues.extend(issues)
+        error = layout_error(issues)
+        if error:
+            errors[key] = error
+            instrumentation.error(error)
+        return error is None
+
+    def load_error(e):
+        print(f"Error loading Excel file: {e}")
+        instrumentation.error("Error loading Excel file", e, path=file_path)
+
+    def block_context(sheet_name, exam_type):
+        return instrumentation.report_context(sheet=sheet_name, exam=exam_type) if all_exams else instrumentation.report_context(sheet=sheet_name)
+
+    def sheet_blocks(sheet_name, df):
+        # The (exam type, block) pairs of a student sheet without layout errors
+        if not all_exams:
+            with block_context(sheet_name, None):
+                return [(None, df)] if valid_layout(sheet_name, df) else []
+        blocks = split_exam_blocks(df)
+        if validate and not blocks:
+            errors[sheet_name] = NO_EXAM_BLOCK_ERROR
+        valid = []
+        for exam_type, block in blocks:
+            with block_context(sheet_name, exam_type):
+                if valid_layout((sheet_name, exam_type), block):
+                    valid.append((exam_type, block))
+        return valid
+
+    def parse_sheets(sheet_frames):
+        # Validate and parse the student sheets one at a time, each report prefixed with its sheet name
+        try:
+            for sheet_name, df in sheet_frames:
+                try:
+                    parsed = []
+                    for exam_type, block in sheet_blocks(sheet_name, df):
+                        with block_context(sheet_name, exam_type):
+                            parsed.append(((sheet_name, exam_type) if all_exams else sheet_name, timed_parse(block)))
+                except Exception as e:
+                    record_error(sheet_name, e)
+                    continue
+                for key, report in parsed:
+                    yield key, (report, f"{sheet_name}_")
+        except Exception as e:
+            load_error(e)
+
+    column_window = (None, None) if all_exams else (column_start, column_end)
+    xls = None
+    try:
+        if use_cube:
+            # Stream the sheets into one class-wide PerformanceCube and slice the reports out of it
+            with instrumentation.phase("cube", path=file_path) as cube_metrics:
+                cube = cube_from_workbook(file_path, *column_window, on_error=record_error, select_blocks=sheet_blocks)
+                cube_metrics["rows"] = len(cube.students)
+                cube_metrics["bytes"] = cube.nbytes
+            # Slice each report out of the cube only when the pool is ready for it
+            reports = (((key if all_exams else key[0]), (report, f"{key[0]}_")) for key, report in cube.reports())
+        elif streaming:
+            # Stream one sheet window at a time through openpyxl's read-only mode,
+            # handing each report to the pool as soon as it is parsed
+            reports = parse_sheets(iter_student_sheets(file_path, *column_window, on_error=record_error))
+        else:
+            # Load Excel file, or its columnar cache, and parse every student sheet from the single open workbook
+            with instrumentation.phase("load", path=file_path):
+                xls = WorkbookCache(file_path) if use_cache else pd.ExcelFile(file_path)
+            reports = dict(parse_sheets(_iter_sheet_frames(xls, column_window, record_error)))
+    except Exception as e:
+        load_error(e)
+        return results, errors
+    finally:
+        if xls is not None:
+            xls.close()
+
+    rendered, render_errors = render_reports(reports, output_dir, max_workers, force, output_format)
+    results.update(rendered)
+    errors.update(render_errors)
+
+    warnings = sum(issue.severity == "warning" for issue in layout_issues)
+    if warnings:
+        print(f"{warnings} layout warning(s); run validate_workbook.py on the workbook for details.")
+    return results, errors
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+    from contextlib import nullcontext
+
+    parser = argparse.ArgumentParser(description="Generate student analysis reports from the Excel workbook.")
+    # Use raw string (r"") for Windows paths
+    parser.add_argument("--file", default=r"C:\Users\Sanjay\student_data.xlsx", help="Path to the Excel workbook.")
+    parser.add_argument("--student", default="1001", help="Student ID (sheet name) to generate the report for.")
+    # Define the column range (e.g., A-H). Adjust as needed for different exams.
+    parser.add_argument("--column-start", default="AC", help="First column of the exam block.")
+    parser.add_argument("--column-end", default="AJ", help="Last column of the exam block.")
+    parser.add_argument("--all", action="store_true", help="Generate the reports of every student in the workbook.")
+    parser.add_argument("--all-exams", action="store_true", help="Generate the report of every exam block instead of a single column range.")
+    parser.add_argument("--output-dir", default="reports", help="Output directory used with --all.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes used with --all (0 renders in this process).")
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="docx", help="Output format used with --all (pdf skips the DOCX intermediate).")
+    parser.add_argument("--stream", action="store_true", help="Stream the sheets one at a time with --all (for very large workbooks).")
+    parser.add_argument("--force", action="store_true", help="Rebuild every report with --all, even unchanged ones.")
+    parser.add_argument("--cube", action="store_true", help="Hold the class in one compact performance cube with --all (see performance_cube.py).")
+    parser.add_argument("--cache", action="store_true", help="Read the workbook through its columnar cache (see workbook_cache.py) with --all.")
+    parser.add_argument("--no-validate", action="store_true", help="Skip the layout check of every exam block that runs before rendering with --all.")
+    parser.add_argument("--metrics", help="Write per-phase timings, row/table counts, byte sizes and errors as JSON lines to this file and print a summary table.")
+    parser.add_argument("--profile", choices=["cpu", "memory"], help="Profile the run with cProfile (cpu) or tracemalloc (memory) and print the hottest functions or allocation sites; renders in this process unless --workers is given.")
+    parser.add_argument("--profile-output", help="File the raw cProfile stats are written to with --profile cpu.")
+    args = parser.parse_args()
+
+    file_path = args.file
+
+    if args.metrics:
+        # Start a fresh events file; the worker processes inherit the setting
+        open(args.metrics, "w", encoding="utf-8").close()
+        instrumentation.enable(args.metrics)
+    workers = args.workers
+    if args.profile and workers is None:
+        workers = 0  # Profile the rendering too, not just the parent process
+
+    with instrumentation.profile(args.profile, args.profile_output) if args.profile else nullcontext():
+        if not os.path.exists(file_path):
+            print("The specified file path does not exist. Please check and try again.")
+        elif args.all:
+            results, errors = generate_all_reports(file_path, args.column_start, args.column_end, args.output_dir, max_workers=workers, all_exams=args.all_exams, use_cache=args.cache, force=args.force, streaming=args.stream, output_format=args.format, use_cube=args.cube, validate=not args.no_validate)
+            print(f"Generated {len(results)} report(s), {len(errors)} failed.")
+            for key, error in errors.items():
+                print(f"  {key}: {error}")
+        elif args.all_exams:
+            report_paths = generate_exam_reports(file_path, args.student, args.output_dir)
+            print(f"Generated {sum(1 for path in report_paths.values() if path)} of {len(report_paths)} exam report(s).")
         else:
-            print("Failed to generate the report.")
\ No newline at end of file
+            # Generate the report
+            report_path = generate_report(file_path, sheet_name=args.student, column_start=args.column_start, column_end=args.column_end)
+
+            # If report is generated successfully, inform the user
+            if report_path and os.path.exists(report_path):
+                print(f"Report generated successfully. You can find it here: {report_path}")
+            else:
+                print("Failed to generate the report.")
+
+    if args.metrics:
+        print(instrumentation.summary_table(instrumentation.read_events(args.metrics)).to_string(index=False, float_format="%.3f"))
+        print(f"Instrumentation events written to {args.metrics}.")
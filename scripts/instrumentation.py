@@ -0,0 +1,194 @@
+# Required Libraries
+from contextlib import contextmanager
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import traceback
+import tracemalloc
+import pandas as pd
+
+# Environment variable holding the JSON lines file of the active run, so
+# worker processes started by the run append their events to the same file
+METRICS_ENV = "ACADEMIC_REPORTS_METRICS"
+
+_lock = threading.Lock()
+_context = threading.local()
+
+# Traced memory at the phase boundaries of an active memory profile
+_memory_profile = None
+
+def enable(path):
+    """
+    Start writing instrumentation events to a JSON lines file.
+
+    Parameters:
+    - path: File the events are appended to (one JSON object per line).
+    """
+    os.environ[METRICS_ENV] = os.path.abspath(path)
+
+def disable():
+    """Stop writing instrumentation events."""
+    os.environ.pop(METRICS_ENV, None)
+
+def enabled():
+    return METRICS_ENV in os.environ
+
+@contextmanager
+def report_context(**fields):
+    """
+    Attach fields (e.g. the sheet and exam of the report being built) to every
+    event emitted by this thread inside the block.
+    """
+    previous = getattr(_context, "fields", {})
+    _context.fields = {**previous, **fields}
+    try:
+        yield
+    finally:
+        _context.fields = previous
+
+def event(kind, **fields):
+    """
+    Emit one structured event.
+
+    Parameters:
+    - kind: Event type ('phase', 'error', ...).
+    - fields: JSON-serializable values of the event.
+    """
+    path = os.environ.get(METRICS_ENV)
+    if path is None:
+        return
+    record = {"event": kind, "time": time.time(), "pid": os.getpid(), **getattr(_context, "fields", {}), **fields}
+    line = json.dumps(record, default=str) + "\n"
+    with _lock, open(path, "a", encoding="utf-8") as metrics_file:
+        metrics_file.write(line)
+
+def error(message, exception=None, **fields):
+    """Emit an error event, with the exception type and traceback when given."""
+    if exception is not None:
+        fields["error_type"] = type(exception).__name__
+        fields["traceback"] = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    event("error", message=message, **fields)
+
+@contextmanager
+def phase(name, **fields):
+    """
+    Time one phase of building a report.
+
+    The block receives a dictionary it can add counters to (rows, tables,
+    bytes, ...); they are emitted with the phase duration when it ends.
+
+    Parameters:
+    - name: Phase name ('load', 'parse', 'logo', 'tables', 'save', ...).
+    - fields: Initial fields of the event.
+    """
+    if not enabled() and _memory_profile is None:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        if _memory_profile is not None:
+            _memory_checkpoint(name)
+        if enabled():
+            event("phase", phase=name, seconds=time.perf_counter() - start, **fields)
+
+def _memory_checkpoint(name):
+    """Record the traced memory at the end of a phase, with a snapshot of the fullest boundary so far."""
+    current, _ = tracemalloc.get_traced_memory()
+    phases = _memory_profile["phases"]
+    phases[name] = max(phases.get(name, 0), current)
+    if current > _memory_profile["largest"]:
+        _memory_profile.update(largest=current, phase=name, snapshot=tracemalloc.take_snapshot())
+
+def read_events(path):
+    """Read the events of a JSON lines file into a DataFrame."""
+    with open(path, "r", encoding="utf-8") as metrics_file:
+        return pd.DataFrame([json.loads(line) for line in metrics_file if line.strip()])
+
+def summary_table(events):
+    """
+    Aggregate the phase events per phase.
+
+    Parameters:
+    - events: DataFrame returned by read_events.
+
+    Returns:
+    - DataFrame with the count, total, mean and max duration of every phase
+      and the sums of its counters, in first-seen phase order, followed by
+      an 'errors' row counting the error events.
+    """
+    if events.empty or "event" not in events:
+        return pd.DataFrame()
+    phases = events[events["event"] == "phase"]
+    grouped = phases.groupby("phase", sort=False)
+    table = pd.DataFrame({
+        "COUNT": grouped.size(),
+        "TOTAL S": grouped["seconds"].sum(),
+        "MEAN MS": grouped["seconds"].mean() * 1000,
+        "MAX MS": grouped["seconds"].max() * 1000,
+    })
+    for counter in ("rows", "tables", "bytes"):
+        if counter in phases:
+            table[counter.upper()] = grouped[counter].sum(min_count=1).astype("Int64")
+    table = table.reset_index().rename(columns={"phase": "PHASE"})
+    num_errors = int((events["event"] == "error").sum())
+    if num_errors:
+        table = pd.concat([table, pd.DataFrame({"PHASE": ["errors"], "COUNT": [num_errors]})], ignore_index=True)
+    return table
+
+@contextmanager
+def profile(mode, output_path=None, top=25, stream=None):
+    """
+    Profile the block with cProfile ('cpu') or tracemalloc ('memory') and print the hottest entries.
+
+    The memory profile prints the peak traced memory, the largest traced
+    memory at the end of each phase, and the top allocation sites of the
+    phase boundary holding the most memory (or of the end of the block when
+    no phase ran in this process).
+
+    Parameters:
+    - mode: 'cpu' or 'memory'.
+    - output_path: Optional file for the raw cProfile stats (open with pstats or snakeviz).
+    - top: Number of functions or allocation sites to print.
+    - stream: Text stream the report is printed to (defaults to stdout).
+    """
+    if mode == "cpu":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output_path:
+                profiler.dump_stats(output_path)
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(top)
+            print(text.getvalue(), file=stream)
+    elif mode == "memory":
+        global _memory_profile
+        tracemalloc.start(25)
+        _memory_profile = {"phases": {}, "largest": 0, "phase": None, "snapshot": None}
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            memory, _memory_profile = _memory_profile, None
+            snapshot = memory["snapshot"] or tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            print(f"Peak traced memory: {peak / 2**20:.1f} MiB (still allocated at the end: {current / 2**20:.1f} MiB)", file=stream)
+            if memory["phases"]:
+                print("Largest traced memory at the end of each phase:", file=stream)
+                for name, size in memory["phases"].items():
+                    print(f"  {name:<10} {size / 2**20:8.1f} MiB", file=stream)
+                print(f"Top {top} allocation sites at the end of the '{memory['phase']}' phase holding the most memory:", file=stream)
+            else:
+                print(f"Top {top} allocation sites still alive at the end:", file=stream)
+            for stat in snapshot.statistics("lineno")[:top]:
+                print(f"  {stat}", file=stream)
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
@@ -0,0 +1,455 @@
+# Required Libraries
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import json
+import os
+import sqlite3
+import time
+import traceback
+import zlib
+import instrumentation
+from generate_reports import RENDERERS, render_fingerprint
+from report_parser import parse_report
+from workbook_cache import sheet_fingerprints
+from validate_workbook import NO_EXAM_BLOCK_ERROR, layout_error, validate_block
+from workbook_reader import NON_STUDENT_SHEETS, iter_student_sheets, split_exam_blocks
+
+LEDGER_NAME = ".job_ledger.sqlite"
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+# Times a unit is submitted again after its worker process died
+MAX_ATTEMPTS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    workbook TEXT NOT NULL,
+    student TEXT NOT NULL,
+    exam TEXT NOT NULL,
+    fingerprint TEXT,
+    status TEXT NOT NULL,
+    output_path TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    PRIMARY KEY (workbook, student, exam)
+);
+CREATE TABLE IF NOT EXISTS sheets (
+    workbook TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (workbook, sheet)
+);
+"""
+
+def discover_workbooks(source):
+    """
+    List the workbooks of a job and the output subdirectory of each.
+
+    Parameters:
+    - source: A workbook, a directory searched recursively for workbooks
+      (output subdirectories mirror the directory tree, e.g.
+      school_a/section_b), or a manifest: a .json list of paths or of
+      {"workbook": path, "output_dir": subdirectory} objects, or a text
+      file with one path per line ('#' starts a comment). Relative paths of
+      a manifest are relative to the manifest.
+
+    Returns:
+    - List of (absolute workbook path, output subdirectory) pairs.
+    """
+    if os.path.isdir(source):
+        workbooks = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith("~$"):
+                    path = os.path.join(root, name)
+                    workbooks.append((os.path.abspath(path), os.path.splitext(os.path.relpath(path, source))[0]))
+        return workbooks
+
+    if source.lower().endswith(WORKBOOK_EXTENSIONS):
+        return [(os.path.abspath(source), os.path.splitext(os.path.basename(source))[0])]
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as manifest_file:
+        if source.lower().endswith(".json"):
+            entries = json.load(manifest_file)
+        else:
+            entries = [line.split("#", 1)[0].strip() for line in manifest_file]
+    workbooks = []
+    for entry in entries:
+        if not entry:
+            continue
+        path = entry if isinstance(entry, str) else entry["workbook"]
+        path = os.path.abspath(os.path.join(base_dir, path))
+        output_subdir = (None if isinstance(entry, str) else entry.get("output_dir")) or os.path.splitext(os.path.basename(path))[0]
+        workbooks.append((path, output_subdir))
+    return workbooks
+
+class JobLedger:
+    """
+    SQLite checkpoint of a job: one row per (workbook, student, exam) unit and per finished sheet.
+
+    Every unit is committed as soon as it finishes, so a crashed or
+    interrupted job loses at most the units that were being rendered.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        - path: Path of the SQLite database (created if missing).
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def unit(self, workbook, student, exam):
+        """Row of a unit as a dictionary, None if it was never run."""
+        cursor = self.connection.execute(
+            "SELECT fingerprint, status, output_path, error, attempts FROM units WHERE workbook = ? AND student = ? AND exam = ?",
+            (workbook, student, exam),
+        )
+        row = cursor.fetchone()
+        return dict(zip(("fingerprint", "status", "output_path", "error", "attempts"), row)) if row else None
+
+    def record(self, workbook, student, exam, fingerprint, status, output_path=None, error=None):
+        """Store the outcome of a unit ('done' or 'failed') and commit it."""
+        self.connection.execute(
+            """
+            INSERT INTO units (workbook, student, exam, fingerprint, status, output_path, error, attempts, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT (workbook, student, exam) DO UPDATE SET
+                fingerprint = excluded.fingerprint, status = excluded.status, output_path = excluded.output_path,
+                error = excluded.error, attempts = units.attempts + 1, updated = excluded.updated
+            """,
+            (workbook, student, exam, fingerprint, status, output_path, error, time.time()),
+        )
+        self.connection.commit()
+
+    def finished_sheets(self, workbook):
+        """Dictionary mapping each sheet of a workbook whose units all finished to its fingerprint then."""
+        cursor = self.connection.execute("SELECT sheet, fingerprint FROM sheets WHERE workbook = ?", (workbook,))
+        return dict(cursor.fetchall())
+
+    def record_sheet(self, workbook, sheet, fingerprint):
+        """Mark every unit of a sheet as finished (done or quarantined) for its current fingerprint."""
+        self.connection.execute("INSERT OR REPLACE INTO sheets (workbook, sheet, fingerprint) VALUES (?, ?, ?)", (workbook, sheet, fingerprint))
+        self.connection.commit()
+
+    def clear(self, workbook, student, exam):
+        """Remove a unit, e.g. the quarantine entry of a sheet that can be read again."""
+        self.connection.execute("DELETE FROM units WHERE workbook = ? AND student = ? AND exam = ?", (workbook, student, exam))
+        self.connection.commit()
+
+    def forget_sheet(self, workbook, sheet):
+        self.connection.execute("DELETE FROM sheets WHERE workbook = ? AND sheet = ?", (workbook, sheet))
+        self.connection.commit()
+
+    def quarantined(self):
+        """List of (workbook, student, exam, error, attempts) of the failed units."""
+        cursor = self.connection.execute("SELECT workbook, student, exam, error, attempts FROM units WHERE status = 'failed' ORDER BY workbook, student, exam")
+        return cursor.fetchall()
+
+    def counts(self):
+        """Dictionary mapping unit status to the number of units."""
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
+
+@dataclass
+class WorkUnit:
+    """One (workbook, student, exam) report of a job."""
+    workbook: str
+    student: str
+    exam: str
+    report: object
+    fingerprint: str
+    output_dir: str
+    attempts: int = 0
+
+def _render_unit(output_format, report, output_dir, file_prefix):
+    """Render one unit in a worker process (module-level so the pool can pickle it)."""
+    renderer, _ = RENDERERS[output_format]
+    with instrumentation.report_context(sheet=file_prefix.rstrip("_"), exam=report.exam_type):
+        return renderer(report, output_dir, file_prefix)
+
+def _error_text(error):
+    if isinstance(error, BaseException):
+        return "".join(traceback.format_exception_only(type(error), error)).strip()
+    return str(error)
+
+class JobRunner:
+    """
+    Resumable generation of every (workbook, student, exam) report of many workbooks.
+
+    The units are parsed one sheet at a time and sharded across a process
+    pool, with at most `max_in_flight` units queued. Each finished unit is
+    checkpointed in a JobLedger; on the next run the sheets whose
+    fingerprint (see workbook_cache.sheet_fingerprints) is unchanged and
+    whose units all finished are not even read, and the units of the other
+    sheets are skipped when their report fingerprint is unchanged. A unit or
+    sheet that fails is quarantined in the ledger with its error instead of
+    aborting the batch, and is only retried once its data changes or with
+    retry_failed.
+    """
+
+    def __init__(self, output_root, output_format="docx", max_workers=None, ledger_path=None, retry_failed=False, force=False, shard=(0, 1), max_in_flight=None):
+        """
+        Parameters:
+        - output_root: Directory the reports are written to, one subdirectory per workbook.
+        - output_format: Key of RENDERERS selecting the output ('docx' or 'pdf').
+        - max_workers: Number of worker processes (defaults to the CPU count; 0 renders in this process).
+        - ledger_path: Path of the SQLite ledger (defaults to a file in output_root, one per shard).
+        - retry_failed: Retry the quarantined units and sheets.
+        - force: Render every unit again, ignoring the checkpoints.
+        - shard: (index, count) pair; only the students whose (workbook, student)
+          hash falls in this shard are processed, so several machines can
+          split a job without reading each other's sheets.
+        - max_in_flight: Maximum number of parsed units waiting for a worker.
+        """
+        self.output_root = output_root
+        self.output_format = output_format
+        self.max_workers = max_workers
+        self.retry_failed = retry_failed
+        self.force = force
+        self.shard_index, self.shard_count = shard
+        self.max_in_flight = max_in_flight or 4 * (max_workers or os.cpu_count() or 1)
+        os.makedirs(output_root, exist_ok=True)
+        if ledger_path is None:
+            ledger_name = LEDGER_NAME if self.shard_count == 1 else LEDGER_NAME.replace(".sqlite", f".shard{self.shard_index}of{self.shard_count}.sqlite")
+            ledger_path = os.path.join(output_root, ledger_name)
+        self.ledger = JobLedger(ledger_path)
+        self.stats = {"done": 0, "skipped": 0, "failed": 0, "sheets_skipped": 0}
+        self._open_sheets = {}
+
+    def _in_shard(self, workbook, student):
+        return self.shard_count == 1 or zlib.crc32(f"{workbook}|{student}".encode("utf-8")) % self.shard_count == self.shard_index
+
+    def _fail(self, workbook, student, exam, fingerprint, error):
+        """Quarantine a unit with its error."""
+        message = _error_text(error)
+        self.ledger.record(workbook, student, exam, fingerprint, "failed", error=message)
+        instrumentation.error("Quarantined a report unit", error if isinstance(error, BaseException) else None, workbook=workbook, sheet=student, exam=exam)
+        self.stats["failed"] += 1
+
+    def _finish_unit(self, unit):
+        """Count a unit of an open sheet as finished; checkpoint the sheet when it was the last one."""
+        key = (unit.workbook, unit.student)
+        remaining, fingerprint = self._open_sheets[key]
+        if remaining > 1:
+            self._open_sheets[key] = (remaining - 1, fingerprint)
+        else:
+            del self._open_sheets[key]
+            self.ledger.record_sheet(unit.workbook, unit.student, fingerprint)
+
+    def _units(self, workbook, output_subdir):
+        """Yield the units of a workbook that still have to be rendered."""
+        output_dir = os.path.join(self.output_root, output_subdir)
+        try:
+            stat = os.stat(workbook)
+        except OSError as e:
+            self._fail(workbook, "", "", None, f"Error opening the workbook: {_error_text(e)}")
+            return
+        file_key = f"{stat.st_size}-{stat.st_mtime_ns}"
+        previous = self.ledger.unit(workbook, "", "")
+        if previous is not None and previous["fingerprint"] == file_key and not (self.retry_failed or self.force):
+            return  # Quarantined and unchanged since
+        try:
+            all_sheets = sheet_fingerprints(workbook)
+        except Exception as e:
+            self._fail(workbook, "", "", file_key, f"Error opening the workbook: {_error_text(e)}")
+            return
+        self.ledger.clear(workbook, "", "")
+        fingerprints = {
+            sheet_name: key for sheet_name, key in all_sheets.items()
+            if sheet_name.strip().upper() not in NON_STUDENT_SHEETS and self._in_shard(workbook, sheet_name)
+        }
+        finished = {} if self.force else self.ledger.finished_sheets(workbook)
+        failed_sheets = {student for failed_workbook, student, *_ in self.ledger.quarantined() if failed_workbook == workbook} if self.retry_failed else set()
+
+        # Only read the sheets that changed or still have units to render
+        todo = {
+            sheet_name for sheet_name, key in fingerprints.items()
+            if finished.get(sheet_name) != key or sheet_name in failed_sheets
+        }
+        self.stats["sheets_skipped"] += len(fingerprints) - len(todo)
+        if not todo:
+            return
+        skip_sheets = {sheet_name.strip().upper() for sheet_name in all_sheets if sheet_name not in todo}
+        skip_sheets -= {sheet_name.strip().upper() for sheet_name in todo}
+        os.makedirs(output_dir, exist_ok=True)
+
+        def sheet_error(sheet_name, e):
+            self._fail(workbook, sheet_name, "", None, f"Error reading the sheet: {_error_text(e)}")
+            self.ledger.record_sheet(workbook, sheet_name, fingerprints[sheet_name])
+
+        try:
+            sheets = iter_student_sheets(workbook, skip_sheets=skip_sheets, on_error=sheet_error)
+            for sheet_name, df in sheets:
+                if sheet_name not in todo:
+                    continue
+                self.ledger.forget_sheet(workbook, sheet_name)
+                try:
+                    # Check the layout of each block before it becomes a unit
+                    reports = [(parse_report(block), layout_error(validate_block(block))) for _, block in split_exam_blocks(df)]
+                except Exception as e:
+                    sheet_error(sheet_name, e)
+                    continue
+                self.ledger.clear(workbook, sheet_name, "")
+                if not reports:
+                    # Quarantine the sheet, like the other entry points report it
+                    self._fail(workbook, sheet_name, "", None, NO_EXAM_BLOCK_ERROR)
+                    self.ledger.record_sheet(workbook, sheet_name, fingerprints[sheet_name])
+                    continue
+
+                units = []
+                for report, error in reports:
+                    exam = str(report.exam_type)
+                    unit = WorkUnit(workbook, sheet_name, exam, report, render_fingerprint(report), output_dir)
+                    if error:
+                        self._fail(workbook, sheet_name, exam, unit.fingerprint, error)
+                        continue
+                    previous = None if self.force else self.ledger.unit(workbook, sheet_name, exam)
+                    if previous is not None and previous["fingerprint"] == unit.fingerprint:
+                        if previous["status"] == "done" and previous["output_path"] and os.path.exists(previous["output_path"]):
+                            self.stats["skipped"] += 1
+                            continue
+                        if previous["status"] == "failed" and not self.retry_failed:
+                            continue  # Still quarantined: same data, same error
+                    units.append(unit)
+
+                if not units:
+                    self.ledger.record_sheet(workbook, sheet_name, fingerprints[sheet_name])
+                    continue
+                self._open_sheets[(workbook, sheet_name)] = (len(units), fingerprints[sheet_name])
+                yield from units
+        except Exception as e:
+            self._fail(workbook, "", "", file_key, f"Error loading Excel file: {_error_text(e)}")
+
+    def _submit(self, executor, unit):
+        return executor.submit(_render_unit, self.output_format, unit.report, unit.output_dir, f"{unit.student}_")
+
+    def _complete(self, unit, result):
+        """Checkpoint the outcome of a unit; result is the report path or an exception."""
+        if isinstance(result, BaseException):
+            self._fail(unit.workbook, unit.student, unit.exam, unit.fingerprint, f"Error generating the report: {_error_text(result)}")
+        elif result:
+            self.ledger.record(unit.workbook, unit.student, unit.exam, unit.fingerprint, "done", output_path=result)
+            self.stats["done"] += 1
+        else:
+            self._fail(unit.workbook, unit.student, unit.exam, unit.fingerprint, "Error saving the document.")
+        self._finish_unit(unit)
+
+    def _collect(self, executor, in_flight, return_when):
+        """
+        Checkpoint finished units. If a worker process died, the pool is
+        replaced and its units are submitted once more.
+
+        Returns:
+        - The executor to keep submitting to.
+        """
+        done, _ = wait(in_flight, return_when=return_when)
+        retry = []
+        for future in done:
+            unit = in_flight.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                unit.attempts += 1
+                if unit.attempts < MAX_ATTEMPTS:
+                    retry.append(unit)
+                else:
+                    self._complete(unit, e)
+                continue
+            except Exception as e:
+                result = e
+            self._complete(unit, result)
+
+        if retry:
+            # Every unit still queued on the broken pool fails the same way
+            for future in list(in_flight):
+                unit = in_flight.pop(future)
+                unit.attempts += 1
+                retry.append(unit)
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            for unit in retry:
+                in_flight[self._submit(executor, unit)] = unit
+        return executor
+
+    def run(self, workbooks):
+        """
+        Render every pending unit of the workbooks.
+
+        Parameters:
+        - workbooks: List of (workbook path, output subdirectory) pairs (see discover_workbooks).
+
+        Returns:
+        - Dictionary counting the units done, skipped (already done) and
+          failed in this run, and the sheets skipped without being read.
+        """
+        units = (unit for workbook, output_subdir in workbooks for unit in self._units(workbook, output_subdir))
+        if self.max_workers == 0:
+            for unit in units:
+                try:
+                    result = _render_unit(self.output_format, unit.report, unit.output_dir, f"{unit.student}_")
+                except Exception as e:
+                    result = e
+                self._complete(unit, result)
+            return self.stats
+
+        executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        in_flight = {}
+        try:
+            for unit in units:
+                while len(in_flight) >= self.max_in_flight:
+                    executor = self._collect(executor, in_flight, FIRST_COMPLETED)
+                in_flight[self._submit(executor, unit)] = unit
+            while in_flight:
+                executor = self._collect(executor, in_flight, FIRST_COMPLETED)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return self.stats
+
+    def close(self):
+        self.ledger.close()
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the reports of many workbooks (sections, schools) with checkpoints, resume and quarantine.")
+    parser.add_argument("source", help="Workbook, directory of workbooks, or manifest (.json or one path per line).")
+    parser.add_argument("--output-dir", default="reports", help="Directory the reports are written to, one subdirectory per workbook.")
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="docx", help="Output format.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (0 renders in this process).")
+    parser.add_argument("--ledger", default=None, help=f"Path of the SQLite ledger (default: {LEDGER_NAME} in the output directory).")
+    parser.add_argument("--shard", default="0/1", help="INDEX/COUNT: process only this shard of the students (e.g. 0/4 on the first of four machines).")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry the quarantined units.")
+    parser.add_argument("--force", action="store_true", help="Render every unit again, ignoring the checkpoints.")
+    parser.add_argument("--status", action="store_true", help="Print the ledger's unit counts and quarantined units without running.")
+    args = parser.parse_args()
+
+    shard_index, shard_count = (int(part) for part in args.shard.split("/"))
+    if not os.path.exists(args.source):
+        print("The specified source does not exist. Please check and try again.")
+    elif not 0 <= shard_index < shard_count:
+        parser.error("--shard must be INDEX/COUNT with 0 <= INDEX < COUNT.")
+    else:
+        runner = JobRunner(args.output_dir, args.format, args.workers, args.ledger, args.retry_failed, args.force, (shard_index, shard_count))
+        try:
+            if not args.status:
+                start = time.perf_counter()
+                workbooks = discover_workbooks(args.source)
+                stats = runner.run(workbooks)
+                print(
+                    f"{len(workbooks)} workbook(s) in {time.perf_counter() - start:.1f} s: {stats['done']} report(s) generated, "
+                    f"{stats['skipped']} already done, {stats['failed']} failed; {stats['sheets_skipped']} unchanged sheet(s) not read."
+                )
+            print(f"Ledger {runner.ledger.path}: {runner.ledger.counts()}")
+            for workbook, student, exam, error, attempts in runner.ledger.quarantined():
+                print(f"  quarantined {workbook} {student or '(workbook)'} {exam or '(sheet)'} after {attempts} attempt(s): {error}")
+        finally:
+            runner.close()
@@ -0,0 +1,213 @@
+# Required Libraries
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Default location of the on-disk logo cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "academic_reports", "logos")
+
+def normalize_logo_url(logo_url):
+    """
+    Rewrite a Google Drive share link to the link serving the raw image content.
+
+    Parameters:
+    - logo_url: Logo link from the student details.
+
+    Returns:
+    - The link to download the image from.
+    """
+    if "drive.google.com" in logo_url and "/d/" in logo_url:
+        file_id = logo_url.split('/d/')[1].split('/')[0]
+        logo_url = f"https://drive.google.com/uc?id={file_id}"
+    return logo_url
+
+def _write_atomic(path, data):
+    """Write bytes to a file so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class LogoResolver:
+    """
+    Resolve logo links to image bytes, fetching each distinct logo at most once.
+
+    Lookups go through an in-process LRU, then an on-disk cache (an entry per
+    URL pointing at a content-addressed blob), and only then the network
+    through a shared keep-alive session. Local paths and file:// links are
+    read directly. When a download fails, or the resolver is offline, a stale
+    disk entry is used if there is one. Memory entries expire with the ttl of
+    the logo they hold; failures and stale copies are only remembered for
+    failure_ttl, so a long-running process tries the download again.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=7 * 24 * 3600, timeout=10, max_entries=32, offline=False, failure_ttl=60):
+        """
+        Parameters:
+        - cache_dir: Directory of the on-disk cache (None disables it).
+        - ttl: Seconds a downloaded logo is used before it is downloaded again.
+        - timeout: Timeout in seconds of each download.
+        - max_entries: Number of logos kept in memory.
+        - offline: Never download; only local files and the disk cache are used.
+        - failure_ttl: Seconds a failed lookup (or a stale copy used instead) is
+          remembered in memory before the logo is tried again.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.offline = offline
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self):
+        """Shared requests session keeping connections alive between downloads."""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def resolve(self, logo_url):
+        """
+        Get the image bytes of a logo.
+
+        Parameters:
+        - logo_url: Logo link, file:// link or local path.
+
+        Returns:
+        - The image bytes, or None if the logo could not be loaded.
+        """
+        logo_url = normalize_logo_url(str(logo_url).strip())
+        with self._lock:
+            entry = self._memory.get(logo_url)
+            if entry is not None and time.time() < entry[1]:
+                self._memory.move_to_end(logo_url)
+                return entry[0]
+
+        content, expires_at = self._load(logo_url)
+
+        # Failures are remembered too (for failure_ttl), so a bad link is not tried for every report
+        with self._lock:
+            self._memory[logo_url] = (content, expires_at)
+            self._memory.move_to_end(logo_url)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        return content
+
+    def prefetch(self, logo_urls):
+        """
+        Resolve every distinct logo once, e.g. before fanning a batch out to workers.
+
+        Parameters:
+        - logo_urls: Iterable of logo links.
+        """
+        for logo_url in set(logo_urls):
+            self.resolve(logo_url)
+
+    def clear(self):
+        """Drop the in-memory entries (the disk cache is kept)."""
+        with self._lock:
+            self._memory.clear()
+
+    def _load(self, logo_url):
+        """Image bytes of a logo (None on failure) and the time the memory entry expires."""
+        now = time.time()
+        retry_at = now + self.failure_ttl
+        parsed = urlparse(logo_url)
+        if parsed.scheme not in ("http", "https"):
+            content = self._read_local(url2pathname(parsed.path) if parsed.scheme == "file" else logo_url)
+            return content, (now + self.ttl if content is not None else retry_at)
+
+        entry = self._read_entry(logo_url)
+        if entry is not None and now - entry["fetched_at"] < self.ttl:
+            return entry["content"], entry["fetched_at"] + self.ttl
+        if self.offline:
+            if entry is not None:
+                return entry["content"], retry_at
+            print(f"Logo not cached and offline: {logo_url}")
+            return None, retry_at
+
+        try:
+            response = self.session.get(logo_url, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            if entry is not None:
+                print(f"Error loading logo, using cached copy: {e}")
+                return entry["content"], retry_at
+            print("Error loading logo:", e)
+            return None, retry_at
+
+        content = response.content
+        self._write_entry(logo_url, content)
+        return content, time.time() + self.ttl
+
+    @staticmethod
+    def _read_local(path):
+        try:
+            with open(path, "rb") as image_file:
+                return image_file.read()
+        except OSError as e:
+            print("Error loading logo:", e)
+            return None
+
+    def _entry_path(self, logo_url):
+        url_key = hashlib.sha256(logo_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "urls", f"{url_key}.json")
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.cache_dir, "blobs", content_hash)
+
+    def _read_entry(self, logo_url):
+        """Disk entry of a URL with its content, or None if missing or damaged."""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._entry_path(logo_url), "r", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+            with open(self._blob_path(entry["sha256"]), "rb") as blob_file:
+                content = blob_file.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+            return None
+        entry["content"] = content
+        return entry
+
+    def _write_entry(self, logo_url, content):
+        if not self.cache_dir:
+            return
+        content_hash = hashlib.sha256(content).hexdigest()
+        entry = {"url": logo_url, "sha256": content_hash, "fetched_at": time.time()}
+        try:
+            blob_path = self._blob_path(content_hash)
+            if not os.path.exists(blob_path):
+                _write_atomic(blob_path, content)
+            _write_atomic(self._entry_path(logo_url), json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            print(f"Error caching logo: {e}")
+
+@lru_cache(maxsize=1)
+def default_resolver():
+    """Resolver shared by every report rendered in this process."""
+    return LogoResolver()
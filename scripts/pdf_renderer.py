@@ -0,0 +1,261 @@
+# Required Libraries
+from functools import lru_cache
+from io import BytesIO
+import os
+import instrumentation
+from logo_cache import default_resolver
+from report_parser import report_file_name, report_size
+
+try:
+    from fpdf import FPDF
+    from fpdf.fonts import FontFace
+except ImportError:  # Optional: only needed for PDF output (pip install fpdf2)
+    FPDF = None
+
+# Report blue used for the headings
+HEADING_COLOR = (31, 73, 125)
+# Fill used for OVERALL % cells below 50
+LOW_SCORE_FILL = (255, 133, 133)
+# Header and band fills approximating the Word table styles of the DOCX report
+TABLE_FILLS = {
+    "overall": ((192, 80, 77), (242, 219, 219)),  # Colorful List Accent 2
+    "unit": ((155, 187, 89), (235, 241, 221)),  # Medium Shading 1 Accent 3
+    "topic": ((128, 100, 162), (229, 224, 236)),  # Medium Shading 1 Accent 4
+}
+# Height of an empty paragraph of the DOCX report, in points
+BLANK_LINE = 14
+INCH = 72
+# Unicode TrueType font embedded in the PDF reports: a (regular, bold) pair of
+# paths, or the regular font in the ACADEMIC_REPORTS_FONT environment variable
+FONT_ENV = "ACADEMIC_REPORTS_FONT"
+FONT_CANDIDATES = [
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf", "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf"),
+    (r"C:\Windows\Fonts\arial.ttf", r"C:\Windows\Fonts\arialbd.ttf"),
+    ("/System/Library/Fonts/Supplemental/Arial.ttf", "/System/Library/Fonts/Supplemental/Arial Bold.ttf"),
+]
+FONT_FAMILY = "ReportSans"
+
+@lru_cache(maxsize=1)
+def report_font():
+    """
+    Paths of the Unicode font embedded in the PDF reports.
+
+    Returns:
+    - Tuple (regular, bold) of .ttf paths (bold is the regular font when the
+      family has no bold file), or None if no font was found; the reports
+      then fall back to the core Helvetica font, which only covers Latin-1.
+    """
+    configured = os.environ.get(FONT_ENV)
+    if configured:
+        if os.path.exists(configured):
+            return configured, configured
+        print(f"Font {configured} from {FONT_ENV} not found.")
+    for regular, bold in FONT_CANDIDATES:
+        if os.path.exists(regular):
+            return regular, bold if os.path.exists(bold) else regular
+    print(f"No Unicode font found; characters outside Latin-1 will show as '?' in PDF reports. Set {FONT_ENV} to a .ttf file.")
+    return None
+
+def _text(value):
+    """Cell text for a raw sheet value."""
+    return str(value).strip() if value is not None else ""
+
+if FPDF is not None:
+    class _ReportPDF(FPDF):
+        """A4 document with the report's page border on every page, in the embedded Unicode font."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            font = report_font()
+            self.report_font = "Helvetica"
+            if font is not None:
+                self.add_font(FONT_FAMILY, "", font[0])
+                self.add_font(FONT_FAMILY, "B", font[1])
+                self.report_font = FONT_FAMILY
+
+        def normalize_text(self, text):
+            # Only reached with the core font fallback
+            if not self.is_ttf_font:
+                text = text.encode("latin-1", "replace").decode("latin-1")
+            return super().normalize_text(text)
+
+        def header(self):
+            self.set_draw_color(0, 0, 0)
+            self.set_line_width(1.25)  # Same as the 10 half-point DOCX border
+            self.rect(10, 10, self.w - 20, self.h - 20)
+
+def _heading(pdf, text, size):
+    pdf.set_font(pdf.report_font, "B", size)
+    pdf.set_text_color(*HEADING_COLOR)
+    pdf.multi_cell(0, size * 1.4, _text(text), align="C", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_text_color(0, 0, 0)
+
+def _table(pdf, table_data, kind, font_size, column_widths=None):
+    """
+    Draw a report table.
+
+    Parameters:
+    - pdf: The FPDF document.
+    - table_data: ReportTable with the headers and rows of the table.
+    - kind: 'overall', 'unit' or 'topic' (selects the fills).
+    - font_size: Font size of the table in points.
+    - column_widths: Optional list of column widths in points.
+    """
+    header_fill, band_fill = TABLE_FILLS[kind]
+    num_columns = len(table_data.headers)
+    if column_widths is None:
+        column_widths = [pdf.epw / num_columns] * num_columns
+        if table_data.obtained_idx != -1:
+            # "OBTAINED MARKS" is one inch wide, the other columns share the rest
+            others = (pdf.epw - INCH) / max(num_columns - 1, 1)
+            column_widths = [INCH if i == table_data.obtained_idx else others for i in range(num_columns)]
+
+    if sum(column_widths) > pdf.epw:
+        # Shrink the columns proportionally to fit between the margins
+        scale = pdf.epw / sum(column_widths)
+        column_widths = [width * scale for width in column_widths]
+
+    low_score = FontFace(fill_color=LOW_SCORE_FILL)
+    pdf.set_font(pdf.report_font, size=font_size)
+    with pdf.table(
+        col_widths=column_widths,
+        width=sum(column_widths),
+        text_align="CENTER",
+        line_height=font_size * 1.5,
+        headings_style=FontFace(emphasis="BOLD", color=(255, 255, 255), fill_color=header_fill),
+        cell_fill_color=band_fill,
+        cell_fill_mode="ROWS",
+    ) as table:
+        header_row = table.row()
+        for header in table_data.headers:
+            header_row.cell(_text(header))
+        for table_row in table_data.rows:
+            row = table.row()
+            for i, cell_value in enumerate(table_row):
+                shaded = i == table_data.overall_idx and isinstance(cell_value, (int, float)) and cell_value < 50
+                row.cell(_text(cell_value), style=low_score if shaded else None)
+
+def build_pdf(report, logo_resolver=None):
+    """
+    Lay out a parsed student report as a PDF document in memory.
+
+    The layout follows the DOCX report: front page with title, logo and student
+    details, overall summary table, then unit-wise and topic-wise tables per
+    subject with OVERALL % below 50 shaded red.
+
+    Parameters:
+    - report: StudentReport produced by report_parser.parse_report.
+    - logo_resolver: LogoResolver used to load the logo (defaults to the one shared by this process).
+
+    Returns:
+    - FPDF document, or None if fpdf2 is missing or the report has no EXAM TYPE.
+    """
+    if FPDF is None:
+        print("fpdf2 is not installed; install it to render PDF reports (pip install fpdf2).")
+        return None
+    if report.exam_type is None:
+        print("Missing EXAM TYPE in the student details.")
+        instrumentation.error("Missing EXAM TYPE in the student details.", student=report.details.get("ID"))
+        return None
+    student_details = report.details
+
+    pdf = _ReportPDF(unit="pt", format="A4")
+    pdf.set_margins(20, 20, 20)
+    pdf.set_auto_page_break(True, margin=20)
+
+    # FRONT PAGE: Student Details
+    pdf.add_page()
+    pdf.ln(5 * BLANK_LINE)
+    pdf.set_font(pdf.report_font, "B", 24)
+    pdf.cell(0, 34, "STUDENT ANALYSIS REPORT", align="C", new_x="LMARGIN", new_y="NEXT")
+
+    # Insert Logo if available
+    logo_url = student_details.get("LOGO")
+    if logo_url:
+        with instrumentation.phase("logo") as logo_metrics:
+            content = (logo_resolver or default_resolver()).resolve(logo_url)
+            logo_metrics["bytes"] = len(content) if content else 0
+        if content:
+            try:
+                pdf.image(BytesIO(content), x=(pdf.w - 2 * INCH) / 2, w=2 * INCH)
+            except Exception as e:
+                print("Error loading logo:", e)
+                instrumentation.error("Error loading logo", e, url=logo_url)
+
+    # Lay out the details and the tables
+    with instrumentation.phase("tables", **report_size(report)):
+        student_info_keys = ["ID", "NAME", "STANDARD", "SECTION", "EXAM TYPE", "SCHOOL NAME"]
+        details_text = "\n".join(f"{key}: {student_details.get(key, 'N/A')}" for key in student_info_keys)
+        pdf.set_font(pdf.report_font, size=14)
+        pdf.multi_cell(0, 20, _text(details_text), align="C", new_x="LMARGIN", new_y="NEXT")
+
+        # SECOND PAGE: Overall Summary Table
+        pdf.add_page()
+        pdf.ln(6 * BLANK_LINE)
+        _heading(pdf, "OVERALL PERFORMANCE SUMMARY", 18)
+        pdf.ln(2 * BLANK_LINE)
+        if report.overall is not None and report.overall.headers:
+            _table(pdf, report.overall, "overall", 14, [2 * INCH] * len(report.overall.headers))
+
+        # SUBJECT PAGES: Unit-wise and Topic-wise tables
+        for subject in report.subjects:
+            pdf.add_page()
+            _heading(pdf, subject.name, 18)
+            pdf.ln(BLANK_LINE)
+
+            if subject.units is None:
+                continue
+            _heading(pdf, "UNIT-WISE ANALYSIS", 14)
+            if subject.units.headers:
+                _table(pdf, subject.units, "unit", 9)
+
+            if subject.topics is None:
+                continue
+            pdf.ln(BLANK_LINE)
+            _heading(pdf, "TOPIC-WISE ANALYSIS", 14)
+            if subject.topics.headers:
+                _table(pdf, subject.topics, "topic", 9)
+
+    return pdf
+
+def render_pdf(report, output_dir="/", file_prefix="", logo_resolver=None):
+    """
+    Render a parsed student report straight to a PDF file, without a DOCX intermediate.
+
+    Parameters:
+    - report: StudentReport produced by report_parser.parse_report.
+    - output_dir: Directory the .pdf report is written to.
+    - file_prefix: Text prepended to the report file name (e.g., the student ID).
+    - logo_resolver: LogoResolver used to load the logo (defaults to the one shared by this process).
+
+    Returns:
+    - Path to the generated .pdf report, or None if it could not be saved.
+    """
+    pdf = build_pdf(report, logo_resolver)
+    if pdf is None:
+        return None
+
+    # Save Document
+    output_path = os.path.join(output_dir, report_file_name(report, file_prefix, ".pdf"))
+    try:
+        with instrumentation.phase("save", path=output_path) as save_metrics:
+            pdf.output(output_path)
+            save_metrics["bytes"] = os.path.getsize(output_path)
+        print(f"Report successfully generated: {output_path}")
+        return output_path
+    except Exception as e:
+        print(f"Error saving the document: {e}")
+        instrumentation.error("Error saving the document", e, path=output_path)
+        return None
+
+def render_pdf_bytes(report, logo_resolver=None):
+    """Render a parsed student report to the bytes of a .pdf file (None if it cannot be rendered)."""
+    pdf = build_pdf(report, logo_resolver)
+    if pdf is None:
+        return None
+    with instrumentation.phase("save") as save_metrics:
+        content = bytes(pdf.output())
+        save_metrics["bytes"] = len(content)
+    return content
@@ -0,0 +1,430 @@
+# Required Libraries
+from dataclasses import dataclass, field
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from report_manifest import report_fingerprint
+from report_parser import ReportTable, StudentReport, SubjectSection, parse_report
+from summary_export import RECORD_COLUMNS, records_frame, report_records
+from workbook_reader import NON_STUDENT_SHEETS, iter_student_sheets, split_exam_blocks
+
+LEVELS = ("subject", "unit", "topic")
+# Default table headers, as laid out in the student sheets
+DEFAULT_HEADERS = {
+    "subject": ("SUBJECT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"),
+    "unit": ("UNIT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"),
+    "topic": ("UNIT", "TOPIC", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"),
+}
+# Label columns of each level
+LABEL_COLUMNS = {"subject": ["SUBJECT"], "unit": ["SUBJECT", "UNIT"], "topic": ["SUBJECT", "UNIT", "TOPIC"]}
+# Table columns held in the score arrays; any other column (e.g. GRADE) is kept as raw per-row values
+SCORE_COLUMNS = {"SUBJECT", "UNIT", "TOPIC", "OBTAINED MARKS", "MAX MARKS", "PERFORMANCE %", "OVERALL %"}
+
+def _numbers(array):
+    """Plain ints/floats rounded to 2 decimals (None for NaN), like the values of a parsed sheet."""
+    return [None if value != value else int(value) if value.is_integer() else value for value in np.round(array.astype(float), 2).tolist()]
+
+def _label_index(df, level):
+    """Index of the labels of a level (a MultiIndex for units and topics)."""
+    if level == "subject":
+        return pd.Index(df["SUBJECT"])
+    return pd.MultiIndex.from_frame(df[LABEL_COLUMNS[level]])
+
+@dataclass(frozen=True)
+class ClassSchema:
+    """
+    Everything the student sheets of a class share: exams, labels, headers and maximum marks.
+
+    Each subject, unit and topic label is held once here instead of once per
+    student report.
+
+    - exams: Exam types, in exam order.
+    - subjects: Subject names.
+    - units: DataFrame of SUBJECT, UNIT, one row per unit.
+    - topics: DataFrame of SUBJECT, UNIT, TOPIC, one row per topic.
+    - max_marks: Dictionary mapping each level to an exams × labels array
+      (NaN where the exam has no questions on the label).
+    - headers: Dictionary mapping each level to its table headers.
+    """
+    exams: pd.Index
+    subjects: pd.Index
+    units: pd.DataFrame
+    topics: pd.DataFrame
+    max_marks: dict
+    headers: dict = field(default_factory=lambda: dict(DEFAULT_HEADERS))
+
+    def labels(self, level):
+        """DataFrame of the labels of a level, one row per position on its axis."""
+        if level == "topic":
+            return self.topics
+        if level == "unit":
+            return self.units
+        return pd.DataFrame({"SUBJECT": self.subjects})
+
+    @cached_property
+    def label_values(self):
+        """Dictionary mapping each level to its label columns as plain lists."""
+        return {level: {column: df[column].tolist() for column in df.columns} for level, df in ((level, self.labels(level)) for level in LEVELS)}
+
+    @cached_property
+    def unit_of_topic(self):
+        return _label_index(self.units, "unit").get_indexer(_label_index(self.topics, "unit"))
+
+    @cached_property
+    def subject_of_unit(self):
+        return self.subjects.get_indexer(self.units["SUBJECT"])
+
+@dataclass
+class PerformanceCube:
+    """
+    Marks and percentages of a whole class in dense student × exam × label arrays.
+
+    Every level (subject, unit, topic) has three float32 arrays of shape
+    students × exams × labels; a NaN obtained mark means the student's sheet
+    has no row for the label in that exam (like a "0/0" row).
+
+    - schema: ClassSchema shared by every student.
+    - students: Student IDs, in the order of the student axis.
+    - obtained: Dictionary mapping each level to the obtained marks.
+    - performance: Dictionary mapping each level to the PERFORMANCE %.
+    - overall: Dictionary mapping each level to the OVERALL %.
+    - details: Dictionary mapping student ID to its details (NAME, STANDARD, ...).
+    - positions: Dictionary mapping each level to the int16 row position of
+      every label in its table (-1 where absent), so reports keep the row
+      order of their sheet; empty for cubes not read from sheets.
+    - sections: int16 students × exams × subjects array of the position of
+      each subject's section in the report (-1 where absent), or None.
+    - extras: Dictionary mapping each level to {column: object array} of the
+      raw values of table columns without a score array (e.g. GRADE).
+    - parsed: Dictionary mapping (student, exam) to the parsed StudentReport of
+      the reports the arrays cannot reproduce exactly (see cube_from_workbook).
+    """
+    schema: ClassSchema
+    students: pd.Index
+    obtained: dict
+    performance: dict
+    overall: dict
+    details: dict = field(default_factory=dict)
+    positions: dict = field(default_factory=dict)
+    sections: np.ndarray = None
+    extras: dict = field(default_factory=dict)
+    parsed: dict = field(default_factory=dict)
+
+    @property
+    def exams(self):
+        return self.schema.exams
+
+    @property
+    def nbytes(self):
+        """Size in bytes of the score and layout arrays."""
+        arrays = [array for values in (self.obtained, self.performance, self.overall, self.positions) for array in values.values()]
+        arrays += [array for columns in self.extras.values() for array in columns.values()]
+        if self.sections is not None:
+            arrays.append(self.sections)
+        return sum(array.nbytes for array in arrays)
+
+    @classmethod
+    def from_records(cls, records, details=None, headers=None, sections=None, extras=None):
+        """
+        Build a cube from long records (see summary_export.records_frame).
+
+        Parameters:
+        - records: DataFrame of RECORD_COLUMNS, optionally with the POSITION
+          of each row in its table.
+        - details: Optional dictionary mapping student ID to its details.
+        - headers: Optional dictionary mapping each level to its table headers.
+        - sections: Optional DataFrame of STUDENT, EXAM, SUBJECT, POSITION
+          giving the order of the subject sections of each report.
+        - extras: Optional DataFrame of STUDENT, EXAM, LEVEL, SUBJECT, UNIT,
+          TOPIC, COLUMN, VALUE holding the raw cells of the extra columns.
+
+        Returns:
+        - PerformanceCube of the records.
+        """
+        keys = records if sections is None else pd.concat([records[["STUDENT", "EXAM"]], sections[["STUDENT", "EXAM"]]])
+        exams = pd.Index(pd.unique(keys["EXAM"]))
+        students = pd.Index(pd.unique(keys["STUDENT"]))
+        by_level = {level: records[records["LEVEL"] == level] for level in LEVELS}
+
+        # Intern the labels in order of first appearance
+        topics = by_level["topic"][LABEL_COLUMNS["topic"]].drop_duplicates(ignore_index=True)
+        units = pd.concat([by_level["unit"][LABEL_COLUMNS["unit"]], topics[LABEL_COLUMNS["unit"]]]).drop_duplicates(ignore_index=True)
+        section_subjects = sections["SUBJECT"] if sections is not None else pd.Series(dtype=object)
+        subjects = pd.Index(pd.unique(pd.concat([by_level["subject"]["SUBJECT"], units["SUBJECT"], section_subjects])))
+        labels = {"subject": subjects, "unit": _label_index(units, "unit"), "topic": _label_index(topics, "topic")}
+
+        def axes(rows, level):
+            # Student, exam and label positions of long rows
+            return students.get_indexer(rows["STUDENT"]), exams.get_indexer(rows["EXAM"]), labels[level].get_indexer(_label_index(rows, level))
+
+        max_marks = {}
+        obtained = {}
+        performance = {}
+        overall = {}
+        positions = {}
+        for level, rows in by_level.items():
+            shape = (len(students), len(exams), len(labels[level]))
+            s, e, n = axes(rows, level)
+            max_marks[level] = np.full(shape[1:], np.nan, dtype=np.float32)
+            known = rows["MAX MARKS"].notna().to_numpy()
+            max_marks[level][e[known], n[known]] = rows["MAX MARKS"].to_numpy(dtype=np.float32)[known]
+            for arrays, column in ((obtained, "OBTAINED"), (performance, "PERFORMANCE %"), (overall, "OVERALL %")):
+                arrays[level] = np.full(shape, np.nan, dtype=np.float32)
+                arrays[level][s, e, n] = rows[column].to_numpy(dtype=np.float32)
+            if "POSITION" in rows:
+                positions[level] = np.full(shape, -1, dtype=np.int16)
+                positions[level][s, e, n] = rows["POSITION"].to_numpy(dtype=np.int16)
+
+        section_positions = None
+        if sections is not None:
+            section_positions = np.full((len(students), len(exams), len(subjects)), -1, dtype=np.int16)
+            section_positions[students.get_indexer(sections["STUDENT"]), exams.get_indexer(sections["EXAM"]), subjects.get_indexer(sections["SUBJECT"])] = sections["POSITION"].to_numpy(dtype=np.int16)
+
+        extra_values = {}
+        if extras is not None:
+            for (level, column), rows in extras.groupby(["LEVEL", "COLUMN"], sort=False):
+                s, e, n = axes(rows, level)
+                values = np.full((len(students), len(exams), len(labels[level])), None, dtype=object)
+                values[s, e, n] = rows["VALUE"].to_numpy(dtype=object)
+                extra_values.setdefault(level, {})[column] = values
+
+        schema = ClassSchema(exams, subjects, units, topics, max_marks, {**DEFAULT_HEADERS, **(headers or {})})
+        return cls(schema, students, obtained, performance, overall, details or {}, positions, section_positions, extra_values)
+
+    def student_report(self, student, exam):
+        """
+        Slice the StudentReport of one student and exam out of the cube, ready for the renderers.
+
+        Parameters:
+        - student: Student ID.
+        - exam: Exam type.
+
+        Returns:
+        - StudentReport with the overall, unit-wise and topic-wise tables.
+        """
+        if (student, exam) in self.parsed:
+            return self.parsed[(student, exam)]
+        s = self.students.get_loc(student)
+        e = self.exams.get_loc(exam)
+        schema = self.schema
+        student_details = {"ID": student, **self.details.get(student, {}), "EXAM TYPE": exam}
+
+        def table(level, positions):
+            if level in self.positions:
+                # Rows in the order of the student's sheet
+                positions = positions[np.argsort(self.positions[level][s, e, positions], kind="stable")]
+            headers = schema.headers[level]
+            max_marks = schema.max_marks[level][e, positions]
+            columns = {
+                "OBTAINED MARKS": [f"{obtained}/{maximum}" for obtained, maximum in zip(_numbers(self.obtained[level][s, e, positions]), _numbers(max_marks))],
+                "MAX MARKS": _numbers(max_marks),
+                "PERFORMANCE %": _numbers(self.performance[level][s, e, positions]),
+                "OVERALL %": _numbers(self.overall[level][s, e, positions]),
+            }
+            for column, values in schema.label_values[level].items():
+                columns[column] = [values[i] for i in positions]
+            for column, values in self.extras.get(level, {}).items():
+                columns[column] = values[s, e, positions].tolist()
+            blank = [None] * len(positions)
+            rows = tuple(zip(*(columns.get(header, blank) for header in headers)))
+            if level == "subject" or "OVERALL %" not in headers or "PERFORMANCE %" not in headers or "OBTAINED MARKS" not in headers:
+                return ReportTable(headers, rows)
+            return ReportTable(headers, rows, headers.index("OBTAINED MARKS"), headers.index("OVERALL %"))
+
+        present = {level: ~np.isnan(self.obtained[level][s, e]) for level in LEVELS}
+        subjects = []
+        subject_of_topic = schema.subject_of_unit[schema.unit_of_topic]
+        if self.sections is not None:
+            # The subject sections of the student's sheet, in sheet order
+            order = self.sections[s, e]
+            section_subjects = np.flatnonzero(order >= 0)
+            section_subjects = section_subjects[np.argsort(order[section_subjects], kind="stable")]
+        else:
+            section_subjects = range(len(schema.subjects))
+        for j in section_subjects:
+            unit_positions = np.flatnonzero(present["unit"] & (schema.subject_of_unit == j))
+            topic_positions = np.flatnonzero(present["topic"] & (subject_of_topic == j))
+            if self.sections is None and len(unit_positions) == 0 and len(topic_positions) == 0:
+                continue  # No questions of this subject in the exam
+            subjects.append(SubjectSection(schema.subjects[j], table("unit", unit_positions), table("topic", topic_positions)))
+
+        overall = table("subject", np.flatnonzero(present["subject"]))
+        return StudentReport(student_details, exam, overall, tuple(subjects))
+
+    def reports(self):
+        """Yield ((student, exam), StudentReport) for every student and exam with marks or a report section."""
+        has_marks = ~np.isnan(self.obtained["subject"]).all(axis=2)
+        if self.sections is not None:
+            has_marks |= (self.sections >= 0).any(axis=2)
+        yielded = set()
+        for s, e in zip(*np.nonzero(has_marks)):
+            student, exam = self.students[s], self.exams[e]
+            if exam != exam:
+                exam = None  # Block without an EXAM TYPE
+            yielded.add((student, exam))
+            yield (student, exam), self.student_report(student, exam)
+        # Reports kept as parsed without any marks in the arrays
+        for key, report in self.parsed.items():
+            if key not in yielded:
+                yield key, report
+
+    def to_frame(self, level="topic"):
+        """
+        Long table of a level with one row per student, exam and label present in the cube.
+
+        Columns: STUDENT, EXAM, the label columns, OBTAINED, MAX MARKS,
+        PERFORMANCE % and OVERALL %.
+        """
+        obtained = self.obtained[level]
+        num_students, num_exams, num_labels = obtained.shape
+        labels = self.schema.labels(level)
+        frame = pd.DataFrame({
+            "STUDENT": np.repeat(self.students.to_numpy(), num_exams * num_labels),
+            "EXAM": np.tile(np.repeat(self.exams.to_numpy(), num_labels), num_students),
+        })
+        for column in labels.columns:
+            frame[column] = np.tile(labels[column].to_numpy(), num_students * num_exams)
+        frame["OBTAINED"] = obtained.ravel()
+        frame["MAX MARKS"] = np.broadcast_to(self.schema.max_marks[level], obtained.shape).ravel()
+        frame["PERFORMANCE %"] = self.performance[level].ravel()
+        frame["OVERALL %"] = self.overall[level].ravel()
+        return frame[~np.isnan(obtained.ravel())].reset_index(drop=True)
+
+    def records(self):
+        """All levels as long records in the summary_export layout (RECORD_COLUMNS)."""
+        frames = [self.to_frame(level).assign(LEVEL=level) for level in LEVELS]
+        df = pd.concat(frames, ignore_index=True).reindex(columns=RECORD_COLUMNS)
+        for column in ("STUDENT", "EXAM", "LEVEL", "SUBJECT", "UNIT", "TOPIC"):
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+        return df
+
+def _exam_key(report):
+    """Exam of a report as the records hold it (see summary_export.records_frame)."""
+    exam = report.exam_type
+    return None if exam is None or exam != exam else str(exam)
+
+def _report_layout(report):
+    """
+    Row position and extra cells of every record of report_records(report), in the same order.
+
+    Returns:
+    - List of (position, cells) pairs, cells being ((header, value), ...) for
+      the columns of the row's table without a score array (see SCORE_COLUMNS).
+    """
+    layout = []
+    tables = [report.overall] + [table for subject in report.subjects for table in (subject.units, subject.topics)]
+    for table in tables:
+        if table is None:
+            continue
+        extra = [(i, header) for i, header in enumerate(table.headers) if header not in SCORE_COLUMNS]
+        layout.extend((position, tuple((header, row[i]) for i, header in extra)) for position, row in enumerate(table.rows))
+    return layout
+
+def cube_from_workbook(file_path, column_start=None, column_end=None, on_error=None, select_blocks=None):
+    """
+    Parse the student sheets of a workbook into a PerformanceCube.
+
+    The sheets are streamed one at a time (see workbook_reader) and each one
+    is reduced to long records before the next is read, so no per-student
+    DataFrame or report is kept. The row and section order of every report
+    and the raw cells of extra table columns (e.g. GRADE) are recorded with
+    the scores. Every report sliced out of the cube is then checked against
+    the fingerprint of the report parsed from the sheet; the sheets of the
+    few that differ (other headers, marks that are not numbers, ...) are read
+    again and those reports kept as parsed, so the cube's reports are always
+    identical to the parsed ones.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - column_start: Starting column of one exam block; None reads every exam block.
+    - column_end: Ending column of one exam block.
+    - on_error: Optional callable(sheet_name, exception) for sheets that cannot be read or parsed.
+    - select_blocks: Optional callable(sheet_name, df) returning the (exam type, block)
+      pairs of a sheet to read, e.g. to validate the blocks and leave out those with
+      layout errors; defaults to every exam block (or the column window).
+
+    Returns:
+    - PerformanceCube of the class, with the table headers of the first sheet.
+    """
+    records = []
+    layout = []
+    sections = []
+    details = {}
+    headers = {}
+    fingerprints = {}
+    read_sheets = set()
+    failed_sheets = set()
+    # Exam types of the blocks read from each sheet, so a second read takes the same blocks
+    selected = {}
+
+    def sheet_error(sheet_name, e):
+        failed_sheets.add(sheet_name)
+        on_error(sheet_name, e)
+
+    reader_error = sheet_error if on_error is not None else None
+
+    def sheet_blocks(df):
+        return split_exam_blocks(df) if column_start is None else [(None, df)]
+
+    for sheet_name, df in iter_student_sheets(file_path, column_start, column_end, on_error=reader_error):
+        read_sheets.add(sheet_name)
+        try:
+            blocks = select_blocks(sheet_name, df) if select_blocks is not None else sheet_blocks(df)
+            selected[sheet_name] = {exam_type for exam_type, _ in blocks}
+            reports = [parse_report(block) for _, block in blocks]
+        except Exception as e:
+            if on_error is None:
+                raise
+            sheet_error(sheet_name, e)
+            continue
+        for report in reports:
+            exam = _exam_key(report)
+            records.extend(report_records(sheet_name, report))
+            layout.extend(_report_layout(report))
+            sections.extend((sheet_name, exam, str(subject.name), position) for position, subject in enumerate(report.subjects))
+            details.setdefault(sheet_name, report.details)
+            _collect_headers(headers, report)
+            fingerprints[(sheet_name, exam)] = report_fingerprint(report)
+
+    frame = records_frame(records)
+    frame["POSITION"] = [position for position, _ in layout]
+    extra_cells = [(i, column, value) for i, (_, cells) in enumerate(layout) for column, value in cells]
+    extras = None
+    if extra_cells:
+        index, columns, values = zip(*extra_cells)
+        extras = frame.loc[list(index), ["STUDENT", "EXAM", "LEVEL", "SUBJECT", "UNIT", "TOPIC"]].reset_index(drop=True)
+        extras["COLUMN"] = list(columns)
+        extras["VALUE"] = pd.Series(values, dtype=object)
+    sections = pd.DataFrame(sections, columns=["STUDENT", "EXAM", "SUBJECT", "POSITION"])
+    cube = PerformanceCube.from_records(frame, details, headers, sections, extras)
+
+    # Keep the reports the arrays cannot reproduce exactly as parsed
+    mismatched = set()
+    for key, fingerprint in fingerprints.items():
+        try:
+            if report_fingerprint(cube.student_report(*key)) == fingerprint:
+                continue
+        except (KeyError, IndexError, ValueError):
+            pass
+        mismatched.add(key)
+    if mismatched:
+        sheets = {sheet_name for sheet_name, _ in mismatched}
+        skip_sheets = set(NON_STUDENT_SHEETS) | {sheet_name.strip().upper() for sheet_name in (read_sheets | failed_sheets) - sheets}
+        for sheet_name, df in iter_student_sheets(file_path, column_start, column_end, skip_sheets=skip_sheets, on_error=reader_error):
+            if sheet_name not in sheets:
+                continue
+            for report in (parse_report(block) for exam_type, block in sheet_blocks(df) if exam_type in selected[sheet_name]):
+                if (sheet_name, _exam_key(report)) in mismatched:
+                    cube.parsed[(sheet_name, _exam_key(report))] = report
+        print(f"{len(cube.parsed)} report(s) do not fit the class-wide cube exactly and are kept as parsed.")
+    return cube
+
+def _collect_headers(headers, report):
+    """Remember the first headers seen for each level."""
+    if report.overall is not None and report.overall.headers:
+        headers.setdefault("subject", report.overall.headers)
+    for subject in report.subjects:
+        if subject.units is not None and subject.units.headers:
+            headers.setdefault("unit", subject.units.headers)
+        if subject.topics is not None and subject.topics.headers:
+            headers.setdefault("topic", subject.topics.headers)
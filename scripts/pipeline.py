@@ -0,0 +1,421 @@
+# Required Libraries
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from convert_to_pdf import LibreOfficeWorker, find_soffice
+from generate_reports import BYTE_RENDERERS, RENDER_VERSION, RENDERERS, render_fingerprint
+from logo_cache import default_resolver
+from report_manifest import ReportManifest
+from report_parser import parse_report, report_file_name
+from validate_workbook import NO_EXAM_BLOCK_ERROR, layout_error, validate_block
+from workbook_reader import iter_student_sheets, split_exam_blocks
+
+# Marks the end of a stage's input
+_DONE = object()
+
+@dataclass
+class ReportJob:
+    """
+    One report travelling through the pipeline.
+
+    - key: Sheet name, or (sheet name, exam type) pair.
+    - report: Parsed StudentReport (dropped once rendered).
+    - file_name: Name of the report file.
+    - fingerprint: Fingerprint of the report's input and logo (see report_manifest), set by the logo stage.
+    - content: Bytes of the rendered file.
+    - path: Path of the saved file.
+    """
+    key: object
+    report: object
+    file_name: str
+    fingerprint: str = None
+    content: bytes = None
+    path: str = None
+
+@dataclass
+class StageStats:
+    """
+    Counters of one stage.
+
+    - name: Stage name.
+    - workers: Number of worker threads.
+    - items: Jobs processed.
+    - busy: Seconds spent processing, summed over the workers.
+    - max_depth: Largest number of jobs seen waiting in the stage's input queue.
+    - depth_total / depth_samples: Running sum and count of the sampled queue depth.
+    """
+    name: str
+    workers: int
+    items: int = 0
+    busy: float = 0.0
+    max_depth: int = 0
+    depth_total: int = 0
+    depth_samples: int = 0
+
+    @property
+    def mean_depth(self):
+        return self.depth_total / self.depth_samples if self.depth_samples else 0.0
+
+class Stage:
+    """
+    One step of the pipeline: a bounded input queue drained by worker threads.
+
+    The function receives a job and returns it for the next stage, or None
+    to drop it. When the input is exhausted the last worker to finish closes
+    the next stage's input, so the end of the run flows down the pipeline.
+    """
+
+    def __init__(self, name, function, workers=1, queue_size=16, on_error=None):
+        """
+        Parameters:
+        - name: Stage name used in the statistics.
+        - function: Callable(job) returning the job for the next stage, or None.
+        - workers: Number of worker threads.
+        - queue_size: Capacity of the input queue; producers block when it is full.
+        - on_error: Callable(job, stage_name, exception) for jobs that raised.
+        """
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats(name, workers)
+        self.next = None
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._running = workers
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def close(self):
+        """Signal the end of the input."""
+        for _ in range(self.workers):
+            self.queue.put(_DONE)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def sample(self):
+        """Record the current depth of the input queue."""
+        depth = self.queue.qsize()
+        self.stats.max_depth = max(self.stats.max_depth, depth)
+        self.stats.depth_total += depth
+        self.stats.depth_samples += 1
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                job = self.function(job)
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(job, self.name, e)
+                job = None
+            with self._lock:
+                self.stats.items += 1
+                self.stats.busy += time.perf_counter() - start
+            if job is not None and self.next is not None:
+                self.next.queue.put(job)
+
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last and self.next is not None:
+            self.next.close()
+
+class ReportPipeline:
+    """
+    Staged producer/consumer generation of many reports.
+
+    Parsed reports flow through bounded queues: logo resolution (which also
+    skips the reports the manifest records as unchanged) and saving run on
+    threads (I/O), rendering runs on a process pool (CPU), and
+    optional PDF conversion of DOCX reports on LibreOffice workers. While
+    one report is being rendered, the next logos are fetched and the
+    previous documents written, and the queue bounds keep at most a fixed
+    number of reports in memory.
+    """
+
+    def __init__(self, output_dir, output_format="docx", render_workers=None, io_workers=4, convert_workers=0, queue_size=16, force=False, sample_interval=0.05):
+        """
+        Parameters:
+        - output_dir: Directory the reports are written to.
+        - output_format: 'docx' or 'pdf'.
+        - render_workers: Number of rendering processes (defaults to the CPU count).
+        - io_workers: Number of threads of the logo and save stages.
+        - convert_workers: Number of LibreOffice workers converting the saved
+          DOCX reports to PDF (0 disables the conversion stage).
+        - queue_size: Capacity of every stage queue.
+        - force: Rebuild every report, even those the manifest records as up to date.
+        - sample_interval: Seconds between two samples of the queue depths.
+        """
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.render_workers = render_workers or os.cpu_count() or 1
+        self.io_workers = io_workers
+        self.convert_workers = convert_workers if output_format == "docx" else 0
+        self.queue_size = queue_size
+        self.force = force
+        self.sample_interval = sample_interval
+        self.results = {}
+        self.converted = {}
+        self.conversion_errors = {}
+        self.errors = {}
+        self.stats = []
+        self.elapsed = 0.0
+
+    def _record_error(self, job, stage_name, e):
+        if stage_name == "convert":
+            # The DOCX report is saved and stays in results; only its PDF is missing
+            self.conversion_errors[job.key] = f"Error in the convert stage: {e}"
+        else:
+            self.errors[job.key] = f"Error in the {stage_name} stage: {e}"
+
+    def run(self, reports):
+        """
+        Generate the reports.
+
+        Parameters:
+        - reports: Iterable of (key, StudentReport, file_prefix); consumed
+          lazily, so parsing overlaps with the later stages.
+
+        Returns:
+        - Tuple (results, errors): results maps each key to its report path,
+          errors maps each key to the reason its report was not generated.
+          PDFs converted by the conversion stage are in self.converted, and
+          the reasons conversions failed in self.conversion_errors (a key is
+          never in both results and errors).
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        extension = RENDERERS[self.output_format][1]
+        renderer = BYTE_RENDERERS[self.output_format]
+        manifest = ReportManifest(self.output_dir, RENDER_VERSION)
+        resolver = default_resolver()
+        soffice = find_soffice() if self.convert_workers else None
+        if self.convert_workers and soffice is None:
+            print("LibreOffice (soffice) was not found on PATH; skipping the PDF conversion stage.")
+        local = threading.local()
+        libreoffice_workers = []
+
+        skipped = []
+
+        def resolve_logo(job):
+            # The logo is part of the fingerprint; resolving it also warms the
+            # on-disk cache the rendering processes read from
+            job.fingerprint = render_fingerprint(job.report, resolver)
+            report_path = manifest.is_current(job.file_name, job.fingerprint) if not self.force else None
+            if report_path:
+                self.results[job.key] = report_path
+                skipped.append(job.key)
+                return None
+            return job
+
+        def render(job):
+            job.content = executor.submit(renderer, job.report).result()
+            job.report = None
+            if job.content is None:
+                raise ValueError("Missing EXAM TYPE in the student details.")
+            return job
+
+        def save(job):
+            path = os.path.join(self.output_dir, job.file_name)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as report_file:
+                report_file.write(job.content)
+            os.replace(tmp_path, path)
+            job.content = None
+            job.path = path
+            self.results[job.key] = path
+            manifest.record(job.file_name, job.fingerprint, path)
+            return job if soffice else None
+
+        def convert(job):
+            if not hasattr(local, "worker"):
+                local.worker = LibreOfficeWorker(soffice)
+                libreoffice_workers.append(local.worker)
+            output = os.path.splitext(job.path)[0] + ".pdf"
+            local.worker.convert(job.path, output, timeout=120)
+            self.converted[job.key] = output
+            return None
+
+        stages = [
+            Stage("logo", resolve_logo, self.io_workers, self.queue_size, self._record_error),
+            Stage("render", render, self.render_workers, self.queue_size, self._record_error),
+            Stage("save", save, self.io_workers, self.queue_size, self._record_error),
+        ]
+        if soffice:
+            stages.append(Stage("convert", convert, self.convert_workers, self.queue_size, self._record_error))
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next = next_stage
+        parse_stats = StageStats("parse", 1)
+        self.stats = [parse_stats] + [stage.stats for stage in stages]
+
+        # Sample the queue depths while the pipeline runs
+        running = threading.Event()
+        running.set()
+
+        def monitor():
+            while running.is_set():
+                for stage in stages:
+                    stage.sample()
+                time.sleep(self.sample_interval)
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.render_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            monitor_thread = threading.Thread(target=monitor, daemon=True)
+            monitor_thread.start()
+            for stage in stages:
+                stage.start()
+            try:
+                # Parse stage: runs on this thread and blocks when the logo queue is full
+                iterator = iter(reports)
+                while True:
+                    parse_start = time.perf_counter()
+                    try:
+                        key, report, file_prefix = next(iterator)
+                    except StopIteration:
+                        break
+                    file_name = report_file_name(report, file_prefix, extension)
+                    parse_stats.items += 1
+                    parse_stats.busy += time.perf_counter() - parse_start
+                    stages[0].queue.put(ReportJob(key, report, file_name))
+            finally:
+                stages[0].close()
+                for stage in stages:
+                    stage.join()
+                running.clear()
+                monitor_thread.join()
+                for worker in libreoffice_workers:
+                    worker.close()
+        self.elapsed = time.perf_counter() - start
+
+        if skipped:
+            print(f"Skipping {len(skipped)} unchanged report(s).")
+        manifest.save()
+        return self.results, self.errors
+
+    def stats_table(self):
+        """Per-stage throughput, utilization and queue depth as printable text."""
+        lines = [f"{'STAGE':<8} {'WORKERS':>7} {'ITEMS':>6} {'BUSY S':>8} {'ITEMS/S':>8} {'UTIL %':>7} {'MAX Q':>6} {'MEAN Q':>7}"]
+        for stats in self.stats:
+            throughput = stats.items / self.elapsed if self.elapsed else 0.0
+            utilization = 100 * stats.busy / (self.elapsed * stats.workers) if self.elapsed else 0.0
+            lines.append(
+                f"{stats.name:<8} {stats.workers:>7} {stats.items:>6} {stats.busy:>8.2f} {throughput:>8.1f} "
+                f"{utilization:>7.1f} {stats.max_depth:>6} {stats.mean_depth:>7.1f}"
+            )
+        lines.append(f"Total wall time: {self.elapsed:.2f} s")
+        return "\n".join(lines)
+
+def iter_workbook_reports(file_path, column_start=None, column_end=None, all_exams=False, on_error=None, validate=True, on_layout_error=None):
+    """
+    Stream and parse the student sheets of a workbook for the pipeline.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - column_start, column_end: Column window of one exam block (ignored with all_exams).
+    - all_exams: Generate the report of every exam block of each sheet.
+    - on_error: Callable(sheet_name, exception) for sheets that cannot be read or parsed.
+    - validate: Check the layout of every exam block first (see validate_workbook)
+      and leave out the blocks with layout errors.
+    - on_layout_error: Callable(key, reason) for the blocks left out (the reason is printed without it).
+
+    Yields:
+    - (key, StudentReport, file_prefix), with the keys of generate_all_reports.
+    """
+    def skip(key, reason):
+        if on_layout_error is None:
+            print(f"Skipping {key}: {reason}")
+        else:
+            on_layout_error(key, reason)
+
+    column_window = (None, None) if all_exams else (column_start, column_end)
+    for sheet_name, df in iter_student_sheets(file_path, *column_window, on_error=on_error):
+        try:
+            if all_exams:
+                blocks = [((sheet_name, exam_type), block) for exam_type, block in split_exam_blocks(df)]
+                if validate and not blocks:
+                    skip(sheet_name, NO_EXAM_BLOCK_ERROR)
+            else:
+                blocks = [(sheet_name, df)]
+            parsed = []
+            for key, block in blocks:
+                error = layout_error(validate_block(block)) if validate else None
+                if error:
+                    skip(key, error)
+                else:
+                    parsed.append((key, parse_report(block)))
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(sheet_name, e)
+            continue
+        for key, report in parsed:
+            yield key, report, f"{sheet_name}_"
+
+def run_pipeline(file_path, output_dir, column_start=None, column_end=None, all_exams=False, output_format="docx", render_workers=None, io_workers=4, convert_workers=0, queue_size=16, force=False, validate=True):
+    """
+    Generate the reports of every student in the workbook through a ReportPipeline.
+
+    Exam blocks with layout errors are reported in errors instead of being
+    rendered, unless validate is False.
+
+    Returns:
+    - Tuple (results, errors, pipeline); the pipeline holds the stage statistics.
+    """
+    pipeline = ReportPipeline(output_dir, output_format, render_workers, io_workers, convert_workers, queue_size, force)
+
+    def record_error(sheet_name, e):
+        pipeline.errors[sheet_name] = f"Error reading the sheet: {e}"
+
+    def record_layout_error(key, reason):
+        pipeline.errors[key] = reason
+
+    reports = iter_workbook_reports(file_path, column_start, column_end, all_exams, record_error, validate, record_layout_error)
+    results, errors = pipeline.run(reports)
+    return results, errors, pipeline
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate every report of a workbook through a staged, bounded-memory pipeline.")
+    parser.add_argument("file", help="Path to the Excel workbook.")
+    parser.add_argument("--output-dir", default="reports", help="Directory the reports are written to.")
+    parser.add_argument("--column-start", default="AC", help="First column of the exam block.")
+    parser.add_argument("--column-end", default="AJ", help="Last column of the exam block.")
+    parser.add_argument("--all-exams", action="store_true", help="Generate the report of every exam block instead of a single column range.")
+    parser.add_argument("--format", choices=sorted(BYTE_RENDERERS), default="docx", help="Output format.")
+    parser.add_argument("--render-workers", type=int, default=None, help="Number of rendering processes.")
+    parser.add_argument("--io-workers", type=int, default=4, help="Number of threads of the logo and save stages.")
+    parser.add_argument("--convert-workers", type=int, default=0, help="Number of LibreOffice workers converting DOCX reports to PDF (0: no conversion).")
+    parser.add_argument("--queue-size", type=int, default=16, help="Capacity of every stage queue.")
+    parser.add_argument("--force", action="store_true", help="Rebuild every report, even unchanged ones.")
+    parser.add_argument("--no-validate", action="store_true", help="Skip the layout check of every exam block before rendering.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print("The specified file path does not exist. Please check and try again.")
+    else:
+        results, errors, pipeline = run_pipeline(
+            args.file, args.output_dir, args.column_start, args.column_end, args.all_exams, args.format,
+            args.render_workers, args.io_workers, args.convert_workers, args.queue_size, args.force, not args.no_validate,
+        )
+        print(f"Generated {len(results)} report(s), {len(errors)} failed.")
+        for key, error in errors.items():
+            print(f"  {key}: {error}")
+        if pipeline.converted or pipeline.conversion_errors:
+            print(f"Converted {len(pipeline.converted)} report(s) to PDF, {len(pipeline.conversion_errors)} conversion(s) failed.")
+            for key, error in pipeline.conversion_errors.items():
+                print(f"  {key}: {error}")
+        print(pipeline.stats_table())
@@ -0,0 +1,87 @@
+# Required Libraries
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".report_manifest.json"
+
+def report_fingerprint(report, logo=None, render_version=None):
+    """
+    Fingerprint the data a report is rendered from.
+
+    The parsed report holds everything taken from the student's sheet slice
+    (details, overall summary and subject tables); with the logo image and
+    the renderer version, two reports with the same fingerprint render the
+    same document, and a changed logo or renderer marks the report stale.
+
+    Parameters:
+    - report: StudentReport produced by report_parser.parse_report.
+    - logo: Image bytes of the report's logo (None without a logo, or when it could not be loaded).
+    - render_version: Version of the renderer (see generate_reports.RENDER_VERSION).
+
+    Returns:
+    - Hex digest of the report's content, logo and renderer.
+    """
+    digest = hashlib.sha256(repr(report).encode("utf-8"))
+    digest.update(b"\0logo:" + (hashlib.sha256(logo).digest() if logo is not None else b"none"))
+    digest.update(f"\0render:{render_version}".encode("utf-8"))
+    return digest.hexdigest()
+
+class ReportManifest:
+    """
+    Record of the reports generated into an output directory.
+
+    Each entry keeps the fingerprint of the report's input, the rendering
+    version and the output path, so a rerun only rebuilds the reports whose
+    input or renderer changed.
+    """
+
+    def __init__(self, output_dir, render_version):
+        """
+        Parameters:
+        - output_dir: Directory the reports are written to; the manifest is stored in it.
+        - render_version: Version of the renderer; entries of another version are stale.
+        """
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.render_version = render_version
+        try:
+            with open(self.path, "r", encoding="utf-8") as manifest_file:
+                self.entries = json.load(manifest_file).get("reports", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, key, fingerprint):
+        """
+        Check whether a report is up to date.
+
+        Parameters:
+        - key: Report key (its file name).
+        - fingerprint: Fingerprint of the report's current input.
+
+        Returns:
+        - The recorded output path if the report can be reused, otherwise None.
+        """
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and entry["render_version"] == self.render_version
+            and os.path.exists(entry["output_path"])
+        ):
+            return entry["output_path"]
+        return None
+
+    def record(self, key, fingerprint, output_path):
+        """Store the input fingerprint and output path of a generated report."""
+        self.entries[key] = {
+            "fingerprint": fingerprint,
+            "render_version": self.render_version,
+            "output_path": output_path,
+        }
+
+    def save(self):
+        """Write the manifest next to the reports."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump({"reports": self.entries}, manifest_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,166 @@
+# Required Libraries
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class ReportTable:
+    """
+    One table of the report (overall, unit-wise or topic-wise).
+
+    - headers: Header labels of the table (empty if the header row was blank).
+    - rows: Tuple of row tuples holding the raw cell values (None for blank cells).
+    - obtained_idx: Index of the "OBTAINED MARKS" column, -1 if not found.
+    - overall_idx: Index of the "OVERALL %" column, -1 if not found.
+    """
+    headers: tuple
+    rows: tuple = ()
+    obtained_idx: int = -1
+    overall_idx: int = -1
+
+@dataclass(frozen=True, slots=True)
+class SubjectSection:
+    """
+    Unit-wise and topic-wise tables of one subject.
+
+    A table is None when the sheet ended before its section started.
+    """
+    name: str
+    units: ReportTable = None
+    topics: ReportTable = None
+
+@dataclass(frozen=True, slots=True)
+class StudentReport:
+    """
+    Everything the renderer needs to build one student's exam report.
+
+    - details: Student details keyed by upper-case header (ID, NAME, ...).
+    - exam_type: Value of the "EXAM TYPE" cell, None if missing.
+    - overall: Overall summary table, None if the sheet ended before it.
+    - subjects: Tuple of SubjectSection in sheet order.
+    """
+    details: dict
+    exam_type: object = None
+    overall: ReportTable = None
+    subjects: tuple = ()
+
+def report_file_name(report, file_prefix="", extension=".docx"):
+    """File name of the rendered report of a parsed student report."""
+    return f"{file_prefix}{report.exam_type}_Report{extension}"
+
+def report_size(report):
+    """Number of tables and of table rows of a parsed student report."""
+    tables = [report.overall] if report.overall is not None else []
+    for subject in report.subjects:
+        tables.extend(table for table in (subject.units, subject.topics) if table is not None)
+    return {"tables": len(tables), "rows": sum(len(table.rows) for table in tables)}
+
+def _column_indices(headers):
+    """
+    Find the "OBTAINED MARKS" and "OVERALL %" columns of a unit or topic table.
+
+    All of "OBTAINED MARKS", "PERFORMANCE %" and "OVERALL %" must be present,
+    otherwise both indices are -1.
+    """
+    try:
+        obtained_idx = headers.index("OBTAINED MARKS")
+        headers.index("PERFORMANCE %")
+        overall_idx = headers.index("OVERALL %")
+    except ValueError:
+        obtained_idx = -1  # Column not found
+        overall_idx = -1
+    return obtained_idx, overall_idx
+
+def _fit_row(row, width):
+    """Pad or truncate a row to the number of table headers."""
+    if len(row) < width:
+        row = row + [None] * (width - len(row))
+    return tuple(row[:width])
+
+def parse_report(df):
+    """
+    Parse one exam block of a student sheet into a StudentReport.
+
+    Parameters:
+    - df: DataFrame holding the exam column window of one student sheet (no headers).
+
+    Returns:
+    - StudentReport describing the front page, the overall summary and every subject.
+    """
+    # Rows as plain lists with None for blank cells, plus one mask of blank rows
+    rows = df.astype(object).where(df.notna(), None).values.tolist()
+    blank = df.isna().all(axis=1).to_numpy()
+    num_rows = len(rows)
+    row_idx = 0
+
+    def skip_blank(row_idx):
+        while row_idx < num_rows and blank[row_idx]:
+            row_idx += 1
+        return row_idx
+
+    def read_table(row_idx, with_indices):
+        # Header row followed by data rows up to the next blank row
+        headers = [value for value in rows[row_idx] if value is not None]
+        row_idx += 1
+        if not headers:
+            return ReportTable(headers=()), row_idx
+
+        obtained_idx, overall_idx = _column_indices(headers) if with_indices else (-1, -1)
+        table_rows = []
+        while row_idx < num_rows and not blank[row_idx]:
+            row = _fit_row(rows[row_idx], len(headers))
+            row_idx += 1
+            # Skip rows without any marks for this exam
+            if obtained_idx != -1 and str(row[obtained_idx]).strip() == "0/0":
+                continue
+            table_rows.append(row)
+        return ReportTable(tuple(headers), tuple(table_rows), obtained_idx, overall_idx), row_idx
+
+    # FRONT PAGE: Student Details
+    student_details = {}
+    exam_type = None
+    if row_idx + 1 < num_rows:
+        for header, value in zip(rows[row_idx], rows[row_idx + 1]):
+            if header == "EXAM TYPE":
+                exam_type = value
+            if header is not None and value is not None:
+                student_details[str(header).strip().upper()] = value
+        row_idx += 3  # Move past headers and values
+
+    # Overall Summary Table
+    overall = None
+    if row_idx < num_rows:
+        overall, row_idx = read_table(row_idx, with_indices=False)
+
+    row_idx = skip_blank(row_idx)
+
+    # SUBJECT PAGES: Unit-wise and Topic-wise tables
+    subjects = []
+    while row_idx < num_rows:
+        marker = rows[row_idx][0] if rows[row_idx] else None
+
+        if marker is not None and str(marker).strip() == "Subject":
+            current_row = rows[row_idx]
+            subject_name = current_row[1] if len(current_row) > 1 and current_row[1] is not None else "Unknown Subject"
+            row_idx += 1  # Move to Unit-wise Report heading
+
+            units = topics = None
+            if row_idx < num_rows:
+                units, row_idx = read_table(row_idx, with_indices=True)
+
+                # Skip the empty rows between Unit-wise and Topic-wise tables
+                row_idx = skip_blank(row_idx)
+
+                if row_idx < num_rows:
+                    topics, row_idx = read_table(row_idx, with_indices=True)
+
+            subjects.append(SubjectSection(subject_name, units, topics))
+        elif marker is not None and str(marker).strip().upper() == "END":
+            # Terminate processing if "END" is found
+            break
+        else:
+            # Move to next row if current row doesn't indicate a subject
+            row_idx += 1
+
+        # Skip any remaining empty rows before the next subject
+        row_idx = skip_blank(row_idx)
+
+    return StudentReport(student_details, exam_type, overall, tuple(subjects))
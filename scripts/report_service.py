@@ -0,0 +1,390 @@
+# Required Libraries
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+import json
+import os
+import threading
+import time
+import pandas as pd
+from generate_reports import BYTE_RENDERERS, RENDER_VERSION, render_fingerprint
+from report_parser import parse_report
+from validate_workbook import NO_EXAM_BLOCK_ERROR, layout_error, validate_block
+from workbook_cache import sheet_fingerprints
+from workbook_reader import NON_STUDENT_SHEETS, split_exam_blocks
+
+CONTENT_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+class WorkbookState:
+    """
+    Parsed reports of one workbook, kept up to date sheet by sheet.
+
+    - path: Absolute path of the workbook.
+    - name: Name the workbook is served under (its file name without extension).
+    - stat: (size, modification time) the reports were read at, None before the first load.
+    - fingerprints: Dictionary mapping sheet name to its fingerprint (see workbook_cache.sheet_fingerprints).
+    - reports: Dictionary mapping sheet name to a dictionary of exam type -> StudentReport.
+    - errors: Dictionary mapping sheet name (or '' for the workbook) to the reason it could not be
+      read, or to the layout errors of its exam blocks that are not served.
+    - validate: Check the layout of every exam block (see validate_workbook) and leave out those with errors.
+    """
+
+    def __init__(self, path, name, validate=True):
+        self.path = os.path.abspath(path)
+        self.name = name
+        self.validate = validate
+        self.stat = None
+        self.fingerprints = {}
+        self.reports = {}
+        self.errors = {}
+        self.loaded_at = None
+
+    def refresh(self):
+        """
+        Re-read the sheets whose fingerprint changed since the last load.
+
+        Returns:
+        - List of the sheet names that were (re)parsed; empty when the file is unchanged.
+        """
+        stat = os.stat(self.path)
+        stat = (stat.st_size, stat.st_mtime_ns)
+        if stat == self.stat:
+            return []
+        try:
+            fingerprints = {
+                sheet_name: key for sheet_name, key in sheet_fingerprints(self.path).items()
+                if sheet_name.strip().upper() not in NON_STUDENT_SHEETS
+            }
+        except Exception as e:
+            # Most likely caught mid-save; keep serving the last reports and retry on the next poll
+            self.errors[""] = f"Error loading Excel file: {e}"
+            return []
+        changed = [sheet_name for sheet_name, key in fingerprints.items() if self.fingerprints.get(sheet_name) != key]
+
+        reports = dict(self.reports)
+        errors = {}
+        if changed:
+            with pd.ExcelFile(self.path) as xls:
+                for sheet_name in changed:
+                    try:
+                        df = xls.parse(sheet_name, header=None)
+                        reports[sheet_name], layout_errors = self._parse_sheet(df)
+                        if layout_errors:
+                            errors[sheet_name] = " | ".join(layout_errors)
+                    except Exception as e:
+                        reports.pop(sheet_name, None)
+                        errors[sheet_name] = f"Error reading the sheet: {e}"
+        for sheet_name in set(reports) - set(fingerprints):
+            del reports[sheet_name]  # Deleted sheets
+        errors.update({sheet_name: error for sheet_name, error in self.errors.items() if sheet_name in fingerprints and sheet_name not in changed})
+
+        # Swap the new state in at once, so readers never see a half-updated workbook
+        self.reports, self.errors = reports, errors
+        self.fingerprints = {sheet_name: key for sheet_name, key in fingerprints.items() if sheet_name not in errors}
+        self.stat = stat
+        self.loaded_at = time.time()
+        return changed
+
+    def _parse_sheet(self, df):
+        """
+        Parse the exam blocks of a student sheet.
+
+        Returns:
+        - Tuple (reports, layout_errors): exam type -> StudentReport of the
+          blocks without layout errors, and the reasons the others are left out.
+        """
+        blocks = split_exam_blocks(df)
+        if self.validate and not blocks:
+            return {}, [NO_EXAM_BLOCK_ERROR]
+        reports = {}
+        layout_errors = []
+        for exam_type, block in blocks:
+            error = layout_error(validate_block(block)) if self.validate else None
+            if error:
+                layout_errors.append(f"{exam_type}: {error}")
+            else:
+                reports[str(exam_type)] = parse_report(block)
+        return reports, layout_errors
+
+class RenderCache:
+    """
+    LRU of rendered report bytes, bounded by their total size.
+
+    Entries are keyed by report fingerprint, format and render version, so a
+    changed sheet simply stops hitting its old entries, which age out.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20):
+        """
+        Parameters:
+        - max_bytes: Total size of the cached documents.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, render):
+        """
+        Get the bytes of a rendered report, rendering them on a miss.
+
+        Concurrent requests for the same report render it once.
+
+        Parameters:
+        - key: Cache key.
+        - render: Callable returning the document bytes (or None on failure).
+
+        Returns:
+        - The document bytes, or None if it could not be rendered.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self.hits += 1
+                    return self._entries[key]
+                self.misses += 1
+            content = render()
+            with self._lock:
+                self._key_locks.pop(key, None)
+                if content is not None and len(content) <= self.max_bytes:
+                    self._entries[key] = content
+                    self.nbytes += len(content)
+                    while self.nbytes > self.max_bytes:
+                        _, evicted = self._entries.popitem(last=False)
+                        self.nbytes -= len(evicted)
+            return content
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+class ReportService:
+    """
+    Parsed workbooks, a file watcher and the rendered-report cache behind the HTTP server.
+
+    The watcher polls the workbooks' size and modification time; when a
+    file changed, only the sheets whose fingerprint changed are parsed again
+    (a new text value changes the shared strings, and so every sheet).
+    """
+
+    def __init__(self, workbook_paths, cache_bytes=256 * 2**20, poll_interval=1.0, validate=True):
+        """
+        Parameters:
+        - workbook_paths: Paths of the workbooks to serve.
+        - cache_bytes: Size of the rendered-report cache.
+        - poll_interval: Seconds between two checks of the workbooks.
+        - validate: Leave out the exam blocks with layout errors (see WorkbookState).
+        """
+        self.workbooks = {}
+        for path in workbook_paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            while name in self.workbooks:
+                name += "_"
+            self.workbooks[name] = WorkbookState(path, name, validate)
+        self.cache = RenderCache(cache_bytes)
+        self.poll_interval = poll_interval
+        self.parsed_sheets = 0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def refresh(self):
+        """
+        Check every workbook once and re-parse its changed sheets.
+
+        Returns:
+        - Dictionary mapping workbook name to the sheets that were (re)parsed.
+        """
+        updated = {}
+        with self._refresh_lock:
+            for name, state in self.workbooks.items():
+                try:
+                    changed = state.refresh()
+                except Exception as e:
+                    # Keep serving the last reports; the next poll tries again
+                    state.errors[""] = f"Error loading Excel file: {e}"
+                    continue
+                if changed:
+                    self.parsed_sheets += len(changed)
+                    updated[name] = changed
+        return updated
+
+    def start(self):
+        """Load the workbooks and start the watcher thread."""
+        self.refresh()
+        self._watcher = threading.Thread(target=self._watch, name="workbook-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            for name, sheets in self.refresh().items():
+                print(f"Reloaded {len(sheets)} sheet(s) of {name}: {', '.join(sheets[:10])}{' ...' if len(sheets) > 10 else ''}")
+
+    def report(self, workbook, student, exam):
+        """The parsed StudentReport of a student and exam, None if unknown."""
+        state = self.workbooks.get(workbook)
+        if state is None:
+            return None
+        return state.reports.get(student, {}).get(exam)
+
+    def render(self, workbook, student, exam, output_format):
+        """
+        Bytes of a report, from the cache or rendered on demand.
+
+        Returns:
+        - Tuple (bytes or None, fingerprint), (None, None) if the report is unknown.
+        """
+        report = self.report(workbook, student, exam)
+        if report is None:
+            return None, None
+        fingerprint = render_fingerprint(report)
+        content = self.cache.get((fingerprint, output_format, RENDER_VERSION), lambda: BYTE_RENDERERS[output_format](report))
+        return content, fingerprint
+
+    def status(self):
+        """JSON-serializable overview of the workbooks and the cache."""
+        return {
+            "workbooks": {
+                name: {
+                    "path": state.path,
+                    "students": len(state.reports),
+                    "reports": sum(len(exams) for exams in state.reports.values()),
+                    "loaded_at": state.loaded_at,
+                    "errors": state.errors,
+                }
+                for name, state in self.workbooks.items()
+            },
+            "parsed_sheets": self.parsed_sheets,
+            "cache": self.cache.stats(),
+        }
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API of the ReportService:
+
+    - GET /reports/<workbook>/<student>/<exam>.<docx|pdf>: the rendered report.
+    - GET /workbooks: the students and exams of every workbook.
+    - GET /status: workbooks, errors and cache statistics.
+    - POST /refresh: check the workbooks for changes now.
+    """
+    service = None  # Set by make_server
+    quiet = False
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, indent=2, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        parts = [unquote(part) for part in urlparse(self.path).path.strip("/").split("/")]
+        if parts == ["status"]:
+            self._send(200, self.service.status())
+        elif parts == ["workbooks"]:
+            self._send(200, {
+                name: {student: sorted(exams) for student, exams in state.reports.items()}
+                for name, state in self.service.workbooks.items()
+            })
+        elif len(parts) == 4 and parts[0] == "reports":
+            self._send_report(*parts[1:])
+        else:
+            self._send(404, {"error": "Unknown path. Use /reports/<workbook>/<student>/<exam>.<docx|pdf>, /workbooks or /status."})
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip("/") == "refresh":
+            self._send(200, {"reloaded": self.service.refresh()})
+        else:
+            self._send(404, {"error": "Unknown path."})
+
+    def _send_report(self, workbook, student, file_name):
+        exam, _, output_format = file_name.rpartition(".")
+        if output_format not in BYTE_RENDERERS:
+            self._send(404, {"error": f"Unknown format '{output_format}'; use one of {sorted(BYTE_RENDERERS)}."})
+            return
+        content, fingerprint = self.service.render(workbook, student, exam, output_format)
+        if fingerprint is None:
+            self._send(404, {"error": f"No {exam} report of student {student} in workbook {workbook}."})
+            return
+        if content is None:
+            self._send(500, {"error": f"The {output_format} report could not be rendered."})
+            return
+        etag = f'"{fingerprint[:32]}-{output_format}-{RENDER_VERSION}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", headers={"ETag": etag})
+            return
+        self._send(200, content, CONTENT_TYPES[output_format], {
+            "ETag": etag,
+            "Content-Disposition": f'inline; filename="{student}_{exam}_Report.{output_format}"',
+        })
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+def make_server(service, host="127.0.0.1", port=8765, quiet=False):
+    """
+    Create the HTTP server of a ReportService (call serve_forever() to run it).
+
+    Parameters:
+    - service: ReportService, started or not.
+    - host: Interface to listen on; keep the default to stay on localhost.
+    - port: TCP port (0 picks a free one, see server.server_address).
+    - quiet: Do not log every request.
+    """
+    handler = type("BoundReportRequestHandler", (ReportRequestHandler,), {"service": service, "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve DOCX and PDF reports of workbooks kept in memory and reloaded when they change.")
+    parser.add_argument("workbooks", nargs="+", help="Paths of the Excel workbooks to serve.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port.")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between two checks of the workbooks for changes.")
+    parser.add_argument("--cache-mb", type=int, default=256, help="Size of the rendered-report cache in MiB.")
+    parser.add_argument("--quiet", action="store_true", help="Do not log every request.")
+    parser.add_argument("--no-validate", action="store_true", help="Serve every exam block, without the layout check.")
+    args = parser.parse_args()
+
+    service = ReportService(args.workbooks, args.cache_mb * 2**20, args.poll, validate=not args.no_validate)
+    start = time.perf_counter()
+    service.start()
+    status = service.status()
+    print(f"Loaded {sum(workbook['reports'] for workbook in status['workbooks'].values())} report(s) of {len(service.workbooks)} workbook(s) in {time.perf_counter() - start:.1f} s.")
+    server = make_server(service, args.host, args.port, args.quiet)
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}/reports/<workbook>/<student>/<exam>.<docx|pdf>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
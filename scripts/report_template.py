@@ -0,0 +1,129 @@
+# Required Libraries
+import copy
+from functools import lru_cache
+from io import BytesIO
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.shared import OxmlElement, qn
+from docx.shared import Pt, RGBColor
+
+# Named paragraph styles used by the report headings
+HEADING_STYLE = "Report Heading"
+SUBHEADING_STYLE = "Report Subheading"
+
+# Position of the student details paragraph in the skeleton
+DETAILS_PARAGRAPH_INDEX = 6
+
+def add_page_borders(section,check):
+    borders = OxmlElement('w:borders')
+    if check == True:
+        # Define border properties
+        for border_type in ['top', 'left', 'bottom', 'right']:
+            border = OxmlElement(f'w:{border_type}')
+            border.set(qn('w:val'), 'single')  # Set border style
+            border.set(qn('w:sz'), '8')  # Border size (in half-points)
+            border.set(qn('w:space'), '0')  # Space around the border
+            borders.append(border)
+        section.top_margin = Pt(60)
+        section.bottom_margin = Pt(60)
+        section.left_margin = Pt(60)
+        section.right_margin = Pt(60)
+        section._sectPr.append(borders)
+    else:
+        for border_type in ['top', 'left', 'bottom', 'right']:
+            border = OxmlElement(f'w:{border_type}')
+            border.set(qn('w:val'), 'single')  # Set border style
+            border.set(qn('w:sz'), '10')  # Border size (in half-points)
+            border.set(qn('w:space'), '10')  # Space around the border
+            borders.append(border)
+        section.top_margin = Pt(20)
+        section.bottom_margin = Pt(20)
+        section.left_margin = Pt(20)
+        section.right_margin = Pt(20)
+        section._sectPr.append(borders)
+
+def _add_heading_style(doc, name, base_name, size):
+    """
+    Add a centered Calibri heading style in the report's blue.
+
+    The style copies the paragraph properties (outline level, keep with next)
+    of the built-in heading it mirrors but not its theme fonts, so the
+    headings need no per-run formatting.
+    """
+    base = doc.styles[base_name]
+    style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+    style.base_style = doc.styles['Normal']
+    style.next_paragraph_style = doc.styles['Normal']
+    style.element.insert_element_before(copy.deepcopy(base.element.pPr), 'w:rPr')
+    style.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    style.font.name = 'Calibri'
+    style.font.size = Pt(size)
+    style.font.bold = True
+    style.font.color.rgb = RGBColor(31, 73, 125)
+    return style
+
+class ReportTemplate:
+    """
+    Invariant skeleton of a student report, built once and cloned per student.
+
+    The skeleton holds the heading styles, the front page (title and an empty
+    student details paragraph), the overall summary heading and the page
+    borders; the renderer only fills in the student's data.
+    """
+
+    def __init__(self):
+        doc = Document()
+        _add_heading_style(doc, HEADING_STYLE, 'Heading 1', 18)
+        _add_heading_style(doc, SUBHEADING_STYLE, 'Heading 2', 14)
+
+        for _ in range(5):  # Adjust the number of paragraphs as needed
+            doc.add_paragraph()  # Add empty paragraph
+
+        # Add Front Page Title
+        title = doc.add_paragraph()
+        run = title.add_run("STUDENT ANALYSIS REPORT")
+        run.font.size = Pt(24)
+        run.bold = True
+        title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+        # Student Details (filled in per student)
+        details_paragraph = doc.add_paragraph()
+        details_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        details_run = details_paragraph.add_run()
+        details_run.font.size = Pt(14)
+        details_run.font.bold = False
+
+        # Add some spacing
+        doc.add_paragraph().add_run("\n")
+
+        # SECOND PAGE: Overall Summary Table
+        doc.add_page_break()
+
+        for _ in range(6):  # Adjust the number of paragraphs as needed
+            doc.add_paragraph()  # Add empty paragraph
+
+        doc.add_paragraph("OVERALL PERFORMANCE SUMMARY", style=HEADING_STYLE)
+
+        for _ in range(2):  # Adjust the number of paragraphs as needed
+            doc.add_paragraph()  # Add empty paragraph
+
+        add_page_borders(doc.sections[-1], False)
+
+        buffer = BytesIO()
+        doc.save(buffer)
+        self._data = buffer.getvalue()
+
+    def new_document(self):
+        """
+        Clone the skeleton into a new document.
+
+        Returns:
+        - Document object ready for the student's data.
+        """
+        return Document(BytesIO(self._data))
+
+@lru_cache(maxsize=1)
+def default_template():
+    """Template shared by every report rendered in this process."""
+    return ReportTemplate()
@@ -0,0 +1,269 @@
+# Required Libraries
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from report_parser import parse_report
+from workbook_cache import sheet_fingerprints
+from workbook_reader import NON_STUDENT_SHEETS, split_exam_blocks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: without pyarrow only the CSV files are written
+    pa = pq = None
+
+# Bump when the record layout or the summary metrics change so the export is rebuilt
+SUMMARY_VERSION = 1
+STATE_NAME = ".summary_state.json"
+RECORDS_NAME = "records"
+# Long record of one table row of a student report
+RECORD_COLUMNS = ["STUDENT", "EXAM", "LEVEL", "SUBJECT", "UNIT", "TOPIC", "OBTAINED", "MAX MARKS", "PERFORMANCE %", "OVERALL %"]
+_TEXT_COLUMNS = {"STUDENT": str, "EXAM": str, "LEVEL": str, "SUBJECT": str, "UNIT": str, "TOPIC": str}
+
+def _row_value(headers, row, header):
+    """Value of the column named `header` in a table row, None if the table has no such column."""
+    try:
+        return row[headers.index(header)]
+    except ValueError:
+        return None
+
+def report_records(student, report):
+    """
+    Flatten a parsed student report into long records.
+
+    The overall table gives one "subject" record per subject, the unit-wise
+    and topic-wise tables one "unit" or "topic" record per row.
+
+    Parameters:
+    - student: Student ID (sheet name).
+    - report: StudentReport produced by report_parser.parse_report.
+
+    Returns:
+    - List of tuples in RECORD_COLUMNS order, with OBTAINED holding the raw
+      "OBTAINED MARKS" text (split by records_frame).
+    """
+    records = []
+    exam = report.exam_type
+
+    def add(level, headers, row, subject, unit=None, topic=None):
+        records.append((
+            student, exam, level, subject, unit, topic,
+            _row_value(headers, row, "OBTAINED MARKS"), None,
+            _row_value(headers, row, "PERFORMANCE %"), _row_value(headers, row, "OVERALL %"),
+        ))
+
+    if report.overall is not None:
+        headers = list(report.overall.headers)
+        for row in report.overall.rows:
+            add("subject", headers, row, _row_value(headers, row, "SUBJECT") or row[0])
+    for subject in report.subjects:
+        if subject.units is not None:
+            headers = list(subject.units.headers)
+            for row in subject.units.rows:
+                add("unit", headers, row, subject.name, _row_value(headers, row, "UNIT"))
+        if subject.topics is not None:
+            headers = list(subject.topics.headers)
+            for row in subject.topics.rows:
+                add("topic", headers, row, subject.name, _row_value(headers, row, "UNIT"), _row_value(headers, row, "TOPIC"))
+    return records
+
+def records_frame(records):
+    """
+    Build the records DataFrame, splitting the "obtained/max" text into numbers.
+
+    Parameters:
+    - records: Iterable of tuples in RECORD_COLUMNS order (see report_records).
+
+    Returns:
+    - DataFrame with the RECORD_COLUMNS, numeric OBTAINED, MAX MARKS and percentages.
+    """
+    df = pd.DataFrame(list(records), columns=RECORD_COLUMNS)
+    marks = df["OBTAINED"].astype(str).str.split("/", n=1, expand=True).reindex(columns=[0, 1])
+    df["OBTAINED"] = pd.to_numeric(marks[0], errors="coerce")
+    df["MAX MARKS"] = pd.to_numeric(marks[1], errors="coerce")
+    for column in ("PERFORMANCE %", "OVERALL %"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    for column in _TEXT_COLUMNS:
+        df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
+def read_records(path):
+    """Read a records.csv written by write_summary back into a records DataFrame."""
+    return pd.read_csv(path, dtype=_TEXT_COLUMNS)
+
+def _statistics(records, keys, threshold):
+    """Comparative statistics of PERFORMANCE % grouped by keys."""
+    grouped = records.assign(BELOW=records["PERFORMANCE %"] < threshold).groupby(keys, sort=True, observed=True, dropna=False)
+    stats = grouped["PERFORMANCE %"].agg(["count", "mean", "median", "std", "min", "max"])
+    stats.columns = ["STUDENTS", "MEAN %", "MEDIAN %", "STD %", "MIN %", "MAX %"]
+    stats["BELOW THRESHOLD"] = grouped["BELOW"].sum()
+    stats["OBTAINED"] = grouped["OBTAINED"].sum()
+    stats["MAX MARKS"] = grouped["MAX MARKS"].sum()
+    return stats.reset_index()
+
+def summarize(records, threshold=50):
+    """
+    Compute the class SUMMARY tables from the records of every student.
+
+    Parameters:
+    - records: DataFrame of RECORD_COLUMNS (see records_frame).
+    - threshold: PERFORMANCE % below which a student is counted as below threshold.
+
+    Returns:
+    - Dictionary of DataFrames: subject, unit and topic statistics per exam
+      (student count, mean, median, standard deviation, min, max and the
+      number of students below the threshold), and the exam-over-exam
+      trends of the subject and unit means.
+    """
+    # Keep the exams in the order they appear in the sheets
+    records = records.assign(EXAM=pd.Categorical(records["EXAM"], categories=pd.unique(records["EXAM"].dropna())))
+    levels = {level: records[records["LEVEL"] == level] for level in ("subject", "unit", "topic")}
+
+    tables = {
+        "subject_summary": _statistics(levels["subject"], ["EXAM", "SUBJECT"], threshold),
+        "unit_summary": _statistics(levels["unit"], ["EXAM", "SUBJECT", "UNIT"], threshold),
+        "topic_summary": _statistics(levels["topic"], ["EXAM", "SUBJECT", "UNIT", "TOPIC"], threshold),
+    }
+    for level, keys in (("subject", ["SUBJECT"]), ("unit", ["SUBJECT", "UNIT"])):
+        summary = tables[f"{level}_summary"]
+        trends = summary[["EXAM", *keys, "MEAN %"]].sort_values([*keys, "EXAM"], kind="stable")
+        trends["CHANGE %"] = trends.groupby(keys, sort=False, dropna=False)["MEAN %"].diff()
+        tables[f"{level}_trends"] = trends.reset_index(drop=True)
+    for table in tables.values():
+        table["EXAM"] = table["EXAM"].astype(str)
+    return tables
+
+def write_summary(records, tables, output_dir):
+    """
+    Write the records and SUMMARY tables as CSV, and as Parquet when pyarrow is installed.
+
+    The records are written as a Parquet dataset partitioned by exam
+    (`records/EXAM=<exam>/`), which Power BI imports as one table.
+
+    Parameters:
+    - records: DataFrame of RECORD_COLUMNS.
+    - tables: Dictionary of DataFrames returned by summarize.
+    - output_dir: Directory of the export.
+
+    Returns:
+    - List of the written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for name, df in {RECORDS_NAME: records, **tables}.items():
+        csv_path = os.path.join(output_dir, f"{name}.csv")
+        df.to_csv(csv_path, index=False)
+        written.append(csv_path)
+
+    if pq is None:
+        return written
+    records_dir = os.path.join(output_dir, RECORDS_NAME)
+    shutil.rmtree(records_dir, ignore_errors=True)
+    pq.write_to_dataset(pa.Table.from_pandas(records, preserve_index=False), records_dir, partition_cols=["EXAM"])
+    written.append(records_dir)
+    for name, df in tables.items():
+        parquet_path = os.path.join(output_dir, f"{name}.parquet")
+        df.to_parquet(parquet_path, index=False)
+        written.append(parquet_path)
+    return written
+
+def _load_state(output_dir, file_path):
+    try:
+        with open(os.path.join(output_dir, STATE_NAME), "r", encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        if state.get("version") == SUMMARY_VERSION and state.get("workbook") == os.path.abspath(file_path):
+            return state["sheets"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def _save_state(output_dir, file_path, sheets):
+    path = os.path.join(output_dir, STATE_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as state_file:
+        json.dump({"version": SUMMARY_VERSION, "workbook": os.path.abspath(file_path), "sheets": sheets}, state_file, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def export_summary(file_path, output_dir, threshold=50, force=False):
+    """
+    Aggregate every student sheet into the SUMMARY tables and export them for Power BI.
+
+    Only the sheets whose fingerprint changed since the last export (see
+    workbook_cache.sheet_fingerprints) are read and parsed again; the
+    records of the other students are taken from the previous export.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - output_dir: Directory of the export.
+    - threshold: PERFORMANCE % below which a student is counted as below threshold.
+    - force: Re-read every sheet.
+
+    Returns:
+    - Tuple (updated, errors): the sheet names that were (re)parsed, and a
+      dictionary mapping sheet name to the reason it could not be read.
+    """
+    fingerprints = {
+        sheet_name: key for sheet_name, key in sheet_fingerprints(file_path).items()
+        if sheet_name.strip().upper() not in NON_STUDENT_SHEETS
+    }
+    previous = {} if force else _load_state(output_dir, file_path)
+    records_path = os.path.join(output_dir, f"{RECORDS_NAME}.csv")
+    if previous and not os.path.exists(records_path):
+        previous = {}
+    stale = [sheet_name for sheet_name, key in fingerprints.items() if previous.get(sheet_name) != key]
+
+    # Keep the records of the unchanged students
+    frames = []
+    if previous:
+        kept = read_records(records_path)
+        frames.append(kept[kept["STUDENT"].isin(set(fingerprints) - set(stale))])
+
+    # Read and parse the changed sheets
+    errors = {}
+    updated = []
+    records = []
+    if stale:
+        with pd.ExcelFile(file_path) as xls:
+            for sheet_name in stale:
+                try:
+                    df = xls.parse(sheet_name, header=None)
+                    for _, block in split_exam_blocks(df):
+                        records.extend(report_records(sheet_name, parse_report(block)))
+                    updated.append(sheet_name)
+                except Exception as e:
+                    errors[sheet_name] = f"Error reading the sheet: {e}"
+        frames.append(records_frame(records))
+
+    # Order the students as in the workbook
+    all_records = pd.concat(frames, ignore_index=True) if frames else records_frame([])
+    order = {sheet_name: i for i, sheet_name in enumerate(fingerprints)}
+    all_records = all_records.iloc[np.argsort(all_records["STUDENT"].map(order).to_numpy(), kind="stable")].reset_index(drop=True)
+
+    write_summary(all_records, summarize(all_records, threshold), output_dir)
+    sheets = {sheet_name: key for sheet_name, key in fingerprints.items() if sheet_name not in errors}
+    _save_state(output_dir, file_path, sheets)
+    return updated, errors
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Export the class SUMMARY metrics of a workbook as Parquet and CSV for Power BI.")
+    parser.add_argument("file", help="Path to the Excel workbook.")
+    parser.add_argument("--output-dir", default="summary", help="Directory of the export.")
+    parser.add_argument("--threshold", type=float, default=50, help="PERFORMANCE % below which a student is counted as below threshold.")
+    parser.add_argument("--force", action="store_true", help="Re-read every sheet, even unchanged ones.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print("The specified file path does not exist. Please check and try again.")
+    else:
+        if pq is None:
+            print("pyarrow is not installed; writing CSV only (pip install pyarrow for Parquet).")
+        start = time.perf_counter()
+        updated, errors = export_summary(args.file, args.output_dir, args.threshold, args.force)
+        print(f"Updated {len(updated)} student sheet(s) in {time.perf_counter() - start:.2f} s; export written to {args.output_dir}.")
+        for sheet_name, error in errors.items():
+            print(f"  {sheet_name}: {error}")
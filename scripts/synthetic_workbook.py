@@ -0,0 +1,260 @@
+# Required Libraries
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from analytics import QUESTION_COLUMNS, compute_performance
+from performance_cube import DEFAULT_HEADERS
+
+DEFAULT_EXAMS = ("Quarterly", "Half_yearly", "Revision_1", "Revision_2", "Annual")
+# Student details laid out on the first two rows of every exam block
+DETAIL_HEADERS = ("ID", "NAME", "STANDARD", "SECTION", "EXAM TYPE", "SCHOOL NAME", "LOGO")
+# Columns of one exam block (followed by an empty column), and the first
+# column of the first block: column A is left empty, so the fourth exam
+# lands on the AC:AJ default of generate_reports.py
+BLOCK_WIDTH = 8
+FIRST_COLUMN = 2
+# Score columns of the unit-wise and topic-wise tables, in sheet order
+SCORE_HEADERS = ("OBTAINED MARKS", "PERFORMANCE %", "OVERALL %")
+
+def _grade(percent):
+    """Letter grade of a PERFORMANCE % value."""
+    return "A" if percent >= 75 else "B" if percent >= 50 else "C" if percent >= 35 else "D"
+
+def _remark(percent):
+    """Teacher remark of a PERFORMANCE % value."""
+    return "Excellent" if percent >= 75 else "Good" if percent >= 50 else "Needs practice"
+
+# Columns some schools add after the scores, computed from the row's PERFORMANCE %
+EXTRA_COLUMNS = {"GRADE": _grade, "REMARKS": _remark}
+
+def exam_columns(exam_index):
+    """
+    Column range of an exam block of a synthetic workbook.
+
+    Parameters:
+    - exam_index: Position of the exam (0 for the first exam).
+
+    Returns:
+    - Tuple (column_start, column_end) of column letters, e.g. ('AC', 'AJ') for the fourth exam.
+    """
+    start = FIRST_COLUMN + exam_index * (BLOCK_WIDTH + 1)
+    return get_column_letter(start), get_column_letter(start + BLOCK_WIDTH - 1)
+
+def synthetic_class(num_students=100, subjects=5, units=6, topics=4, exams=DEFAULT_EXAMS, coverage=0.75, seed=0):
+    """
+    Random but realistic marks of a class, computed into a PerformanceCube.
+
+    Each student has an ability and each topic a difficulty, so the
+    percentages spread like real results. An exam covers about `coverage`
+    of the topics (at least one per subject); the other topics have no
+    questions in it and become "0/0" rows.
+
+    Parameters:
+    - num_students: Number of students (IDs from 1001).
+    - subjects: Number of subjects.
+    - units: Units per subject.
+    - topics: Topics per unit.
+    - exams: Exam types, in exam order.
+    - coverage: Share of the topics each exam has questions on.
+    - seed: Random seed; the same arguments always give the same class.
+
+    Returns:
+    - PerformanceCube of the class, with NAME, STANDARD, SECTION and SCHOOL NAME details.
+    """
+    rng = np.random.default_rng(seed)
+    labels = [(f"Subject {s + 1}", f"Unit {u + 1}", f"Topic {t + 1}") for s in range(subjects) for u in range(units) for t in range(topics)]
+    topics_per_subject = units * topics
+
+    # Topics each exam has questions on, 1-3 questions of 2-5 marks each
+    examined = rng.random((len(exams), len(labels))) < coverage
+    for e in range(len(exams)):
+        for s in range(subjects):
+            block = examined[e, s * topics_per_subject:(s + 1) * topics_per_subject]
+            if not block.any():
+                block[rng.integers(topics_per_subject)] = True
+    question_rows = []
+    for t, (subject, unit, topic) in enumerate(labels):
+        for e, exam in enumerate(exams):
+            if examined[e, t]:
+                for _ in range(rng.integers(1, 4)):
+                    question_rows.append((exam, t, subject, unit, topic, int(rng.integers(2, 6))))
+    questions = pd.DataFrame(question_rows, columns=list(QUESTION_COLUMNS))
+    questions["QUESTION"] = "Q" + (questions.groupby("EXAM").cumcount() + 1).astype(str)
+
+    # Marks: each question scored with the student's ability against the topic's difficulty
+    students = np.arange(1001, 1001 + num_students)
+    ability = rng.beta(5, 2.5, num_students)
+    difficulty = rng.uniform(-0.15, 0.15, len(labels))
+    topic_of_question = np.array([row[1] for row in question_rows])
+    chance = np.clip(ability[:, np.newaxis] - difficulty[topic_of_question], 0.02, 0.98)
+    max_marks = questions["MAX MARKS"].to_numpy()
+    marks = pd.DataFrame({
+        "STUDENT": np.repeat(students, len(questions)),
+        "EXAM": np.tile(questions["EXAM"].to_numpy(), num_students),
+        "QUESTION": np.tile(questions["QUESTION"].to_numpy(), num_students),
+        "MARKS": rng.binomial(np.broadcast_to(max_marks, chance.shape), chance).ravel(),
+    })
+
+    details = {
+        student: {"NAME": f"Student {student}", "STANDARD": "X", "SECTION": "ABCD"[i % 4], "SCHOOL NAME": "Demo School"}
+        for i, student in enumerate(students.tolist())
+    }
+    return compute_performance(marks, questions, exams, details)
+
+def _cell(value):
+    """Sheet value of a cube number: int when whole, rounded to 2 decimals otherwise, None for NaN."""
+    if value != value:
+        return None
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+def _marks(obtained, maximum):
+    """OBTAINED MARKS text of a row, "0/0" when the exam has no questions on it."""
+    if obtained != obtained or maximum != maximum or maximum == 0:
+        return "0/0"
+    return f"{_cell(obtained)}/{_cell(maximum)}"
+
+def table_headers(level, extra_columns=(), reorder_columns=False):
+    """
+    Headers of a level's table in a synthetic workbook.
+
+    Parameters:
+    - level: 'subject', 'unit' or 'topic'.
+    - extra_columns: Names from EXTRA_COLUMNS appended to the unit-wise and topic-wise tables.
+    - reorder_columns: Write the score columns of those tables in reverse order (OVERALL % first).
+
+    Returns:
+    - Tuple of headers.
+    """
+    if level == "subject":
+        return DEFAULT_HEADERS[level]
+    unknown = set(extra_columns) - set(EXTRA_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown extra column(s): {', '.join(sorted(unknown))}")
+    labels = tuple(header for header in DEFAULT_HEADERS[level] if header not in SCORE_HEADERS)
+    scores = SCORE_HEADERS[::-1] if reorder_columns else SCORE_HEADERS
+    headers = labels + scores + tuple(extra_columns)
+    if len(headers) > BLOCK_WIDTH:
+        raise ValueError(f"A {level}-wise table of {len(headers)} columns does not fit the {BLOCK_WIDTH} columns of an exam block.")
+    return headers
+
+def _table_rows(cube, level, s, e, positions, headers):
+    """Header row and data rows of a level's table, one row per label (including the "0/0" ones)."""
+    schema = cube.schema
+    labels = schema.label_values[level]
+    rows = [list(headers)]
+    for n in positions:
+        values = {column: labels[column][n] for column in labels}
+        obtained = cube.obtained[level][s, e, n]
+        values["OBTAINED MARKS"] = _marks(obtained, schema.max_marks[level][e, n])
+        values["PERFORMANCE %"] = _cell(cube.performance[level][s, e, n]) or 0
+        values["OVERALL %"] = _cell(cube.overall[level][s, e, n]) or 0
+        for column in headers:
+            if column in EXTRA_COLUMNS:
+                values[column] = EXTRA_COLUMNS[column](values["PERFORMANCE %"])
+        rows.append([values[header] for header in headers])
+    return rows
+
+def exam_block_rows(cube, s, e, logo=None, extra_columns=(), reorder_columns=False):
+    """
+    Rows of one exam block of a student sheet, in the layout parse_report reads.
+
+    Student-details header and values, a blank row, the overall table, then
+    for every subject a `Subject` marker row, the unit-wise table, a blank
+    row and the topic-wise table, each followed by a blank row, and the
+    `END` row.
+
+    Parameters:
+    - cube: PerformanceCube of the class.
+    - s: Position of the student in the cube.
+    - e: Position of the exam in the cube.
+    - logo: Optional logo URL of the LOGO cell.
+    - extra_columns, reorder_columns: Layout of the unit-wise and topic-wise tables (see table_headers).
+
+    Returns:
+    - List of row lists (an empty list for a blank row).
+    """
+    schema = cube.schema
+    headers = {level: table_headers(level, extra_columns, reorder_columns) for level in DEFAULT_HEADERS}
+    student = cube.students[s]
+    details = {"ID": student, **cube.details.get(student, {}), "EXAM TYPE": schema.exams[e], "LOGO": logo}
+    rows = [list(DETAIL_HEADERS), [details.get(header) for header in DETAIL_HEADERS], []]
+    rows.extend(_table_rows(cube, "subject", s, e, range(len(schema.subjects)), headers["subject"]))
+    rows.append([])
+
+    subject_of_topic = schema.subject_of_unit[schema.unit_of_topic]
+    for j, subject in enumerate(schema.subjects):
+        rows.append(["Subject", subject])
+        rows.extend(_table_rows(cube, "unit", s, e, np.flatnonzero(schema.subject_of_unit == j), headers["unit"]))
+        rows.append([])
+        rows.extend(_table_rows(cube, "topic", s, e, np.flatnonzero(subject_of_topic == j), headers["topic"]))
+        rows.append([])
+    rows.append(["END"])
+    return rows
+
+def write_workbook(cube, file_path, logo=None, extra_columns=(), reorder_columns=False):
+    """
+    Write a PerformanceCube as a workbook of student sheets.
+
+    Every student gets a sheet named after its ID with one exam block per
+    exam, side by side and separated by an empty column (see exam_columns),
+    plus the RESOURCE and SUMMARY sheets the report scripts skip. The
+    workbook is written in openpyxl's write-only mode.
+
+    Parameters:
+    - cube: PerformanceCube of the class (see synthetic_class).
+    - file_path: Path of the .xlsx file.
+    - logo: Optional logo URL written in every LOGO cell.
+    - extra_columns: Names from EXTRA_COLUMNS (e.g. GRADE) appended to the unit-wise and topic-wise tables.
+    - reorder_columns: Write the score columns of those tables in reverse order.
+
+    Returns:
+    - file_path.
+    """
+    workbook = Workbook(write_only=True)
+    workbook.create_sheet("RESOURCE").append(["Synthetic workbook generated by synthetic_workbook.py"])
+    for s, student in enumerate(cube.students):
+        blocks = [exam_block_rows(cube, s, e, logo, extra_columns, reorder_columns) for e in range(len(cube.exams))]
+        sheet = workbook.create_sheet(str(student))
+        for row_idx in range(max(len(block) for block in blocks)):
+            row = [None] * (FIRST_COLUMN - 1)
+            for block in blocks:
+                cells = block[row_idx] if row_idx < len(block) else []
+                row.extend(cells + [None] * (BLOCK_WIDTH + 1 - len(cells)))
+            sheet.append(row)
+    workbook.create_sheet("SUMMARY").append(["SUMMARY"])
+    workbook.save(file_path)
+    return file_path
+
+def generate_workbook(file_path, num_students=100, subjects=5, units=6, topics=4, exams=DEFAULT_EXAMS, coverage=0.75, seed=0, logo=None,
+                      extra_columns=(), reorder_columns=False):
+    """Generate a synthetic class (see synthetic_class) and write it to file_path (see write_workbook)."""
+    cube = synthetic_class(num_students, subjects, units, topics, exams, coverage, seed)
+    return write_workbook(cube, file_path, logo, extra_columns, reorder_columns)
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic student workbook in the layout the report scripts read.")
+    parser.add_argument("file", help="Path of the .xlsx file to write.")
+    parser.add_argument("--students", type=int, default=100, help="Number of students (one sheet each).")
+    parser.add_argument("--subjects", type=int, default=5, help="Number of subjects.")
+    parser.add_argument("--units", type=int, default=6, help="Units per subject.")
+    parser.add_argument("--topics", type=int, default=4, help="Topics per unit.")
+    parser.add_argument("--exams", nargs="+", default=list(DEFAULT_EXAMS), help="Exam types, in exam order.")
+    parser.add_argument("--coverage", type=float, default=0.75, help="Share of the topics each exam has questions on.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--logo", default=None, help="Logo URL written in every LOGO cell.")
+    parser.add_argument("--extra-columns", nargs="+", choices=sorted(EXTRA_COLUMNS), default=[], help="Columns appended to the unit-wise and topic-wise tables.")
+    parser.add_argument("--reorder-columns", action="store_true", help="Write the score columns of the unit-wise and topic-wise tables in reverse order.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate_workbook(args.file, args.students, args.subjects, args.units, args.topics, args.exams, args.coverage, args.seed, args.logo,
+                      args.extra_columns, args.reorder_columns)
+    print(f"Wrote {args.students} student sheet(s) to {args.file} in {time.perf_counter() - start:.1f} s.")
+    for e, exam in enumerate(args.exams):
+        print(f"  {exam}: --column-start {exam_columns(e)[0]} --column-end {exam_columns(e)[1]}")
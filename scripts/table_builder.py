@@ -0,0 +1,92 @@
+# Required Libraries
+from xml.sax.saxutils import escape
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+# Fill used for cells flagged as below the pass mark
+LOW_SCORE_FILL = '#FF8585'  # Red color
+
+def _run_xml(text, bold, size):
+    """WordprocessingML for a single run holding the cell text."""
+    props = ""
+    if bold:
+        props += "<w:b/>"
+    if size is not None:
+        props += f'<w:sz w:val="{int(size * 2)}"/>'  # Points to half-points
+    if props:
+        props = f"<w:rPr>{props}</w:rPr>"
+    if not text:
+        return f"<w:r>{props}</w:r>"
+    # Line breaks in the value become <w:br/> as with cell.text
+    body = "<w:br/>".join(f'<w:t xml:space="preserve">{escape(line)}</w:t>' for line in text.split("\n"))
+    return f"<w:r>{props}{body}</w:r>"
+
+def _row_xml(values, widths, bold, size, vertical_alignment, shaded_columns, fill):
+    """WordprocessingML for one table row."""
+    cells = []
+    for col_idx, text in enumerate(values):
+        props = f'<w:tcW w:w="{widths[col_idx]}" w:type="dxa"/>'
+        if col_idx in shaded_columns:
+            props += f'<w:shd w:fill="{fill}"/>'
+        if vertical_alignment:
+            props += f'<w:vAlign w:val="{vertical_alignment}"/>'
+        cells.append(
+            f"<w:tc><w:tcPr>{props}</w:tcPr>"
+            f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr>{_run_xml(text, bold, size)}</w:p></w:tc>'
+        )
+    return f"<w:tr>{''.join(cells)}</w:tr>"
+
+def build_table(doc, headers, rows, style, header_font_size=None, font_size=None,
+                vertical_alignment=None, shaded_cells=(), column_widths=None,
+                grid_width=None, fill=LOW_SCORE_FILL):
+    """
+    Add a centered table to the document, building all of its rows in one batch.
+
+    The rows are emitted as a single WordprocessingML fragment and appended to
+    the table at once, so every cell gets exactly one width, shading and
+    vertical alignment element instead of being mutated through python-docx.
+
+    Parameters:
+    - doc: The Document object from python-docx.
+    - headers: Header labels; the header row is bold.
+    - rows: Iterable of data rows, each holding the cell texts.
+    - style: Table style name (e.g., 'Medium Shading 1 Accent 3').
+    - header_font_size: Font size of the header row in points (None keeps the style's).
+    - font_size: Font size of the data rows in points (None keeps the style's).
+    - vertical_alignment: Vertical alignment of every cell ('top', 'center', 'bottom').
+    - shaded_cells: Iterable of (row index, column index) data cells to fill.
+    - column_widths: Dictionary mapping column index to width in inches.
+    - grid_width: Width of every column in inches (defaults to an even split of the page).
+    - fill: Fill color of the shaded cells.
+
+    Returns:
+    - The table object from python-docx.
+    """
+    table = doc.add_table(rows=0, cols=len(headers))
+    table.style = style
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Column widths in twips, taken from the table grid
+    grid_columns = table._tbl.tblGrid.findall(qn('w:gridCol'))
+    if grid_width is not None:
+        for grid_column in grid_columns:
+            grid_column.set(qn('w:w'), str(int(grid_width * 1440)))  # Inches to twips
+    widths = [int(grid_column.get(qn('w:w'))) for grid_column in grid_columns]
+    for col_idx, width_in_inches in (column_widths or {}).items():
+        if 0 <= col_idx < len(widths):
+            widths[col_idx] = int(width_in_inches * 1440)  # Inches to twips
+
+    # Group the shaded cells by row
+    shaded_by_row = {}
+    for row_idx, col_idx in shaded_cells:
+        shaded_by_row.setdefault(row_idx, set()).add(col_idx)
+
+    no_shading = frozenset()
+    rows_xml = [_row_xml([str(header).strip() for header in headers], widths, True, header_font_size, vertical_alignment, no_shading, fill)]
+    for row_idx, values in enumerate(rows):
+        rows_xml.append(_row_xml(values, widths, False, font_size, vertical_alignment, shaded_by_row.get(row_idx, no_shading), fill))
+
+    fragment = parse_xml(f"<w:tbl {nsdecls('w')}>{''.join(rows_xml)}</w:tbl>")
+    table._tbl.extend(list(fragment))
+    return table
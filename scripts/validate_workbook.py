@@ -0,0 +1,205 @@
+# Required Libraries
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from workbook_reader import iter_student_sheets, split_exam_blocks
+
+# Headers a unit-wise or topic-wise table needs for the OVERALL % shading
+SHADING_HEADERS = ("OBTAINED MARKS", "PERFORMANCE %", "OVERALL %")
+ISSUE_COLUMNS = ["SHEET", "EXAM", "ROW", "SEVERITY", "ISSUE"]
+# Reason a sheet read for every exam block is not rendered when it has none
+NO_EXAM_BLOCK_ERROR = "Invalid sheet layout: no exam block (no 'EXAM TYPE' header on the first row)."
+
+@dataclass(frozen=True, slots=True)
+class LayoutIssue:
+    """
+    One layout problem of an exam block.
+
+    - severity: 'error' (the report cannot be generated correctly) or
+      'warning' (the report is generated, but differs from the intended layout).
+    - message: Description of the problem.
+    - row: 1-based sheet row of the problem, None for the whole block.
+    """
+    severity: str
+    message: str
+    row: int = None
+
+def _header_issues(cells, row, table):
+    """Issues of a unit-wise or topic-wise header row (cells: its non-blank values)."""
+    issues = []
+    exact = set(cells)
+    normalized = {str(cell).strip().upper(): cell for cell in cells}
+    for header in SHADING_HEADERS:
+        if header in exact:
+            continue
+        if header in normalized:
+            message = f"{table} header '{normalized[header]}' should read '{header}'; the OVERALL % shading is disabled."
+        else:
+            message = f"{table} header row has no '{header}' column; the OVERALL % shading is disabled."
+        issues.append(LayoutIssue("warning", message, row + 1))
+    return issues
+
+def validate_block(df):
+    """
+    Check one exam block (the column window of one exam) against the layout parse_report reads.
+
+    The markers and headers of the whole block are located with vectorized
+    column operations, so a block is checked in a few milliseconds.
+
+    Errors: missing or blank EXAM TYPE, missing overall summary table, no
+    `Subject` marker row, a subject without a unit-wise table header.
+    Warnings: missing `END` row, unit-wise or topic-wise headers without
+    OBTAINED MARKS / PERFORMANCE % / OVERALL % (no shading), a subject
+    without a topic-wise table or name, `Subject` rows after `END`.
+
+    Parameters:
+    - df: DataFrame holding the exam column window of one student sheet (no headers).
+
+    Returns:
+    - List of LayoutIssue in row order (empty for a valid block).
+    """
+    num_rows = len(df)
+    if num_rows == 0 or df.isna().all(axis=None):
+        return [LayoutIssue("error", "The exam block is empty.")]
+    df = df.set_axis(range(df.shape[1]), axis=1).reset_index(drop=True)
+    issues = []
+
+    # Every non-blank cell once, as (row, column) -> value
+    cells = df.stack().dropna()
+    cell_rows = cells.index.get_level_values(0).to_numpy()
+    blank = np.ones(num_rows, dtype=bool)
+    blank[cell_rows] = False
+    non_blank_rows = np.flatnonzero(~blank)
+    blank_rows = np.flatnonzero(blank)
+
+    # FRONT PAGE: EXAM TYPE header and value
+    header_row = df.iloc[0]
+    exam_columns = np.flatnonzero(header_row.eq("EXAM TYPE").to_numpy())
+    if len(exam_columns) == 0:
+        variants = header_row[header_row.astype(str).str.strip().str.upper().eq("EXAM TYPE") & header_row.notna()]
+        if len(variants):
+            issues.append(LayoutIssue("error", f"EXAM TYPE header is written as '{variants.iloc[0]}'; the report cannot be named.", 1))
+        else:
+            issues.append(LayoutIssue("error", "Missing EXAM TYPE header in the student details.", 1))
+    elif num_rows < 2 or pd.isna(df.iat[1, exam_columns[0]]):
+        issues.append(LayoutIssue("error", "Missing EXAM TYPE value in the student details.", 2))
+
+    # Overall summary table, right after the details and one blank row
+    if num_rows <= 3 or blank[3]:
+        issues.append(LayoutIssue("error", "Missing overall summary table header (expected on the 4th row of the block).", 4))
+
+    # Subject markers and END in the first column
+    markers = df[0].astype(str).str.strip().where(df[0].notna())
+    subject_rows = np.flatnonzero(markers.eq("Subject").to_numpy())
+    end_rows = np.flatnonzero(markers.str.upper().eq("END").to_numpy())
+    end_row = end_rows[0] if len(end_rows) else num_rows
+    if len(end_rows) == 0:
+        issues.append(LayoutIssue("warning", "Missing END row; the block is read to the last row."))
+    late = subject_rows[subject_rows > end_row]
+    if len(late):
+        issues.append(LayoutIssue("warning", f"{len(late)} 'Subject' row(s) after END are ignored.", int(late[0]) + 1))
+    subject_rows = subject_rows[subject_rows < end_row]
+    if len(subject_rows) == 0:
+        issues.append(LayoutIssue("error", "No 'Subject' marker row; the report would have no subject pages."))
+
+    # Unit-wise header right below each marker, topic-wise header after the blank rows ending the unit table
+    marker_rows = set(subject_rows.tolist()) | set(end_rows.tolist())
+    for subject_row in subject_rows.tolist():
+        if pd.isna(df.iat[subject_row, 1]) if df.shape[1] > 1 else True:
+            issues.append(LayoutIssue("warning", "'Subject' marker without a subject name (shown as 'Unknown Subject').", subject_row + 1))
+        units_row = subject_row + 1
+        if units_row >= num_rows or blank[units_row]:
+            issues.append(LayoutIssue("error", "Subject without a unit-wise table header right below its 'Subject' row.", subject_row + 1))
+            continue
+        issues.extend(_header_issues(cells.loc[units_row].tolist(), units_row, "Unit-wise"))
+
+        next_blank = np.searchsorted(blank_rows, units_row)
+        table_end = blank_rows[next_blank] if next_blank < len(blank_rows) else num_rows
+        next_row = np.searchsorted(non_blank_rows, table_end)
+        topics_row = int(non_blank_rows[next_row]) if next_row < len(non_blank_rows) else num_rows
+        if topics_row >= num_rows or topics_row in marker_rows:
+            issues.append(LayoutIssue("warning", "Subject without a topic-wise table.", subject_row + 1))
+            continue
+        issues.extend(_header_issues(cells.loc[topics_row].tolist(), topics_row, "Topic-wise"))
+
+    return sorted(issues, key=lambda issue: issue.row or 0)
+
+def layout_error(issues):
+    """Reason an exam block cannot be rendered (its errors joined), None if it has no error."""
+    errors = [f"row {issue.row}: {issue.message}" if issue.row else issue.message for issue in issues if issue.severity == "error"]
+    return f"Invalid sheet layout: {'; '.join(errors)}" if errors else None
+
+def validate_frame(df, all_exams=False):
+    """
+    Check the DataFrame of one student sheet.
+
+    Parameters:
+    - df: The sheet's column window, or the whole sheet with all_exams.
+    - all_exams: Split the sheet into its exam blocks (see split_exam_blocks) and check each one.
+
+    Returns:
+    - List of (exam type, LayoutIssue) pairs.
+    """
+    if not all_exams:
+        issues = validate_block(df)
+        exam_type = None
+        if len(df) > 1:
+            exam_cells = df.iloc[1][df.iloc[0].eq("EXAM TYPE").to_numpy()]
+            exam_type = str(exam_cells.iloc[0]).strip() if len(exam_cells) and pd.notna(exam_cells.iloc[0]) else None
+        return [(exam_type, issue) for issue in issues]
+    blocks = split_exam_blocks(df)
+    if not blocks:
+        return [(None, LayoutIssue("error", "No exam block found (no 'EXAM TYPE' header on the first row).", 1))]
+    return [(exam_type, issue) for exam_type, block in blocks for issue in validate_block(block)]
+
+def validate_workbook(file_path, column_start=None, column_end=None):
+    """
+    Check every student sheet of a workbook before generating its reports.
+
+    The sheets are streamed one at a time (see workbook_reader).
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - column_start: Starting column of one exam block; None checks every exam block of each sheet.
+    - column_end: Ending column of one exam block.
+
+    Returns:
+    - DataFrame of ISSUE_COLUMNS (SHEET, EXAM, ROW, SEVERITY, ISSUE), one row per issue.
+    """
+    rows = []
+
+    def record_error(sheet_name, e):
+        rows.append((sheet_name, None, None, "error", f"Error reading the sheet: {e}"))
+
+    for sheet_name, df in iter_student_sheets(file_path, column_start, column_end, on_error=record_error):
+        for exam_type, issue in validate_frame(df, all_exams=column_start is None):
+            rows.append((sheet_name, exam_type, issue.row, issue.severity, issue.message))
+    report = pd.DataFrame(rows, columns=ISSUE_COLUMNS)
+    report["ROW"] = report["ROW"].astype("Int64")
+    return report
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Check the layout of every student sheet of a workbook before generating the reports.")
+    parser.add_argument("file", help="Path to the Excel workbook.")
+    parser.add_argument("--column-start", default=None, help="First column of one exam block (default: check every exam block).")
+    parser.add_argument("--column-end", default=None, help="Last column of one exam block.")
+    parser.add_argument("--csv", default=None, help="Also write the issues to this CSV file.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = validate_workbook(args.file, args.column_start, args.column_end)
+    elapsed = time.perf_counter() - start
+    if report.empty:
+        print(f"No layout issues found ({elapsed:.2f} s).")
+    else:
+        print(report.to_string(index=False))
+        counts = report["SEVERITY"].value_counts()
+        print(f"{counts.get('error', 0)} error(s), {counts.get('warning', 0)} warning(s) in {report['SHEET'].nunique()} sheet(s) ({elapsed:.2f} s).")
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+    sys.exit(1 if (report["SEVERITY"] == "error").any() else 0)
@@ -0,0 +1,278 @@
+# Required Libraries
+from openpyxl.utils import column_index_from_string
+import posixpath
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Optional: without pyarrow the workbook is always parsed
+    pa = feather = None
+
+# Bump when the on-disk layout changes so older caches are rebuilt
+CACHE_FORMAT_VERSION = 1
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+def sheet_fingerprints(file_path):
+    """
+    Fingerprint every sheet of an .xlsx workbook without parsing its cells.
+
+    Each fingerprint combines the CRC-32 and size of the sheet's XML part, as
+    stored in the zip directory, with those of the shared strings part the
+    sheet's text cells point into.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+
+    Returns:
+    - Dictionary mapping sheet name to its fingerprint, in workbook order.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_PKG_REL_NS}Relationship")}
+        parts = {info.filename: info for info in archive.infolist()}
+
+        shared = parts.get("xl/sharedStrings.xml")
+        shared_key = f"{shared.CRC:08x}-{shared.file_size}" if shared else "none"
+
+        fingerprints = {}
+        for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+            target = targets.get(sheet.get(f"{_REL_NS}id"), "")
+            part_name = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            info = parts.get(part_name)
+            sheet_key = f"{info.CRC:08x}-{info.file_size}" if info else "missing"
+            fingerprints[sheet.get("name")] = f"{sheet_key}:{shared_key}"
+    return fingerprints
+
+def _encode_frame(df):
+    """
+    Convert a headerless sheet into an Arrow table.
+
+    Sheet columns mix text and numbers, which Arrow cannot hold in one column,
+    so every sheet column is stored as three typed columns (text, integer and
+    float). Values of any other type are stored as text.
+    """
+    arrays = {}
+    for position, label in enumerate(df.columns):
+        values = df[label].astype(object).to_numpy()
+        is_int = np.fromiter((isinstance(v, (int, np.integer)) and not isinstance(v, (bool, np.bool_)) for v in values), bool, len(values))
+        is_float = np.fromiter((isinstance(v, (float, np.floating)) for v in values), bool, len(values))
+        is_text = ~(is_int | is_float) & pd.notna(values)
+
+        text = np.where(is_text, values, None)
+        arrays[f"{label}:s"] = pa.array([None if v is None else str(v) for v in text], type=pa.string())
+        arrays[f"{label}:i"] = pa.array(np.where(is_int, values, 0).astype(np.int64), mask=~is_int)
+        arrays[f"{label}:f"] = pa.array(np.where(is_float, values, np.nan).astype(np.float64))
+    return pa.table(arrays)
+
+def _decode_table(table):
+    """Rebuild the headerless sheet DataFrame stored by _encode_frame."""
+    columns = {}
+    for name in table.column_names[::3]:
+        label = int(name.rsplit(":", 1)[0])
+        floats = table.column(f"{label}:f").to_numpy()
+        values = floats.astype(object)
+        values[np.isnan(floats)] = np.nan
+
+        ints = table.column(f"{label}:i")
+        int_mask = ints.is_valid().to_numpy(zero_copy_only=False)
+        if int_mask.any():
+            values[int_mask] = [int(v) for v in ints.filter(ints.is_valid()).to_pylist()]
+
+        text = table.column(f"{label}:s")
+        text_mask = text.is_valid().to_numpy(zero_copy_only=False)
+        if text_mask.any():
+            values[text_mask] = text.filter(text.is_valid()).to_pylist()
+
+        columns[label] = values
+    df = pd.DataFrame(columns, index=range(table.num_rows))
+    # Restore the per-column types pandas infers when reading the workbook
+    return df.infer_objects()
+
+class WorkbookCache:
+    """
+    Columnar cache of the sheets of one workbook.
+
+    Each sheet is parsed once and stored as an uncompressed Feather file that
+    later runs memory-map instead of parsing the workbook XML. The cache
+    checks the workbook's modification time and size first; when they
+    changed, each sheet is re-read only if its fingerprint (see
+    sheet_fingerprints) changed.
+
+    Exposes the `sheet_names` / `parse()` / `close()` subset of pd.ExcelFile
+    used by the report generator, so it can stand in for it.
+    """
+
+    def __init__(self, file_path, cache_dir=None):
+        """
+        Parameters:
+        - file_path: Path to the Excel file.
+        - cache_dir: Cache directory (defaults to `.<workbook name>.cache` next to the workbook).
+        """
+        self.file_path = os.path.abspath(file_path)
+        if cache_dir is None:
+            directory, name = os.path.split(self.file_path)
+            cache_dir = os.path.join(directory, f".{name}.cache")
+        self.cache_dir = cache_dir
+        self._manifest_path = os.path.join(cache_dir, "manifest.json")
+        self._manifest = self._load_manifest()
+        self._xls = None
+        self._check_workbook()
+
+    @property
+    def sheet_names(self):
+        return list(self._manifest["sheets"])
+
+    def parse(self, sheet_name, usecols=None, header=None):
+        """
+        Read a sheet (without headers) from the cache, filling it on a miss.
+
+        Parameters:
+        - sheet_name: Name of the sheet.
+        - usecols: Optional column range such as 'AC:AJ'.
+        - header: Must be None; the report sheets have no header row.
+
+        Returns:
+        - DataFrame shaped like pd.read_excel(..., usecols=usecols, header=None).
+        """
+        if header is not None:
+            raise ValueError("WorkbookCache only reads sheets without headers.")
+        df = self._read_cached(sheet_name)
+        if usecols is None:
+            return df
+
+        column_start, column_end = usecols.split(":")
+        start = column_index_from_string(column_start.strip()) - 1
+        end = column_index_from_string(column_end.strip())
+        return df.iloc[:, start:end]
+
+    def warm(self, sheet_names=None):
+        """
+        Fill the cache for the given sheets (defaults to all of them).
+
+        Returns:
+        - Number of sheets that had to be parsed.
+        """
+        parsed = 0
+        for sheet_name in sheet_names or self.sheet_names:
+            if not self._is_cached(sheet_name):
+                self._read_cached(sheet_name)
+                parsed += 1
+        return parsed
+
+    def clear(self):
+        """Delete every cached sheet of this workbook."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self._manifest = {"version": CACHE_FORMAT_VERSION, "mtime": None, "size": None, "sheets": {}}
+        self._check_workbook()
+
+    def close(self):
+        if self._xls is not None:
+            self._xls.close()
+            self._xls = None
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest.get("version") == CACHE_FORMAT_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"version": CACHE_FORMAT_VERSION, "mtime": None, "size": None, "sheets": {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self._manifest, manifest_file, indent=2)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _check_workbook(self):
+        """Drop the cached sheets whose fingerprint changed since they were stored."""
+        stat = os.stat(self.file_path)
+        if self._manifest["mtime"] == stat.st_mtime_ns and self._manifest["size"] == stat.st_size:
+            return
+
+        old_sheets = self._manifest["sheets"]
+        sheets = {}
+        for sheet_name, key in sheet_fingerprints(self.file_path).items():
+            entry = old_sheets.get(sheet_name)
+            if entry is not None and entry["key"] == key:
+                sheets[sheet_name] = entry
+            else:
+                if entry is not None and entry.get("file"):
+                    self._remove_file(entry["file"])
+                sheets[sheet_name] = {"key": key, "file": None}
+        for sheet_name, entry in old_sheets.items():
+            if sheet_name not in sheets and entry.get("file"):
+                self._remove_file(entry["file"])
+
+        self._manifest.update(mtime=stat.st_mtime_ns, size=stat.st_size, sheets=sheets)
+        self._save_manifest()
+
+    def _remove_file(self, file_name):
+        try:
+            os.remove(os.path.join(self.cache_dir, file_name))
+        except OSError:
+            pass
+
+    def _is_cached(self, sheet_name):
+        entry = self._manifest["sheets"].get(sheet_name)
+        return bool(entry and entry["file"] and os.path.exists(os.path.join(self.cache_dir, entry["file"])))
+
+    def _read_cached(self, sheet_name):
+        if sheet_name not in self._manifest["sheets"]:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        entry = self._manifest["sheets"][sheet_name]
+
+        if feather is not None and self._is_cached(sheet_name):
+            table = feather.read_table(os.path.join(self.cache_dir, entry["file"]), memory_map=True)
+            return _decode_table(table)
+
+        # Cache miss: parse the sheet from the workbook and store it
+        if self._xls is None:
+            self._xls = pd.ExcelFile(self.file_path)
+        df = self._xls.parse(sheet_name, header=None)
+        if feather is not None:
+            file_name = hashlib.sha1(sheet_name.encode("utf-8")).hexdigest() + ".feather"
+            os.makedirs(self.cache_dir, exist_ok=True)
+            feather.write_feather(_encode_frame(df), os.path.join(self.cache_dir, file_name), compression="uncompressed")
+            entry["file"] = file_name
+            self._save_manifest()
+        return df
+
+# Execution Block
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the columnar cache of a student workbook.")
+    parser.add_argument("file", help="Path to the Excel workbook.")
+    parser.add_argument("--cache-dir", default=None, help="Cache directory (defaults to next to the workbook).")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--warm", action="store_true", help="Parse every sheet into the cache.")
+    action.add_argument("--clear", action="store_true", help="Delete the cached sheets.")
+    args = parser.parse_args()
+
+    if feather is None:
+        print("pyarrow is not installed; install it to use the workbook cache (pip install pyarrow).")
+    else:
+        cache = WorkbookCache(args.file, args.cache_dir)
+        if args.clear:
+            cache.clear()
+            print(f"Cleared the cache in {cache.cache_dir}")
+        else:
+            parsed = cache.warm()
+            cache.close()
+            print(f"Cached {len(cache.sheet_names)} sheet(s) in {cache.cache_dir} ({parsed} parsed).")
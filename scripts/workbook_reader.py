@@ -0,0 +1,151 @@
+# Required Libraries
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from openpyxl.utils import column_index_from_string
+from pandas.io.parsers import TextParser
+import pandas as pd
+import instrumentation
+
+# Sheets in the workbook that do not belong to a student
+NON_STUDENT_SHEETS = ("RESOURCE", "SUMMARY")
+
+def _convert_value(value):
+    """Convert a cell value the way pd.read_excel does."""
+    if value is None or value in ERROR_CODES:
+        return ""  # Read as NaN by the TextParser
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+    return value
+
+def read_sheet_window(worksheet, column_start=None, column_end=None):
+    """
+    Read a column window of a worksheet into a DataFrame, streaming its rows.
+
+    Parameters:
+    - worksheet: openpyxl worksheet (read-only mode keeps memory flat).
+    - column_start: Starting column (e.g., 'A'); None reads from column A.
+    - column_end: Ending column (e.g., 'H'); None reads to the last column.
+
+    Returns:
+    - DataFrame shaped like pd.read_excel(..., usecols=f"{column_start}:{column_end}", header=None).
+    """
+    min_col = column_index_from_string(column_start) if column_start else 1
+    max_col = column_index_from_string(column_end) if column_end else None
+
+    data = []
+    last_row = 0
+    width = 0
+    for row in worksheet.iter_rows(min_col=min_col, max_col=max_col, values_only=True):
+        values = [_convert_value(value) for value in row]
+        # Remember the last row with a value, trailing empty rows are dropped
+        if any(value != "" for value in values):
+            last_row = len(data) + 1
+        width = max(width, len(values))
+        data.append(values)
+    data = data[:last_row]
+
+    # Pad ragged rows so every row has the window's width
+    width = max_col - min_col + 1 if max_col else width
+    for values in data:
+        if len(values) < width:
+            values.extend([""] * (width - len(values)))
+
+    if not data:
+        return pd.DataFrame()
+    df = TextParser(data, header=None).read()
+    df.columns = range(min_col - 1, min_col - 1 + df.shape[1])
+    return df
+
+def split_exam_blocks(df):
+    """
+    Split a full student sheet into its exam column blocks.
+
+    Each block is located from its 'EXAM TYPE' header cell; blocks are
+    separated by fully empty columns. Several exams sharing one run of
+    columns are split at the same offset the 'EXAM TYPE' header has in
+    the first of them.
+
+    Parameters:
+    - df: DataFrame holding the whole student sheet (no headers).
+
+    Returns:
+    - List of (exam_type, DataFrame) pairs in sheet order, each DataFrame
+      shaped like a single `column_start:column_end` read.
+    """
+    if df.empty:
+        return []
+
+    empty_columns = df.isna().all(axis=0).to_numpy()
+    is_exam_header = df.iloc[0].astype(str).str.strip().str.upper().eq("EXAM TYPE").to_numpy()
+    num_columns = df.shape[1]
+
+    # Find the column bounds of each exam block
+    bounds = []
+    col_idx = 0
+    while col_idx < num_columns:
+        if empty_columns[col_idx]:
+            col_idx += 1
+            continue
+        start = col_idx
+        while col_idx < num_columns and not empty_columns[col_idx]:
+            col_idx += 1
+        exam_columns = [start + i for i in is_exam_header[start:col_idx].nonzero()[0]]
+
+        if not exam_columns:
+            # A run without its own header belongs to the block before it
+            if bounds:
+                bounds[-1][1] = col_idx
+            continue
+
+        offset = exam_columns[0] - start
+        starts = [column - offset for column in exam_columns]
+        for k, block_start in enumerate(starts):
+            block_end = starts[k + 1] if k + 1 < len(starts) else col_idx
+            bounds.append([block_start, block_end, exam_columns[k]])
+
+    blocks = []
+    for block_start, block_end, exam_column in bounds:
+        block = df.iloc[:, block_start:block_end].copy()
+        block.columns = range(block.shape[1])
+        exam_type = df.iat[1, exam_column] if df.shape[0] > 1 else None
+        blocks.append((str(exam_type).strip() if pd.notna(exam_type) else None, block))
+    return blocks
+
+def iter_student_sheets(file_path, column_start=None, column_end=None, skip_sheets=NON_STUDENT_SHEETS, on_error=None):
+    """
+    Stream the student sheets of a workbook one at a time.
+
+    The workbook is opened in openpyxl's read-only mode and only the requested
+    column window of each sheet is kept, so peak memory stays at one sheet
+    window no matter how many students the workbook holds.
+
+    Parameters:
+    - file_path: Path to the Excel file.
+    - column_start: Starting column (e.g., 'A'); None reads from column A.
+    - column_end: Ending column (e.g., 'H'); None reads to the last column.
+    - skip_sheets: Sheet names (upper-case) that are not student sheets.
+    - on_error: Optional callable(sheet_name, exception); when given, a sheet
+      that cannot be read is reported to it and skipped instead of raising.
+
+    Yields:
+    - (sheet_name, DataFrame) pairs in workbook order.
+    """
+    with instrumentation.phase("load", path=file_path):
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            if sheet_name.strip().upper() in skip_sheets:
+                continue
+            try:
+                with instrumentation.phase("read", sheet=sheet_name) as read_metrics:
+                    df = read_sheet_window(workbook[sheet_name], column_start, column_end)
+                    read_metrics["rows"] = len(df)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(sheet_name, e)
+                continue
+            yield sheet_name, df
+    finally:
+        workbook.close()
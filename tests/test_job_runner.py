@@ -0,0 +1,51 @@
+# Required Libraries
+from openpyxl import Workbook
+from job_runner import JobRunner
+from validate_workbook import NO_EXAM_BLOCK_ERROR
+
+def write_workbook(path, sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, rows in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+STUDENT_SHEET = [
+    ["ID", "NAME", "EXAM TYPE"],
+    [1001, "Student 1001", "Quarterly"],
+    [],
+    ["SUBJECT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"],
+    ["Physics", "9/10", 90, 80],
+    [],
+    ["Subject", "Physics"],
+    ["UNIT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"],
+    ["Unit 1", "9/10", 90, 80],
+    [],
+    ["UNIT", "TOPIC", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"],
+    ["Unit 1", "Topic 1", "9/10", 90, 80],
+    [],
+    ["END"],
+]
+
+def run_once(workbook, output_root):
+    runner = JobRunner(str(output_root), max_workers=0)
+    try:
+        stats = dict(runner.run([(workbook, "class")]))
+        return stats, runner.ledger.quarantined()
+    finally:
+        runner.close()
+
+def test_sheet_without_exam_block_is_quarantined(tmp_path):
+    workbook = write_workbook(tmp_path / "class.xlsx", {"1001": STUDENT_SHEET, "1002": [["NOTES"], ["no exam block here"]]})
+    stats, quarantined = run_once(workbook, tmp_path / "reports")
+    assert stats["done"] == 1
+    assert stats["failed"] == 1
+    assert [(student, exam, error) for _, student, exam, error, _ in quarantined] == [("1002", "", NO_EXAM_BLOCK_ERROR)]
+
+    # The unchanged sheet is not read again, and stays quarantined
+    stats, quarantined = run_once(workbook, tmp_path / "reports")
+    assert stats["sheets_skipped"] == 2
+    assert [student for _, student, *_ in quarantined] == ["1002"]
@@ -0,0 +1,53 @@
+# Required Libraries
+from openpyxl import Workbook
+from pipeline import iter_workbook_reports
+from report_service import WorkbookState
+
+def student_sheet(student, exam):
+    return [
+        ["ID", "NAME", "EXAM TYPE"],
+        [student, f"Student {student}", exam],
+        [],
+        ["SUBJECT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"],
+        ["Physics", "9/10", 90, 80],
+        [],
+        ["Subject", "Physics"],
+        ["UNIT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"],
+        ["Unit 1", "9/10", 90, 80],
+        [],
+        ["UNIT", "TOPIC", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %"],
+        ["Unit 1", "Topic 1", "9/10", 90, 80],
+        [],
+        ["END"],
+    ]
+
+def write_workbook(path):
+    """Workbook with a valid sheet, a sheet without EXAM TYPE value and a sheet without any exam block."""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, rows in {"1001": student_sheet(1001, "Quarterly"), "1002": student_sheet(1002, None), "1003": [["NOTES"]]}.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def test_pipeline_leaves_out_blocks_with_layout_errors(tmp_path):
+    path = write_workbook(tmp_path / "class.xlsx")
+    layout_errors = {}
+    reports = iter_workbook_reports(path, all_exams=True, on_layout_error=layout_errors.__setitem__)
+    assert [key for key, _, _ in reports] == [("1001", "Quarterly")]
+    assert set(layout_errors) == {("1002", None), "1003"}
+    assert "Missing EXAM TYPE value" in layout_errors[("1002", None)]
+
+def test_pipeline_without_validation_parses_every_block(tmp_path):
+    path = write_workbook(tmp_path / "class.xlsx")
+    reports = iter_workbook_reports(path, all_exams=True, validate=False)
+    assert [key for key, _, _ in reports] == [("1001", "Quarterly"), ("1002", None)]
+
+def test_service_records_layout_errors_per_sheet(tmp_path):
+    state = WorkbookState(write_workbook(tmp_path / "class.xlsx"), "class")
+    state.refresh()
+    assert {sheet_name: list(exams) for sheet_name, exams in state.reports.items()} == {"1001": ["Quarterly"], "1002": [], "1003": []}
+    assert set(state.errors) == {"1002", "1003"}
+    assert "1002" not in state.fingerprints
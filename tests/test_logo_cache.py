@@ -0,0 +1,121 @@
+# Required Libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import pytest
+from logo_cache import LogoResolver
+
+LOGO = b"\x89PNG\r\n\x1a\nstand-in logo"
+
+class LogoServer(ThreadingHTTPServer):
+    """Local stand-in for the logo host, counting the requests of each path."""
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), LogoHandler)
+        self.requests = {}
+        self.failing = False
+        self.logo = LOGO
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+class LogoHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests[self.path] = self.server.requests.get(self.path, 0) + 1
+        if self.server.failing:
+            self.send_error(503)
+            return
+        if self.path == "/slow.png":
+            time.sleep(2)
+        if self.path not in ("/logo.png", "/slow.png"):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.server.logo)))
+        self.end_headers()
+        self.wfile.write(self.server.logo)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    logo_server = LogoServer()
+    thread = threading.Thread(target=logo_server.serve_forever, daemon=True)
+    thread.start()
+    yield logo_server
+    logo_server.shutdown()
+    logo_server.server_close()
+
+def test_downloads_each_logo_once_per_process(server, tmp_path):
+    resolver = LogoResolver(cache_dir=str(tmp_path))
+    assert resolver.resolve(server.url("/logo.png")) == LOGO
+    assert resolver.resolve(server.url("/logo.png")) == LOGO
+    assert server.requests == {"/logo.png": 1}
+
+def test_disk_cache_is_shared_between_resolvers(server, tmp_path):
+    LogoResolver(cache_dir=str(tmp_path)).resolve(server.url("/logo.png"))
+    assert LogoResolver(cache_dir=str(tmp_path)).resolve(server.url("/logo.png")) == LOGO
+    assert server.requests == {"/logo.png": 1}
+
+def test_expired_entry_is_downloaded_again(server, tmp_path):
+    LogoResolver(cache_dir=str(tmp_path), ttl=0).resolve(server.url("/logo.png"))
+    assert LogoResolver(cache_dir=str(tmp_path), ttl=0).resolve(server.url("/logo.png")) == LOGO
+    assert server.requests == {"/logo.png": 2}
+
+def test_expired_entry_is_used_when_the_download_fails(server, tmp_path):
+    LogoResolver(cache_dir=str(tmp_path), ttl=0).resolve(server.url("/logo.png"))
+    server.failing = True
+    assert LogoResolver(cache_dir=str(tmp_path), ttl=0).resolve(server.url("/logo.png")) == LOGO
+    assert server.requests == {"/logo.png": 2}
+
+def test_offline_uses_only_the_disk_cache(server, tmp_path):
+    LogoResolver(cache_dir=str(tmp_path), ttl=0).resolve(server.url("/logo.png"))
+    offline = LogoResolver(cache_dir=str(tmp_path), ttl=0, offline=True)
+    assert offline.resolve(server.url("/logo.png")) == LOGO
+    assert offline.resolve(server.url("/other.png")) is None
+    assert server.requests == {"/logo.png": 1}
+
+def test_failures_are_remembered(server, tmp_path):
+    resolver = LogoResolver(cache_dir=str(tmp_path))
+    assert resolver.resolve(server.url("/missing.png")) is None
+    assert resolver.resolve(server.url("/missing.png")) is None
+    assert server.requests == {"/missing.png": 1}
+
+def test_failure_is_retried_after_failure_ttl(server, tmp_path):
+    resolver = LogoResolver(cache_dir=str(tmp_path), failure_ttl=0.2)
+    server.failing = True
+    assert resolver.resolve(server.url("/logo.png")) is None
+    server.failing = False
+    assert resolver.resolve(server.url("/logo.png")) is None
+    assert server.requests == {"/logo.png": 1}
+    time.sleep(0.3)
+    assert resolver.resolve(server.url("/logo.png")) == LOGO
+    assert server.requests == {"/logo.png": 2}
+
+def test_memory_entry_expires_with_the_ttl(server, tmp_path):
+    resolver = LogoResolver(cache_dir=str(tmp_path), ttl=0.2)
+    assert resolver.resolve(server.url("/logo.png")) == LOGO
+    server.logo = b"\x89PNG\r\n\x1a\nnew logo"
+    assert resolver.resolve(server.url("/logo.png")) == LOGO
+    time.sleep(0.3)
+    assert resolver.resolve(server.url("/logo.png")) == server.logo
+    assert server.requests == {"/logo.png": 2}
+
+def test_timeout(server, tmp_path):
+    resolver = LogoResolver(cache_dir=str(tmp_path), timeout=0.2)
+    start = time.perf_counter()
+    assert resolver.resolve(server.url("/slow.png")) is None
+    assert time.perf_counter() - start < 1.5
+
+def test_local_paths_skip_the_cache(tmp_path):
+    logo_path = tmp_path / "logo.png"
+    logo_path.write_bytes(LOGO)
+    resolver = LogoResolver(cache_dir=str(tmp_path / "cache"))
+    assert resolver.resolve(str(logo_path)) == LOGO
+    assert resolver.resolve(logo_path.as_uri()) == LOGO
+    assert not (tmp_path / "cache").exists()
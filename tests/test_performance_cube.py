@@ -0,0 +1,92 @@
+# Required Libraries
+from openpyxl import Workbook
+from performance_cube import cube_from_workbook
+from report_manifest import report_fingerprint
+from report_parser import parse_report
+from workbook_reader import iter_student_sheets, split_exam_blocks
+
+def exam_block(student, exam, units, topics):
+    """Rows of one exam block with a GRADE column in every table (units/topics: rows without the GRADE)."""
+    def grade(percent):
+        return "A" if isinstance(percent, (int, float)) and percent >= 75 else "B"
+
+    rows = [
+        ["ID", "NAME", "EXAM TYPE", "SCHOOL NAME"],
+        [student, f"Student {student}", exam, "Demo School"],
+        [],
+        ["SUBJECT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %", "GRADE"],
+        ["Physics", "17/19", 89.47, 77.65, "A"],
+        [],
+        ["Subject", "Physics"],
+        ["UNIT", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %", "GRADE"],
+    ]
+    rows += [row + [grade(row[2])] for row in units]
+    rows += [[], ["UNIT", "TOPIC", "OBTAINED MARKS", "PERFORMANCE %", "OVERALL %", "GRADE"]]
+    rows += [row + [grade(row[3])] for row in topics]
+    rows += [[], ["END"]]
+    return rows
+
+def write_workbook(path, sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, rows in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def parsed_reports(path):
+    return {
+        (sheet_name, str(exam_type)): parse_report(block)
+        for sheet_name, df in iter_student_sheets(path) for exam_type, block in split_exam_blocks(df)
+    }
+
+def assert_round_trip(path):
+    cube = cube_from_workbook(path)
+    reports = parsed_reports(path)
+    assert reports
+    for (sheet_name, exam), report in reports.items():
+        assert report_fingerprint(cube.student_report(sheet_name, exam)) == report_fingerprint(report)
+    assert {key for key, _ in cube.reports()} == set(reports)
+    return cube
+
+def test_extra_columns_and_row_order_round_trip(tmp_path):
+    path = write_workbook(tmp_path / "grades.xlsx", {
+        "1001": exam_block(1001, "Quarterly",
+                           [["Unit 1", "9/10", 90, 80], ["Unit 2", "8/9", 88.89, 70]],
+                           [["Unit 1", "Topic 1", "4/5", 80, 75], ["Unit 2", "Topic 2", "8/9", 88.89, 70]]),
+        # Units and topics in another order, and a topic the first student has no row for
+        "1002": exam_block(1002, "Quarterly",
+                           [["Unit 2", "3/9", 33.33, 40], ["Unit 1", "10/10", 100, 95]],
+                           [["Unit 2", "Topic 2", "3/9", 33.33, 40], ["Unit 1", "Topic 3", "2/2", 100, 100], ["Unit 1", "Topic 1", "5/5", 100, 90]]),
+    })
+    cube = assert_round_trip(path)
+    # Everything fits the arrays: no report had to be kept as parsed
+    assert cube.parsed == {}
+    grades = cube.student_report("1002", "Quarterly").subjects[0].units.rows
+    assert grades == (("Unit 2", "3/9", 33.33, 40, "B"), ("Unit 1", "10/10", 100, 95, "A"))
+
+def test_reports_the_arrays_cannot_hold_are_kept_as_parsed(tmp_path):
+    path = write_workbook(tmp_path / "absent.xlsx", {
+        "1001": exam_block(1001, "Quarterly", [["Unit 1", "9/10", 90, 80]], [["Unit 1", "Topic 1", "9/10", 90, 80]]),
+        # Marks that are not numbers
+        "1002": exam_block(1002, "Quarterly", [["Unit 1", "AB", "AB", 80]], [["Unit 1", "Topic 1", "AB", "AB", 80]]),
+    })
+    cube = assert_round_trip(path)
+    assert set(cube.parsed) == {("1002", "Quarterly")}
+
+def test_select_blocks_leaves_blocks_out_of_the_cube(tmp_path):
+    path = write_workbook(tmp_path / "selected.xlsx", {
+        "1001": exam_block(1001, "Quarterly", [["Unit 1", "9/10", 90, 80]], [["Unit 1", "Topic 1", "9/10", 90, 80]]),
+        "1002": exam_block(1002, "Quarterly", [["Unit 1", "AB", "AB", 80]], [["Unit 1", "Topic 1", "AB", "AB", 80]]),
+    })
+    seen = []
+
+    def select_blocks(sheet_name, df):
+        seen.append(sheet_name)
+        return split_exam_blocks(df) if sheet_name == "1001" else []
+
+    cube = cube_from_workbook(path, select_blocks=select_blocks)
+    assert [key for key, _ in cube.reports()] == [("1001", "Quarterly")]
+    assert seen == ["1001", "1002"]
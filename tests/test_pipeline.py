@@ -0,0 +1,23 @@
+# Required Libraries
+import os
+import pytest
+from pipeline import run_pipeline
+from synthetic_workbook import generate_workbook
+
+@pytest.mark.skipif(os.name == "nt", reason="The stand-in soffice is a shell script")
+def test_failed_conversion_keeps_the_saved_report_out_of_errors(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    soffice = bin_dir / "soffice"
+    soffice.write_text("#!/bin/sh\nexit 1\n")
+    soffice.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    workbook = generate_workbook(str(tmp_path / "class.xlsx"), num_students=2, subjects=1, units=2, topics=2, exams=("Quarterly",))
+    results, errors, pipeline = run_pipeline(workbook, str(tmp_path / "reports"), all_exams=True, render_workers=1, io_workers=1, convert_workers=1)
+
+    assert set(results) == {("1001", "Quarterly"), ("1002", "Quarterly")}
+    assert all(os.path.exists(path) for path in results.values())
+    assert errors == {}
+    assert set(pipeline.conversion_errors) == set(results)
+    assert pipeline.converted == {}
@@ -0,0 +1,43 @@
+# Required Libraries
+from PIL import Image
+from generate_reports import render_reports
+from logo_cache import default_resolver
+from report_manifest import report_fingerprint
+from report_parser import parse_report
+from synthetic_workbook import generate_workbook
+from workbook_reader import iter_student_sheets, split_exam_blocks
+
+def write_logo(path, color):
+    Image.new("RGB", (8, 8), color).save(path, format="PNG")
+
+def test_fingerprint_covers_logo_and_render_version(tmp_path):
+    generate_workbook(str(tmp_path / "class.xlsx"), num_students=1, subjects=1, units=1, topics=1, exams=("Quarterly",))
+    (_, df), = iter_student_sheets(str(tmp_path / "class.xlsx"))
+    (_, block), = split_exam_blocks(df)
+    report = parse_report(block)
+    fingerprint = report_fingerprint(report, b"logo", 2)
+    assert report_fingerprint(report, b"logo", 2) == fingerprint
+    assert report_fingerprint(report, b"other logo", 2) != fingerprint
+    assert report_fingerprint(report, None, 2) != fingerprint
+    assert report_fingerprint(report, b"logo", 3) != fingerprint
+
+def test_changed_logo_renders_the_report_again(tmp_path, capsys):
+    logo = tmp_path / "logo.png"
+    write_logo(logo, "red")
+    workbook = generate_workbook(str(tmp_path / "class.xlsx"), num_students=1, subjects=1, units=1, topics=1, exams=("Quarterly",), logo=str(logo))
+    (sheet_name, df), = iter_student_sheets(workbook)
+    (_, block), = split_exam_blocks(df)
+    reports = {sheet_name: (parse_report(block), f"{sheet_name}_")}
+    output_dir = str(tmp_path / "reports")
+
+    def render():
+        # A new run starts with an empty in-memory logo cache
+        default_resolver().clear()
+        results, errors = render_reports(reports, output_dir, max_workers=0)
+        assert errors == {} and set(results) == {sheet_name}
+        return capsys.readouterr().out
+
+    assert "Skipping" not in render()
+    assert "Skipping 1 unchanged report(s)." in render()
+    write_logo(logo, "blue")
+    assert "Skipping" not in render()
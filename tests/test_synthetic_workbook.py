@@ -0,0 +1,60 @@
+# Required Libraries
+import numpy as np
+import pytest
+from performance_cube import cube_from_workbook
+from report_manifest import report_fingerprint
+from report_parser import parse_report
+from synthetic_workbook import EXTRA_COLUMNS, synthetic_class, table_headers, write_workbook
+from workbook_reader import iter_student_sheets, split_exam_blocks
+
+LAYOUTS = [
+    {},
+    {"extra_columns": ("GRADE", "REMARKS")},
+    {"extra_columns": ("GRADE",), "reorder_columns": True},
+]
+
+@pytest.fixture(scope="module")
+def source():
+    return synthetic_class(num_students=4, subjects=2, units=2, topics=2, exams=("Quarterly", "Annual"), seed=3)
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_parsed_workbook_matches_the_source_class(source, layout, tmp_path):
+    path = write_workbook(source, str(tmp_path / "class.xlsx"), **layout)
+    schema = source.schema
+    labels = schema.label_values["topic"]
+    topic_position = {(subject, unit, topic): n for n, (subject, unit, topic) in enumerate(zip(labels["SUBJECT"], labels["UNIT"], labels["TOPIC"]))}
+    checked = 0
+    for sheet_name, df in iter_student_sheets(path):
+        s = source.students.get_loc(int(sheet_name))
+        for exam, block in split_exam_blocks(df):
+            e = schema.exams.get_loc(exam)
+            report = parse_report(block)
+            for subject in report.subjects:
+                table = subject.topics
+                assert table.headers == table_headers("topic", **layout)
+                for row in table.rows:
+                    values = dict(zip(table.headers, row))
+                    n = topic_position[(subject.name, values["UNIT"], values["TOPIC"])]
+                    assert values["PERFORMANCE %"] == pytest.approx(np.round(source.performance["topic"][s, e, n], 2), abs=0.006)
+                    assert values["OVERALL %"] == pytest.approx(np.round(source.overall["topic"][s, e, n], 2), abs=0.006)
+                    for column in layout.get("extra_columns", ()):
+                        assert values[column] == EXTRA_COLUMNS[column](values["PERFORMANCE %"])
+                    checked += 1
+    assert checked
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_cube_of_the_workbook_rebuilds_the_parsed_reports(source, layout, tmp_path):
+    path = write_workbook(source, str(tmp_path / "class.xlsx"), **layout)
+    cube = cube_from_workbook(path)
+    reports = {
+        (sheet_name, exam): parse_report(block)
+        for sheet_name, df in iter_student_sheets(path) for exam, block in split_exam_blocks(df)
+    }
+    assert {key for key, _ in cube.reports()} == set(reports)
+    for (sheet_name, exam), report in reports.items():
+        assert report_fingerprint(cube.student_report(sheet_name, exam)) == report_fingerprint(report)
+    assert cube.parsed == {}
+
+def test_unknown_extra_column():
+    with pytest.raises(ValueError):
+        table_headers("unit", extra_columns=("RANK",))